@@ -0,0 +1,54 @@
+# Rolling risk metrics on synthetic 1-minute bars: time per bar should stay flat as the history grows.
+from __future__ import annotations
+import time
+import numpy as np
+import pandas as pd
+from stock_analyzer.indicators import (
+    rolling_sharpe, rolling_sortino, rolling_beta, rolling_drawdown, rolling_max_drawdown,
+)
+
+BARS_PER_YEAR = 390 * 252   # regular US session, 1-minute bars
+WINDOW = 390 * 5            # one trading week
+
+def _minute_series(years: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    n = years * BARS_PER_YEAR
+    idx = pd.date_range("2015-01-01", periods=n, freq="min")
+    ret = pd.Series(rng.normal(0, 5e-4, n), index=idx)
+    mkt = pd.Series(rng.normal(0, 4e-4, n), index=idx)
+    close = 100 * (1 + ret).cumprod()
+    return close, ret, mkt
+
+def _time(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main():
+    cases = {
+        "rolling_sharpe": lambda c, r, m: rolling_sharpe(r, WINDOW, periods_per_year=BARS_PER_YEAR),
+        "rolling_sortino": lambda c, r, m: rolling_sortino(r, WINDOW, periods_per_year=BARS_PER_YEAR),
+        "rolling_beta": lambda c, r, m: rolling_beta(r, m, WINDOW),
+        "rolling_drawdown": lambda c, r, m: rolling_drawdown(c, WINDOW),
+        "rolling_max_drawdown": lambda c, r, m: rolling_max_drawdown(c, WINDOW),
+    }
+    print(f"window={WINDOW} bars")
+    print(f"{'metric':<22}{'years':>6}{'bars':>11}{'seconds':>10}{'ns/bar':>9}")
+    for years in (1, 2, 4, 8):
+        close, ret, mkt = _minute_series(years)
+        for name, fn in cases.items():
+            sec = _time(lambda: fn(close, ret, mkt))
+            print(f"{name:<22}{years:>6}{len(close):>11}{sec:>10.3f}{sec / len(close) * 1e9:>9.1f}")
+
+    # reference point: the naive rolling().apply on a small slice
+    close, ret, _ = _minute_series(1)
+    n = 20_000
+    sec = _time(lambda: close.iloc[:n].rolling(WINDOW).apply(
+        lambda a: (a / np.maximum.accumulate(a) - 1).min(), raw=True), repeat=1)
+    print(f"{'naive mdd apply':<22}{'-':>6}{n:>11}{sec:>10.3f}{sec / n * 1e9:>9.1f}")
+
+if __name__ == "__main__":
+    main()
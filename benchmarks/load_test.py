@@ -0,0 +1,77 @@
+# Load test for `stock-serve`: concurrent keep-alive clients, reports p50/p90/p99 latency.
+#   stock-serve -o out &
+#   python benchmarks/load_test.py --requests 5000 --concurrency 16
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import List, Tuple
+
+async def _get(reader, writer, path: str) -> Tuple[int, bytes]:
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: local\r\n\r\n".encode())
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ")[1])
+    length = next(int(l.split(":", 1)[1]) for l in lines if l.lower().startswith("content-length"))
+    return status, await reader.readexactly(length)
+
+def _paths(tickers: List[dict], n: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        t = rng.choice(tickers)
+        kind = rng.choices(["prices", "indicators", "performance"], weights=[5, 4, 1])[0]
+        end_year = int(t["end"][:4])
+        start = f"{max(int(t['start'][:4]), end_year - 1)}{t['end'][4:]}"   # roughly the last year
+        if kind == "performance":
+            out.append(f"/performance?ticker={t['ticker']}")
+        else:
+            out.append(f"/{kind}?ticker={t['ticker']}&start={start}&end={t['end']}")
+    return out
+
+async def _client(host, port, paths, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for path in paths:
+            t0 = time.perf_counter()
+            status, _ = await _get(reader, writer, path)
+            latencies.append(time.perf_counter() - t0)
+            if status != 200:
+                errors.append(path)
+    finally:
+        writer.close()
+
+async def run(host: str, port: int, n_requests: int, concurrency: int, seed: int):
+    reader, writer = await asyncio.open_connection(host, port)
+    _, body = await _get(reader, writer, "/tickers")
+    writer.close()
+    tickers = json.loads(body)
+    paths = _paths(tickers, n_requests, seed)
+    latencies: List[float] = []
+    errors: List[str] = []
+    t0 = time.perf_counter()
+    await asyncio.gather(*[
+        _client(host, port, paths[i::concurrency], latencies, errors) for i in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - t0
+    lat = sorted(latencies)
+    pct = lambda q: lat[min(int(q * len(lat)), len(lat) - 1)] * 1000
+    print(f"requests   : {len(lat)} ({len(errors)} errors) over {len(tickers)} tickers")
+    print(f"throughput : {len(lat) / elapsed:,.0f} req/s (concurrency {concurrency})")
+    print(f"latency ms : p50 {pct(0.50):.2f}  p90 {pct(0.90):.2f}  p99 {pct(0.99):.2f}  max {lat[-1] * 1000:.2f}")
+
+def main():
+    p = argparse.ArgumentParser(description="Load-test a running stock-serve instance.")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--requests", type=int, default=2000)
+    p.add_argument("--concurrency", type=int, default=8)
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+    asyncio.run(run(args.host, args.port, args.requests, args.concurrency, args.seed))
+
+if __name__ == "__main__":
+    main()
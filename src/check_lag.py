@@ -1,6 +1,7 @@
 # 시차 상관관계 분석 코드
 import pandas as pd
 from pathlib import Path
+from stock_analyzer.events import EventWindow, detect_events, event_study
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_PATH = BASE_DIR / "dataset" / "final_dataset_2006_2021.csv"
@@ -31,5 +32,26 @@ def main():
     print("Tip: Lag 1의 상관계수가 Lag 0보다 높다면,")
     print("     '뉴스가 주가에 반영되기까지 하루 정도 시간이 걸린다'는 결론을 낼 수 있습니다.")
 
+    # 이벤트 스터디: 뉴스 급증일 / 극단적 감성일 전후의 누적 비정상 수익률(CAR)
+    # (시장 지수 컬럼이 없으므로 평균 조정 모형: 비정상 수익률 = 수익률 - 추정기간 평균)
+    returns = df.set_index(pd.to_datetime(df['date']))['daily_return']
+    news = df.set_index(pd.to_datetime(df['date']))[['news_count', 'news_sentiment']]
+    news_days = news[news['news_count'] > 0]
+    window = EventWindow(pre=3, post=5, est_len=120, est_gap=10)
+    studies = {
+        "뉴스 급증 (news_count z > 3)": detect_events(news['news_count'], threshold=3.0, min_gap=5),
+        "극단 감성 (|sentiment z| > 2)": detect_events(news_days['news_sentiment'], method="abs_zscore",
+                                                    threshold=2.0, lookback=40, min_gap=5),
+    }
+    print("\n📊 [이벤트 스터디] 이벤트 전후 누적 비정상 수익률 (CAAR)")
+    for name, events in studies.items():
+        print("-" * 40)
+        if events.empty:
+            print(f"{name}: 이벤트 없음")
+            continue
+        res = event_study(returns, events, window=window, n_boot=5000)
+        print(f"{name}: 이벤트 {res.meta['n_events']}개")
+        print(res.summary[['aar', 'caar', 't', 'caar_lo', 'caar_hi', 'p_boot']].round(4).to_string())
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,6 +1,8 @@
 # AWS 주가 데이터, CNBC 데이터 merge 하는 코드
 import pandas as pd
 from pathlib import Path
+from stock_analyzer.rawcsv import load_price_history, SchemaCache
+from stock_analyzer.trading_calendar import default_calendar
 
 # ==========================================
 # 1. 파일 경로 설정 (정확한 파일명 확인 필수!)
@@ -10,8 +12,11 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # 가공된 뉴스 데이터 (이전 단계에서 생성함)
 NEWS_PATH = BASE_DIR / "src" / "out" / "processed_news_sorted.csv"
 
-# [중요] 사용자가 준비한 과거 주가 데이터 파일
-STOCK_PATH = BASE_DIR / "raw" / "stock_data" / "Amazon stock data 2006.12-2021.10.csv"
+# [중요] 사용자가 준비한 과거 주가 데이터 파일 (여러 개면 이어붙이고 중복 날짜 제거)
+STOCK_PATHS = [BASE_DIR / "raw" / "stock_data" / "Amazon stock data 2006.12-2021.10.csv"]
+
+# 감지한 CSV 스키마 캐시 (파일 크기/수정시각/헤더 기준)
+SCHEMA_CACHE_PATH = BASE_DIR / "src" / "out" / ".csv_schema_cache.json"
 
 # 최종 저장 경로
 OUTPUT_PATH = BASE_DIR / "src" / "out" / "final_dataset_2006_2021.csv"
@@ -30,8 +35,10 @@ def main():
     print(f"📰 뉴스 데이터 로드 중... ({NEWS_PATH.name})")
     news_df = pd.read_csv(NEWS_PATH)
     
-    # 날짜 형식 변환
-    news_df['date'] = pd.to_datetime(news_df['date']).dt.date
+    # 날짜 형식 변환 + 거래일 정렬: 주말/휴장일 기사는 다음 거래일 장에 반영되므로 그 날짜로 이동
+    dates = pd.to_datetime(news_df['date'])
+    news_df['date'] = pd.to_datetime(default_calendar().next_session(dates))
+    print(f"   -> 휴장일 기사 {int((~default_calendar().is_session(dates)).sum())}건을 다음 거래일로 이동")
 
     # [핵심] 기사 단위 데이터를 -> '일별(Daily)' 데이터로 변환
     # 같은 날짜의 기사들을 모아서 개수와 평균 감성을 구함
@@ -45,69 +52,25 @@ def main():
     # -------------------------------------------------------
     # 2. 주가 데이터 로드
     # -------------------------------------------------------
-    if not STOCK_PATH.exists():
-        print(f"❌ 주가 데이터 파일이 없습니다: {STOCK_PATH}")
-        print(f"   경로를 확인해주세요: {STOCK_PATH}")
+    missing = [p for p in STOCK_PATHS if not p.exists()]
+    if missing:
+        print(f"❌ 주가 데이터 파일이 없습니다: {missing[0]}")
+        print(f"   경로를 확인해주세요: {missing[0]}")
         return
 
-    print(f"📈 주가 데이터 로드 중... ({STOCK_PATH.name})")
+    print(f"📈 주가 데이터 로드 중... ({', '.join(p.name for p in STOCK_PATHS)})")
     try:
-        # 천 단위 콤마(,)가 있는 경우 제거하면서 로드
-        stock_df = pd.read_csv(STOCK_PATH, thousands=',')
-    except Exception as e:
+        # 파일별 스키마(날짜/컬럼/$·콤마)는 한 번만 감지해서 캐시, 이후엔 바로 파싱
+        stock_df, report = load_price_history(STOCK_PATHS, cache=SchemaCache(SCHEMA_CACHE_PATH))
+    except (OSError, ValueError) as e:
         print(f"❌ 주가 파일 읽기 에러: {e}")
         return
 
-    # 컬럼명 공백 제거 및 문자열 변환
-    stock_df.columns = [str(c).strip() for c in stock_df.columns]
-    print(f"   ℹ️ 원본 주가 데이터 컬럼: {list(stock_df.columns)}") # 디버깅용 출력
-
-    # 날짜 컬럼 찾기 ('Date', 'date', '날짜' 등 대응)
-    date_col = None
-    for col in stock_df.columns:
-        if 'date' in col.lower():
-            date_col = col
-            break
-    
-    if not date_col:
-        print("❌ 주가 데이터에서 'Date' 컬럼을 찾을 수 없습니다.")
-        return
-
-    # [수정됨] 날짜 변환 시 'utc=True' 옵션 추가하여 에러 해결
-    try:
-        stock_df['date'] = pd.to_datetime(stock_df[date_col], utc=True).dt.date
-    except Exception as e:
-        print(f"⚠️ 날짜 변환 중 오류 발생 (utc=True 시도): {e}")
-        stock_df['date'] = pd.to_datetime(stock_df[date_col], errors='coerce', utc=True).dt.date
-        
-    stock_df.set_index('date', inplace=True)
-    
-    # [수정됨] 강력한 컬럼 이름 표준화 (Close/Last, 종가 등 모두 Close로 통일)
-    rename_map = {}
-    for col in stock_df.columns:
-        c_lower = col.lower()
-        if 'close' in c_lower and 'adj' not in c_lower: # 'Close', 'Close/Last' 등
-            rename_map[col] = 'Close'
-        elif 'adj' in c_lower and 'close' in c_lower:   # 'Adj Close'
-            rename_map[col] = 'Adj Close'
-        elif 'open' in c_lower:
-            rename_map[col] = 'Open'
-        elif 'high' in c_lower:
-            rename_map[col] = 'High'
-        elif 'low' in c_lower:
-            rename_map[col] = 'Low'
-        elif 'vol' in c_lower:
-            rename_map[col] = 'Volume'
-            
-    if rename_map:
-        stock_df.rename(columns=rename_map, inplace=True)
-        print(f"   -> 컬럼명 표준화 결과: {list(stock_df.columns)}")
-
-    # 'Close' 컬럼이 없으면 멈춤 (필수)
-    if 'Close' not in stock_df.columns:
-        print("❌ 오류: 'Close' (종가) 컬럼을 찾을 수 없습니다.")
-        print("   현재 컬럼 목록을 확인하고 코드를 수정하거나 CSV 파일을 확인하세요.")
-        return
+    print(f"   -> 컬럼: {list(stock_df.columns)}, {report.rows}행")
+    if report.duplicates:
+        print(f"   ⚠️ 중복 날짜 {report.duplicates}개 제거 (종가 불일치 {report.conflicts}개)")
+    for before, after, missing in report.gaps:
+        print(f"   ⚠️ 데이터 공백: {before} → {after} (영업일 {missing}일 누락)")
 
     # -------------------------------------------------------
     # 3. 데이터 병합 (Left Join)
@@ -123,15 +86,6 @@ def main():
     merged_df['news_count'] = merged_df['news_count'].fillna(0)
     merged_df['news_sentiment'] = merged_df['news_sentiment'].fillna(0) # 0은 중립
 
-    # 주가 데이터(Open, High, Low, Close)가 문자열일 경우 숫자로 변환
-    cols_to_numeric = ['Open', 'High', 'Low', 'Close', 'Volume']
-    for col in cols_to_numeric:
-        if col in merged_df.columns:
-            # $ 표시 제거 등
-            if merged_df[col].dtype == object:
-                merged_df[col] = merged_df[col].astype(str).str.replace('$', '').str.replace(',', '')
-            merged_df[col] = pd.to_numeric(merged_df[col], errors='coerce')
-
     # 변동성(Volatility) 계산: High - Low
     if 'High' in merged_df.columns and 'Low' in merged_df.columns:
         merged_df['volatility'] = merged_df['High'] - merged_df['Low']
@@ -2,6 +2,7 @@
 import pandas as pd
 from pathlib import Path
 from textblob import TextBlob # 감성 분석용
+from stock_analyzer.newsindex import update_index
 
 # ==========================================
 # 1. 파일 경로 설정
@@ -9,6 +10,7 @@ from textblob import TextBlob # 감성 분석용
 BASE_DIR = Path(__file__).resolve().parent.parent # 프로젝트 루트
 RAW_NEWS_PATH = BASE_DIR / "raw" / "cnbc_news_datase.csv"
 OUTPUT_PATH = BASE_DIR / "src" / "out" / "processed_news_sorted.csv"
+INDEX_DIR = BASE_DIR / "src" / "out" / "news_index"   # 키워드 검색용 역색인 (stock-news-index)
 
 def calculate_sentiment(text):
     """텍스트의 감성 점수(-1.0 ~ 1.0)를 계산합니다."""
@@ -81,9 +83,13 @@ def main():
     OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
     final_df.to_csv(OUTPUT_PATH, index=False)
 
+    # 8. 역색인 갱신 (이미 색인된 기사는 건너뜀)
+    index, added = update_index(INDEX_DIR, final_df)
+
     print("\n" + "="*40)
     print("✅ 뉴스 데이터 가공 및 정렬 완료!")
     print(f"📂 저장 위치: {OUTPUT_PATH}")
+    print(f"📚 뉴스 색인: {INDEX_DIR} (+{added}개, 총 {index.n_articles}개)")
     print("="*40)
     print(final_df.head())
 
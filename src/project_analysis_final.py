@@ -7,6 +7,8 @@ from pathlib import Path
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+from stock_analyzer.model import FEATURES, save_model
+from stock_analyzer.rollup import RollupCube
 
 # ==========================================
 # 0. 파일 경로 설정 (방금 만든 데이터셋 경로)
@@ -15,6 +17,18 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # 파일명이 정확한지 꼭 확인하세요!
 DATA_PATH = BASE_DIR / "dataset" / "final_dataset_2006_2021.csv"
 IMG_OUT_DIR = BASE_DIR / "src" / "out" / "graphs"
+MODEL_DIR = BASE_DIR / "src" / "out" / "models" / "updown"   # stock-score --model 기본값
+# 일→월→분기→연 롤업 큐브 (새 날짜만 반영; 데이터셋을 다시 만들어 기존 행이 바뀌면 자동으로 다시 만듦)
+CUBE_PATH = BASE_DIR / "src" / "out" / "rollup_amzn.npz"
+TICKER = "AMZN"
+
+# 3가지 메소드 사용: sum, mean (+ 큐브가 지원하는 count/std/min/max)
+YEARLY_SPEC = {
+    'news_count': 'sum',          # 연간 총 뉴스 기사 수
+    'news_sentiment': 'mean',     # 연간 평균 뉴스 감성
+    'Close': 'mean',              # 연간 평균 주가
+    'volatility': 'mean'          # 연간 평균 변동성
+}
 
 # 그래프 저장 폴더 생성
 IMG_OUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -44,16 +58,16 @@ def main():
     # -----------------------------------------------------------
     print("\n✅ [1/3] 통계 분석 (Groupby) 수행 중...")
     
-    # 연도별(Year) 그룹화
-    df['Year'] = df.index.year
-    
-    # 3가지 메소드 사용: sum, mean, max
-    yearly_stats = df.groupby('Year').agg({
-        'news_count': 'sum',          # 연간 총 뉴스 기사 수
-        'news_sentiment': 'mean',     # 연간 평균 뉴스 감성
-        'Close': 'mean',              # 연간 평균 주가
-        'volatility': 'mean'          # 연간 평균 변동성
-    })
+    # 연도별(Year) 그룹화: df.groupby(df.index.year).agg(YEARLY_SPEC) 와 같은 결과를
+    # 롤업 큐브에서 조회 (지난 실행 이후 추가된 날짜의 셀만 갱신, 기존 행이 바뀌었으면 전체 재구성)
+    cube = RollupCube.load(CUBE_PATH) if CUBE_PATH.exists() else None
+    if cube is None or not set(YEARLY_SPEC) <= set(cube.measures):
+        cube = RollupCube(list(YEARLY_SPEC))
+    added = cube.append(df, TICKER)
+    cube.save(CUBE_PATH)
+    print(f"   - 롤업 큐브: 새 거래일 {added}일 반영 ({CUBE_PATH.name})")
+    yearly_stats = cube.agg("year", YEARLY_SPEC, ticker=TICKER)
+    yearly_stats.index = pd.Index(yearly_stats.index.year, name='Year')
     
     print("\n--- 연도별 통계 요약 (최근 5년) ---")
     print(yearly_stats.tail())
@@ -114,7 +128,7 @@ def main():
     
     # 2. Feature(X)와 Target(y)
     # 뉴스 정보와 전날의 거래 데이터를 보고 -> 내일 오를지(1) 내릴지(0) 예측
-    features = ['news_count', 'news_sentiment', 'volatility', 'daily_return', 'Volume']
+    features = FEATURES   # ['news_count', 'news_sentiment', 'volatility', 'daily_return', 'Volume']
     X = ml_df[features]
     y = ml_df['target_up_down']
     
@@ -149,6 +163,10 @@ def main():
     plt.savefig(IMG_OUT_DIR / "graph4_feature_importance.png")
     plt.close()
 
+    # 7. 모델 저장 (stock-score 로 재학습 없이 배치 추론)
+    model_path = save_model(model, X_train, y_train, MODEL_DIR, metrics={"accuracy": float(accuracy)})
+    print(f"\n💾 모델 저장: {model_path}")
+
     print("\n🎉 모든 과제 수행 완료!")
 
 if __name__ == "__main__":
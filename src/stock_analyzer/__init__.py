@@ -1 +1 @@
-__all__ = ["cli", "data", "indicators", "analysis", "report", "news"]
+__all__ = ["cli", "data", "indicators", "analysis", "report", "news", "portfolio", "bootstrap", "charts", "synthetic", "bench", "profiling", "service", "resample", "replay", "cross_section", "rawcsv", "events", "model", "ewcov", "quality", "newsindex", "parallel", "sketch", "trading_calendar", "rollup"]
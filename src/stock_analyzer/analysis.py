@@ -1,16 +1,19 @@
 # src/stock_analyzer/analysis.py
 from __future__ import annotations
 from dataclasses import dataclass, asdict
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import numpy as np
 import pandas as pd
+from .bootstrap import BootstrapConfig, bootstrap_ci
+from .trading_calendar import default_calendar
 from .indicators import (
     sma, ema, rsi, macd, bollinger,
     daily_returns, cumulative_returns, rolling_volatility,
-    drawdown_curve, max_drawdown
+    drawdown_curve, max_drawdown,
+    rolling_sharpe, rolling_sortino, rolling_beta, rolling_drawdown, rolling_max_drawdown,
 )
 
-TRADING_DAYS = 252
+TRADING_DAYS = 252      # NYSE sessions per year, long-run average (trading_calendar: ~251.8)
 
 def _get_close(df: pd.DataFrame) -> pd.Series:
     if "Adj Close" in df.columns:
@@ -30,8 +33,12 @@ class PerfSummary:
     max_drawdown: float
     avg_daily_return: float
     std_daily_return: float
+    ci: Optional[Dict[str, Any]] = None   # bootstrap intervals, see bootstrap.bootstrap_ci
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        d = asdict(self)
+        if d["ci"] is None:
+            d.pop("ci")
+        return d
 
 def compute_indicators(df: pd.DataFrame) -> pd.DataFrame:
     out = df.copy()
@@ -55,19 +62,28 @@ def compute_indicators(df: pd.DataFrame) -> pd.DataFrame:
     out["DRAWDOWN"] = drawdown_curve(close)
     return out
 
-def performance_summary(df: pd.DataFrame, risk_free_rate_annual: float = 0.0) -> PerfSummary:
+def performance_summary(
+    df: pd.DataFrame,
+    risk_free_rate_annual: float = 0.0,
+    bootstrap: Optional[BootstrapConfig] = None,
+    periods_per_year: int = TRADING_DAYS,
+) -> PerfSummary:
+    # periods_per_year: bars per year for the data's interval (see resample.periods_per_year)
     close = _get_close(df)
     ret = close.pct_change().dropna()
     total_return = float(close.iloc[-1] / close.iloc[0] - 1.0)
     n_days = (df.index[-1] - df.index[0]).days
-    years = max(n_days / 365.25, 1e-9)
+    # elapsed time in exchange sessions, not calendar days (plain weekdays before 1970, see count_sessions)
+    years = max(float(default_calendar().years_between(df.index[0], df.index[-1])), 1e-9)
     cagr = (1 + total_return) ** (1 / years) - 1 if total_return > -1 else -1.0
 
-    rf_daily = (1 + risk_free_rate_annual) ** (1 / TRADING_DAYS) - 1
+    rf_daily = (1 + risk_free_rate_annual) ** (1 / periods_per_year) - 1
     excess = ret - rf_daily
-    sharpe = (excess.mean() / excess.std()) * np.sqrt(TRADING_DAYS) if excess.std() and len(excess) > 2 else float("nan")
+    sharpe = (excess.mean() / excess.std()) * np.sqrt(periods_per_year) if excess.std() and len(excess) > 2 else float("nan")
 
     mdd = max_drawdown(close)
+    ci = bootstrap_ci(ret.to_numpy(), years, bootstrap, rf_per_period=rf_daily,
+                      periods_per_year=periods_per_year) if bootstrap else None
     return PerfSummary(
         start=str(df.index[0].date()),
         end=str(df.index[-1].date()),
@@ -78,4 +94,30 @@ def performance_summary(df: pd.DataFrame, risk_free_rate_annual: float = 0.0) ->
         max_drawdown=float(mdd),
         avg_daily_return=float(ret.mean()),
         std_daily_return=float(ret.std()),
+        ci=ci,
     )
+
+def rolling_risk_metrics(
+    df: pd.DataFrame,
+    window: int = 63,
+    market: Optional[pd.Series] = None,
+    risk_free_rate_annual: float = 0.0,
+    periods_per_year: int = TRADING_DAYS,
+) -> pd.DataFrame:
+    """
+    Trailing-window Sharpe, Sortino, drawdown and max drawdown (plus beta
+    when a `market` close series is given). All metrics are O(n) in the
+    number of bars, so `window` can be any size and bars can be intraday
+    as long as `periods_per_year` matches the bar interval.
+    """
+    close = _get_close(df)
+    ret = close.pct_change()
+    rf = (1 + risk_free_rate_annual) ** (1 / periods_per_year) - 1
+    out = pd.DataFrame(index=df.index)
+    out["ROLL_SHARPE"] = rolling_sharpe(ret, window, rf_per_period=rf, periods_per_year=periods_per_year)
+    out["ROLL_SORTINO"] = rolling_sortino(ret, window, target=rf, periods_per_year=periods_per_year)
+    out["ROLL_DRAWDOWN"] = rolling_drawdown(close, window)
+    out["ROLL_MAX_DRAWDOWN"] = rolling_max_drawdown(close, window)
+    if market is not None:
+        out["ROLL_BETA"] = rolling_beta(ret, market.pct_change(), window)
+    return out
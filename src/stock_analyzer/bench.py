@@ -0,0 +1,425 @@
+from __future__ import annotations
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Benchmarks over deterministic synthetic data (see synthetic.py).
+# Each case gets the tier's data and returns a zero-arg callable to time.
+
+@dataclass
+class Tier:
+    name: str
+    tickers: int
+    years: float
+    freq: str = "1d"
+    articles: int = 10_000
+
+TIERS: Dict[str, Tier] = {
+    "small": Tier("small", tickers=5, years=2, articles=10_000),
+    "medium": Tier("medium", tickers=50, years=10, articles=100_000),
+    "large": Tier("large", tickers=200, years=20, articles=400_000),
+    "minute": Tier("minute", tickers=2, years=1, freq="1m", articles=0),
+}
+
+CASES: Dict[str, Callable[[Dict[str, Any]], Optional[Callable[[], Any]]]] = {}
+
+def case(name: str):
+    """Register a benchmark case. The function returns None to skip a tier."""
+    def deco(fn):
+        CASES[name] = fn
+        return fn
+    return deco
+
+def tier_data(tier: Tier, tmp: Path, seed: int = 0) -> Dict[str, Any]:
+    """Synthetic inputs of one tier; cases that write files use `tmp` (owned by the caller)."""
+    from .synthetic import synthetic_universe, synthetic_news
+    data: Dict[str, Any] = {
+        "tier": tier,
+        "frames": synthetic_universe(tier.tickers, tier.years, freq=tier.freq, seed=seed),
+        "tmp": tmp,
+    }
+    if tier.articles:
+        data["news"] = synthetic_news(tier.articles, seed=seed)
+    return data
+
+# ---- cases ----
+
+@case("compute_indicators")
+def _bench_indicators(data):
+    from .analysis import compute_indicators
+    frames = data["frames"]
+    return lambda: [compute_indicators(df) for df in frames.values()]
+
+@case("performance_summary")
+def _bench_perf(data):
+    from .analysis import performance_summary
+    frames = data["frames"]
+    return lambda: [performance_summary(df) for df in frames.values()]
+
+@case("panel_performance")
+def _bench_panel_perf(data):
+    from .portfolio import close_panel, panel_performance
+    frames = data["frames"]
+    return lambda: panel_performance(close_panel(frames))
+
+@case("cross_section")
+def _bench_cross_section(data):
+    from .cross_section import cross_section
+    from .portfolio import close_panel
+    panel = close_panel(data["frames"])
+    return lambda: cross_section(panel)
+
+@case("event_study")
+def _bench_events(data):
+    if data["tier"].freq != "1d":
+        return None
+    from .events import detect_events, event_study
+    from .portfolio import close_panel, returns_panel
+    frames = data["frames"]
+    returns = returns_panel(close_panel(frames))
+    market = returns.mean(axis=1)
+    # volume spikes stand in for news spikes on synthetic data
+    def go():
+        events = {t: detect_events(df["Volume"], threshold=2.5, min_gap=10) for t, df in frames.items()}
+        return event_study(returns, events, market=market, n_boot=2_000)
+    return go
+
+@case("rolling_risk_metrics")
+def _bench_rolling(data):
+    from .analysis import rolling_risk_metrics
+    frames = data["frames"]
+    return lambda: [rolling_risk_metrics(df, window=63) for df in frames.values()]
+
+@case("save_artifacts")
+def _bench_save(data):
+    import pandas as pd
+    from .analysis import compute_indicators
+    from .cli_parse import _tidy_prices, _tidy_indicators, _tidy_returns
+    from .export import save_artifacts
+    from .portfolio import close_panel, panel_performance, to_perf_rows
+    frames = data["frames"]
+    inds = {t: compute_indicators(df) for t, df in frames.items()}
+    prices = pd.concat([_tidy_prices(df) for df in frames.values()]).sort_index()
+    indicators = pd.concat([_tidy_indicators(ind, t) for t, ind in inds.items()]).sort_index()
+    returns = pd.concat([_tidy_returns(ind, t) for t, ind in inds.items()]).sort_index()
+    rows = to_perf_rows(panel_performance(close_panel(frames)))
+    out = data["tmp"] / "artifacts"
+    return lambda: save_artifacts(prices=prices, indicators=indicators, returns=returns,
+                                  perf_rows=rows, out_dir=out, fmt="parquet")
+
+@case("stream_artifacts")
+def _bench_stream(data):
+    from .analysis import compute_indicators
+    from .cli_parse import _tidy_prices, _tidy_indicators, _tidy_returns
+    from .export import ArtifactWriter
+    from .portfolio import panel_performance, to_perf_rows
+    frames = data["frames"]
+    out = data["tmp"] / "stream"
+
+    def go():
+        # mirrors stock-parse: one ticker in memory at a time
+        with ArtifactWriter(out, fmt="parquet") as w:
+            for t, df in frames.items():
+                ind = compute_indicators(df)
+                w.write("prices", _tidy_prices(df))
+                w.write("indicators", _tidy_indicators(ind, t))
+                w.write("returns", _tidy_returns(ind, t))
+                for row in to_perf_rows(panel_performance(df[["Close"]].rename(columns={"Close": t}))):
+                    w.add_perf(row)
+    return go
+
+@case("validate_prices")
+def _bench_validate(data):
+    from .quality import validate_prices
+    frames = data["frames"]
+    return lambda: [validate_prices(df, ticker=t, interval=data["tier"].freq) for t, df in frames.items()]
+
+@case("return_sketch")
+def _bench_sketch(data):
+    from .sketch import QuantileSketch, merge_sketches
+    rets = [df["Close"].pct_change().to_numpy() for df in data["frames"].values()]
+    def run():
+        # per-ticker sketches merged into the universe, then the tail numbers
+        universe = merge_sketches(QuantileSketch().update(r) for r in rets)
+        return universe.var(0.99), universe.cvar(0.99), universe.histogram(50)
+    return run
+
+@case("rollup_cube")
+def _bench_rollup(data):
+    import pandas as pd
+    from .rollup import build_cube
+    frames = data["frames"]
+    measures = ["Close", "Volume"]
+    cube = build_cube(frames, measures)
+    nxt = {t: df.iloc[-1:].set_axis(df.index[-1:] + pd.Timedelta(days=1)) for t, df in frames.items()}
+    def run():
+        # one new bar per ticker, then the monthly and yearly rollups
+        for t, df in nxt.items():
+            cube.update(df, t)
+        return cube.agg("month", {"Close": "mean", "Volume": "sum"}), cube.agg("year", "std")
+    return run
+
+@case("analysis_pool")
+def _bench_pool(data):
+    import os
+    workers = min(os.cpu_count() or 1, 4)
+    if workers < 2:
+        return None
+    from .parallel import analyze_parallel
+    frames = data["frames"]
+    return lambda: list(analyze_parallel(frames.items(), workers))
+
+@case("resample_ohlcv")
+def _bench_resample(data):
+    if data["tier"].freq != "1m":
+        return None
+    from .resample import resample_ohlcv
+    frames = data["frames"]
+    return lambda: [resample_ohlcv(df) for df in frames.values()]
+
+@case("news_daily_stats")
+def _bench_news(data):
+    if "news" not in data:
+        return None
+    from .news import filter_articles, daily_news_stats
+    news = data["news"]
+    return lambda: daily_news_stats(filter_articles(news))
+
+@case("score_flat_forest")
+def _bench_score(data):
+    try:
+        from sklearn.ensemble import RandomForestClassifier
+    except ImportError:
+        return None
+    import numpy as np
+    import pandas as pd
+    from .model import FlatForest, build_features
+    frames = data["frames"]
+    X = pd.concat([build_features(df) for df in frames.values()]).to_numpy(dtype=float)
+    y = np.random.default_rng(0).integers(0, 2, len(X))
+    model = RandomForestClassifier(n_estimators=100, max_depth=10, random_state=42).fit(X[:20_000], y[:20_000])
+    flat = FlatForest.from_sklearn(model)
+    return lambda: flat.predict_proba(X)
+
+@case("news_index_query")
+def _bench_news_index(data):
+    if "news" not in data:
+        return None
+    from .news import NEWS_KEYWORDS
+    from .newsindex import build_index
+    idx = build_index(data["tmp"] / "news_index", data["news"])
+    query = " OR ".join(k.lower() for k in NEWS_KEYWORDS)
+    return lambda: idx.daily(query)
+
+# ---- runner ----
+
+def _time(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def _peak_mb(fn: Callable[[], Any]) -> float:
+    # tracemalloc sees Python and NumPy allocations (not Arrow's own pool).
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 2 ** 20
+
+def run(tiers: List[str], cases: Optional[List[str]] = None, repeat: int = 3,
+        seed: int = 0, log: Callable[[str], None] = print) -> Dict[str, Any]:
+    import numpy as np
+    import pandas as pd
+    results: Dict[str, Dict[str, Any]] = {}
+    for tier_name in tiers:
+        tier = TIERS[tier_name]
+        with tempfile.TemporaryDirectory(prefix=f"bench_{tier.name}_") as tmp:
+            data = tier_data(tier, Path(tmp), seed=seed)
+            rows = sum(len(df) for df in data["frames"].values())
+            for name in cases or list(CASES):
+                fn = CASES[name](data)
+                if fn is None:
+                    continue
+                seconds = _time(fn, repeat)
+                peak = _peak_mb(fn)
+                key = f"{name}[{tier_name}]"
+                results[key] = {"case": name, "tier": tier_name, "seconds": seconds,
+                                "peak_mb": peak, "rows": rows}
+                log(f"{key:<40}{seconds:>10.4f} s{peak:>10.1f} MB")
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "repeat": repeat,
+            "tiers": {t: asdict(TIERS[t]) for t in tiers},
+        },
+        "results": results,
+    }
+
+def bench_formats(artifacts: str | Path, formats: Optional[List[str]] = None, repeat: int = 3,
+                  tables: Optional[List[str]] = None, log: Callable[[str], None] = print) -> Dict[str, Any]:
+    """
+    Write/read each table of an existing artifacts directory with every export
+    backend: write time, full read time, 2-column read time and file size.
+    """
+    from .export import BACKENDS, load_table, read_table, write_table
+    artifacts = Path(artifacts)
+    names = tables or [n for n in ("prices", "indicators", "returns", "cross_section")
+                       if any((artifacts / f"{n}.{e}").exists() for e in ("parquet", "feather", "npz", "csv"))]
+    results: Dict[str, Dict[str, Any]] = {}
+    log(f"{'table/format':<34}{'write s':>10}{'read s':>10}{'subset s':>10}{'MB':>10}")
+    with tempfile.TemporaryDirectory(prefix="bench_formats_") as tmp_dir:
+        tmp = Path(tmp_dir)
+        for name in names:
+            df = load_table(artifacts, name)
+            subset = [c for c in df.columns if c != "Ticker"][:1] + (["Ticker"] if "Ticker" in df.columns else [])
+            for fmt in formats or list(BACKENDS):
+                path = write_table(df, tmp / f"{name}_{fmt}", fmt)
+                write_s = _time(lambda: write_table(df, tmp / f"{name}_{fmt}", fmt), repeat)
+                read_s = _time(lambda: read_table(path), repeat)
+                subset_s = _time(lambda: read_table(path, columns=subset), repeat)
+                key = f"{name}[{fmt}]"
+                results[key] = {"table": name, "format": fmt, "rows": len(df), "write_s": write_s,
+                                "read_s": read_s, "subset_read_s": subset_s, "subset": subset,
+                                "mb": path.stat().st_size / 2 ** 20}
+                log(f"{key:<34}{write_s:>10.4f}{read_s:>10.4f}{subset_s:>10.4f}{results[key]['mb']:>10.2f}")
+    return {"meta": {"artifacts": str(artifacts), "repeat": repeat}, "formats": results}
+
+def bench_ewcov(sizes: List[int], bars: int = 252, repeat: int = 3, halflife: float = 60.0,
+                seed: int = 0, log: Callable[[str], None] = print) -> Dict[str, Any]:
+    """
+    Streaming EW covariance per universe size: one-bar update, amortised
+    per-bar cost of 64-bar blocks, correlation read-out and checkpoint
+    save/load, against recomputing correlation_matrix over `bars` of history.
+    """
+    import numpy as np
+    import pandas as pd
+    from .ewcov import EwCovariance, ew_covariance
+    from .portfolio import correlation_matrix
+    rng = np.random.default_rng(seed)
+    results: Dict[str, Dict[str, Any]] = {}
+    log(f"{'tickers':>8}{'bar ms':>10}{'block ms/bar':>14}{'corr ms':>10}{'save ms':>10}{'load ms':>10}{'recompute ms':>14}")
+    with tempfile.TemporaryDirectory(prefix="bench_ewcov_") as tmp_dir:
+        tmp = Path(tmp_dir)
+        for n in sizes:
+            returns = pd.DataFrame(rng.normal(0, 0.01, (bars, n)), index=pd.bdate_range("2020-01-01", periods=bars),
+                                   columns=[f"T{i:04d}" for i in range(n)])
+            est = ew_covariance(returns, halflife=halflife)
+            x = returns.to_numpy()
+            k = [0]
+            def one():
+                est.update(x[k[0] % bars])
+                k[0] += 1
+            bar_s = min(_time(one, 20) for _ in range(repeat))
+            block_s = _time(lambda: est.update_many(x[:64]), repeat) / 64
+            corr_s = _time(est.corr_array, repeat)
+            path = tmp / f"ewcov_{n}.npz"
+            save_s = _time(lambda: est.save(path), repeat)
+            load_s = _time(lambda: EwCovariance.load(path), repeat)
+            full_s = _time(lambda: correlation_matrix(returns), 1)
+            results[str(n)] = {"tickers": n, "bar_s": bar_s, "block_bar_s": block_s, "corr_s": corr_s,
+                               "save_s": save_s, "load_s": load_s, "recompute_s": full_s,
+                               "checkpoint_mb": path.stat().st_size / 2 ** 20}
+            log(f"{n:>8}{bar_s * 1e3:>10.2f}{block_s * 1e3:>14.3f}{corr_s * 1e3:>10.1f}{save_s * 1e3:>10.1f}"
+                f"{load_s * 1e3:>10.1f}{full_s * 1e3:>14.1f}")
+    return {"meta": {"bars": bars, "halflife": halflife, "repeat": repeat}, "ewcov": results}
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.25,
+            min_seconds: float = 0.005, min_mb: float = 1.0) -> List[str]:
+    """
+    Regression messages for cases slower (or using more peak memory) than the
+    baseline by more than `threshold` (fraction). Timings under `min_seconds`
+    and peaks under `min_mb` in both runs are treated as noise.
+    """
+    problems = []
+    base = baseline.get("results", {})
+    for key, cur in current["results"].items():
+        ref = base.get(key)
+        if ref is None:
+            continue
+        if max(cur["seconds"], ref["seconds"]) >= min_seconds and cur["seconds"] > ref["seconds"] * (1 + threshold):
+            problems.append(f"{key}: {cur['seconds']:.4f}s vs baseline {ref['seconds']:.4f}s "
+                            f"(+{cur['seconds'] / ref['seconds'] - 1:.0%})")
+        if ref["peak_mb"] > 0 and max(cur["peak_mb"], ref["peak_mb"]) >= min_mb and cur["peak_mb"] > ref["peak_mb"] * (1 + threshold):
+            problems.append(f"{key}: peak {cur['peak_mb']:.1f} MB vs baseline {ref['peak_mb']:.1f} MB "
+                            f"(+{cur['peak_mb'] / ref['peak_mb'] - 1:.0%})")
+    return problems
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="stock-bench",
+        description="Time hot paths on synthetic data and check for regressions against a baseline."
+    )
+    p.add_argument("--tiers", default="small,medium",
+                   help=f"Comma-separated size tiers ({', '.join(TIERS)}) [default: small,medium]")
+    p.add_argument("--cases", help=f"Comma-separated cases [default: all of {', '.join(CASES)}]")
+    p.add_argument("--repeat", type=int, default=3, help="Timing repeats; best is kept [default: 3]")
+    p.add_argument("--seed", type=int, default=0, help="Synthetic data seed [default: 0]")
+    p.add_argument("-o", "--out", default="bench_results.json", help="Results JSON path")
+    p.add_argument("--baseline", help="Baseline JSON to compare against")
+    p.add_argument("--threshold", type=float, default=0.25,
+                   help="Allowed slowdown / memory growth as a fraction [default: 0.25]")
+    p.add_argument("--save-baseline", help="Also write the results to this baseline path")
+    p.add_argument("--artifacts", metavar="DIR",
+                   help="Instead of the synthetic cases, compare export formats on the tables in DIR "
+                        "(e.g. stock-parse output)")
+    p.add_argument("--formats", help="With --artifacts: comma-separated formats [default: all]")
+    p.add_argument("--ewcov", metavar="SIZES",
+                   help="Instead of the synthetic cases, time streaming EW covariance updates for "
+                        "these universe sizes (e.g. 500,1000,3000)")
+    return p
+
+def main():
+    args = build_parser().parse_args()
+    if args.artifacts:
+        formats = [f.strip() for f in args.formats.split(",")] if args.formats else None
+        result = bench_formats(args.artifacts, formats, repeat=args.repeat)
+        Path(args.out).write_text(json.dumps(result, indent=2), encoding="utf-8")
+        print(f"📂 Results: {args.out}")
+        return
+    if args.ewcov:
+        result = bench_ewcov([int(n) for n in args.ewcov.split(",")], repeat=args.repeat, seed=args.seed)
+        Path(args.out).write_text(json.dumps(result, indent=2), encoding="utf-8")
+        print(f"📂 Results: {args.out}")
+        return
+    tiers = [t.strip() for t in args.tiers.split(",") if t.strip()]
+    cases = [c.strip() for c in args.cases.split(",")] if args.cases else None
+    unknown = [t for t in tiers if t not in TIERS] + [c for c in cases or [] if c not in CASES]
+    if unknown:
+        raise SystemExit(f"Unknown tier/case: {', '.join(unknown)}")
+
+    result = run(tiers, cases, repeat=args.repeat, seed=args.seed)
+    Path(args.out).write_text(json.dumps(result, indent=2), encoding="utf-8")
+    print(f"📂 Results: {args.out}")
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(result, indent=2), encoding="utf-8")
+        print(f"📌 Baseline saved: {args.save_baseline}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        problems = compare(result, baseline, threshold=args.threshold)
+        if problems:
+            print("❌ Benchmark regressions:")
+            for msg in problems:
+                print(f"   {msg}")
+            raise SystemExit(1)
+        print(f"✅ No regressions beyond {args.threshold:.0%}")
+
+if __name__ == "__main__":
+    main()
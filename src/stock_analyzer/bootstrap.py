@@ -0,0 +1,125 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Literal, Optional
+import numpy as np
+
+METRICS = ["cagr", "total_return", "sharpe", "max_drawdown", "avg_daily_return", "std_daily_return"]
+
+@dataclass
+class BootstrapConfig:
+    n_paths: int = 10_000
+    level: float = 0.95
+    method: Literal["stationary", "iid"] = "stationary"
+    mean_block: float = 10.0          # expected block length (bars) for the stationary bootstrap
+    seed: int = 0
+    chunk_size: int = 1_000           # paths per chunk; bounds memory at ~chunk_size x n_bars floats
+    workers: int = 1                  # >1 runs chunks in a process pool
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+def resample_indices(n: int, n_paths: int, rng: np.random.Generator,
+                     method: str = "stationary", mean_block: float = 10.0) -> np.ndarray:
+    """
+    (n_paths, n) row indices into a length-n return series.
+    "stationary" is the Politis-Romano stationary block bootstrap: each bar
+    starts a new block with probability 1/mean_block, otherwise continues the
+    previous one (wrapping around). "iid" draws every bar independently.
+    """
+    if method == "iid":
+        return rng.integers(0, n, size=(n_paths, n))
+    if method != "stationary":
+        raise ValueError(f"Unknown bootstrap method: {method!r}")
+    starts = rng.integers(0, n, size=(n_paths, n))
+    new_block = rng.random((n_paths, n)) < 1.0 / max(mean_block, 1.0)
+    new_block[:, 0] = True
+    pos = np.arange(n)
+    block_start = np.maximum.accumulate(np.where(new_block, pos, 0), axis=1)
+    start_idx = np.take_along_axis(starts, block_start, axis=1)
+    return (start_idx + (pos - block_start)) % n
+
+def path_metrics(paths: np.ndarray, years: float, rf_per_period: float = 0.0,
+                 periods_per_year: int = 252) -> Dict[str, np.ndarray]:
+    """PerfSummary metrics for every row of a (n_paths, n_bars) return matrix at once."""
+    log_growth = np.log1p(paths)
+    total_return = np.expm1(log_growth.sum(axis=1))
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        cagr = np.where(total_return > -1, (1 + total_return) ** (1 / years) - 1, -1.0)
+
+    avg = paths.mean(axis=1)
+    std = paths.std(axis=1, ddof=1)
+    excess = paths - rf_per_period
+    ex_std = excess.std(axis=1, ddof=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sharpe = np.where(ex_std > 0, excess.mean(axis=1) / ex_std * np.sqrt(periods_per_year), np.nan)
+
+    wealth = np.exp(np.cumsum(log_growth, axis=1))
+    peak = np.maximum(np.maximum.accumulate(wealth, axis=1), 1.0)   # initial capital is the first peak
+    mdd = np.minimum((wealth / peak - 1.0).min(axis=1), 0.0)
+    return {
+        "cagr": cagr,
+        "total_return": total_return,
+        "sharpe": sharpe,
+        "max_drawdown": mdd,
+        "avg_daily_return": avg,
+        "std_daily_return": std,
+    }
+
+def _run_chunk(args) -> Dict[str, np.ndarray]:
+    ret, n_paths, seed_seq, method, mean_block, years, rf, periods = args
+    rng = np.random.default_rng(seed_seq)
+    idx = resample_indices(len(ret), n_paths, rng, method=method, mean_block=mean_block)
+    return path_metrics(ret[idx], years, rf_per_period=rf, periods_per_year=periods)
+
+def bootstrap_ci(
+    returns: np.ndarray,
+    years: float,
+    config: Optional[BootstrapConfig] = None,
+    rf_per_period: float = 0.0,
+    periods_per_year: int = 252,
+) -> Dict[str, Any]:
+    """
+    Confidence intervals for every PerfSummary metric from resampled return paths.
+
+    Paths are generated chunk by chunk (each chunk has its own child seed from
+    `config.seed`, so results don't depend on `workers`) and only the per-path
+    metrics are kept, so memory stays bounded by one chunk. With fewer than
+    3 finite returns (e.g. a newly listed ticker) every interval is [nan, nan].
+    """
+    cfg = config or BootstrapConfig()
+    ret = np.asarray(returns, dtype=float)
+    ret = ret[np.isfinite(ret)]
+    out: Dict[str, Any] = {"level": cfg.level, "method": cfg.method, "n_paths": cfg.n_paths, "seed": cfg.seed}
+    if len(ret) < 3:
+        out.update({m: [float("nan"), float("nan")] for m in METRICS})
+        return out
+
+    sizes = [cfg.chunk_size] * (cfg.n_paths // cfg.chunk_size)
+    if cfg.n_paths % cfg.chunk_size:
+        sizes.append(cfg.n_paths % cfg.chunk_size)
+    seeds = np.random.SeedSequence(cfg.seed).spawn(len(sizes))
+    jobs = [(ret, k, s, cfg.method, cfg.mean_block, years, rf_per_period, periods_per_year)
+            for k, s in zip(sizes, seeds)]
+
+    if cfg.workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=cfg.workers) as ex:
+            parts: List[Dict[str, np.ndarray]] = list(ex.map(_run_chunk, jobs))
+    else:
+        parts = [_run_chunk(j) for j in jobs]
+
+    alpha = (1.0 - cfg.level) / 2.0
+    for m in METRICS:
+        values = np.concatenate([p[m] for p in parts])
+        lo, hi = np.nanquantile(values, [alpha, 1.0 - alpha])
+        out[m] = [float(lo), float(hi)]
+    return out
+
+def flatten_ci(ci: Optional[Dict[str, Any]]) -> Dict[str, float]:
+    """`{"cagr": [lo, hi], ...}` -> `{"cagr_ci_lo": lo, "cagr_ci_hi": hi, ...}` for one-row CSVs."""
+    if not ci:
+        return {}
+    flat: Dict[str, float] = {}
+    for m in METRICS:
+        if m in ci:
+            flat[f"{m}_ci_lo"], flat[f"{m}_ci_hi"] = ci[m]
+    return flat
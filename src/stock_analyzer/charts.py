@@ -0,0 +1,124 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import hashlib
+import json
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+DPI = 160
+MAX_POINTS = 2000      # per line, after LTTB downsampling
+HASH_KEY = "ChartHash"  # PNG text chunk holding the hash of the chart's inputs
+
+@dataclass
+class ChartSpec:
+    """Everything needed to draw one PNG, detached from pandas/pyplot so it can cross processes."""
+    path: Path
+    title: str
+    xlabel: str
+    ylabel: str
+    lines: Dict[str, Tuple[np.ndarray, np.ndarray]] = field(default_factory=dict)
+    hist: Optional[Tuple[np.ndarray, np.ndarray]] = None   # (counts, bin edges)
+    legend: bool = False
+    dpi: int = DPI
+
+    def digest(self) -> str:
+        h = hashlib.sha1()
+        style = {"title": self.title, "xlabel": self.xlabel, "ylabel": self.ylabel,
+                 "legend": self.legend, "dpi": self.dpi, "lines": list(self.lines)}
+        h.update(json.dumps(style, sort_keys=True).encode())
+        for x, y in self.lines.values():
+            h.update(np.ascontiguousarray(x).tobytes())
+            h.update(np.ascontiguousarray(y).tobytes())
+        if self.hist is not None:
+            for a in self.hist:
+                h.update(np.ascontiguousarray(a).tobytes())
+        return h.hexdigest()
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of `n_out` points that keep the
+    visual shape of (x, y). First and last points are always kept; each
+    bucket keeps the point forming the largest triangle with the previously
+    kept point and the mean of the next bucket.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    xf = x.astype(np.float64)
+    yf = y.astype(np.float64)
+    every = (n - 2) / (n_out - 2)
+    bounds = (np.arange(n_out - 1) * every).astype(np.int64) + 1
+    bounds[-1] = n - 1
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = bounds[i], bounds[i + 1]
+        nlo, nhi = hi, (bounds[i + 2] if i + 2 < len(bounds) else n)
+        avg_x = xf[nlo:nhi].mean()
+        avg_y = yf[nlo:nhi].mean()
+        area = np.abs((xf[a] - avg_x) * (yf[lo:hi] - yf[a]) - (xf[a] - xf[lo:hi]) * (avg_y - yf[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+def line_data(s: pd.Series, max_points: int = MAX_POINTS) -> Tuple[np.ndarray, np.ndarray]:
+    """(x, y) arrays for a time series, NaNs dropped and LTTB-downsampled to `max_points`."""
+    s = s.dropna()
+    x = s.index.to_numpy()
+    y = s.to_numpy(dtype=float)
+    xnum = x.astype("datetime64[ns]").astype(np.int64) if np.issubdtype(x.dtype, np.datetime64) else x
+    keep = lttb_indices(xnum, y, max_points)
+    return x[keep], y[keep]
+
+def hist_data(values: pd.Series, bins: int = 50) -> Tuple[np.ndarray, np.ndarray]:
+    return np.histogram(values.dropna().to_numpy(dtype=float), bins=bins)
+
+def _stored_digest(path: Path) -> Optional[str]:
+    if not path.exists():
+        return None
+    from PIL import Image
+    try:
+        with Image.open(path) as im:
+            return im.text.get(HASH_KEY)
+    except (OSError, ValueError):      # unreadable/truncated PNG: redraw it
+        return None
+
+def render_chart(spec: ChartSpec, force: bool = False) -> bool:
+    """Draw `spec` with the Agg canvas (no pyplot state). Returns False if the cached PNG was reused."""
+    digest = spec.digest()
+    if not force and _stored_digest(spec.path) == digest:
+        return False
+
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    for label, (x, y) in spec.lines.items():
+        ax.plot(x, y, label=label)
+    if spec.hist is not None:
+        counts, edges = spec.hist
+        ax.stairs(counts, edges, fill=True)
+        ax.grid(True)
+    ax.set_title(spec.title)
+    ax.set_xlabel(spec.xlabel)
+    ax.set_ylabel(spec.ylabel)
+    if spec.legend:
+        ax.legend()
+    if spec.lines:
+        fig.autofmt_xdate()
+    fig.tight_layout()
+    spec.path.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(spec.path, dpi=spec.dpi, metadata={HASH_KEY: digest})
+    return True
+
+def render_charts(specs: Sequence[ChartSpec], workers: int = 1, force: bool = False) -> List[bool]:
+    """Render many charts, optionally across a process pool; order of results follows `specs`."""
+    if workers > 1 and len(specs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            return list(ex.map(render_chart, specs, [force] * len(specs)))
+    return [render_chart(s, force) for s in specs]
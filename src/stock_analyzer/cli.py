@@ -4,9 +4,8 @@ from __future__ import annotations
 import argparse
 from pathlib import Path
 
-from .data import fetch_prices
-from .report import write_report
-from .news import fetch_news_counts_for_ticker
+# Heavy stages (yfinance, matplotlib, GoogleNews) are imported inside main()
+# right before they run, so `stock-analyzer --help` stays fast.
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -38,6 +37,16 @@ def build_parser() -> argparse.ArgumentParser:
     p.add_argument("--interval", default="1d", help="Price data interval [default: 1d]")
     p.add_argument("-o", "--out", default="out", help="Output directory [default: out]")
     p.add_argument("--rf", type=float, default=0.0, help="Risk-free rate")
+    p.add_argument(
+        "--bootstrap",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Bootstrap N return paths for metric confidence intervals [default: off]",
+    )
+    p.add_argument("--ci-level", type=float, default=0.95, help="Confidence level [default: 0.95]")
+    p.add_argument("--seed", type=int, default=0, help="Bootstrap random seed [default: 0]")
+    p.add_argument("--bootstrap-workers", type=int, default=1, help="Processes for bootstrap [default: 1]")
 
     # ---- 뉴스 관련 옵션 ----
     p.add_argument(
@@ -48,6 +57,16 @@ def build_parser() -> argparse.ArgumentParser:
     p.add_argument("--news-start", help="News start date (YYYY-MM-DD)")
     p.add_argument("--news-end", help="News end date (YYYY-MM-DD)")
     p.add_argument("--news-dir", default="raw/news_data", help="News CSV output dir")
+    p.add_argument(
+        "--news-index",
+        metavar="DIR",
+        help="Count articles from a local news index (stock-news-index) instead of crawling Google News",
+    )
+    p.add_argument(
+        "--news-sessions-only",
+        action="store_true",
+        help="Crawl trading sessions (NYSE calendar) only, skipping weekends/holidays",
+    )
     
     # 구글 뉴스 크롤링은 차단 위험이 있으므로 끄고 켤 수 있게 옵션 추가
     p.add_argument(
@@ -56,30 +75,67 @@ def build_parser() -> argparse.ArgumentParser:
         help="Skip news crawling step (useful if you already have the data)"
     )
 
+    # 차트 3종을 프로세스 풀에서 렌더링
+    p.add_argument(
+        "--chart-workers",
+        type=int,
+        default=1,
+        help="Processes for rendering the report charts [default: 1]",
+    )
+
+    # 단계별 시간/메모리 측정
+    p.add_argument(
+        "--profile",
+        action="store_true",
+        help="Record per-stage time and memory to <out>/profile.json",
+    )
+    p.add_argument(
+        "--cprofile",
+        action="store_true",
+        help="With --profile, also dump cProfile stats of the slowest stage",
+    )
+    p.add_argument(
+        "--profile-time-only",
+        action="store_true",
+        help="With --profile, skip tracemalloc (it ~triples stage wall time) so times are undistorted",
+    )
+
     return p
 
 
 def main() -> None:
     args = build_parser().parse_args()
 
+    from .profiling import Profiler
+    prof = Profiler(enabled=args.profile, cprofile=args.cprofile, command="stock-analyzer",
+                    memory=not args.profile_time_only)
+    ticker = args.ticker.upper()
+
     # 1) 주가 데이터 가져오기
+    with prof.stage("import"):
+        from .data import fetch_prices
+
+    with prof.stage("fetch", ticker):
+        if args.range:
+            start, end = args.range
+            df = fetch_prices(
+                args.ticker,
+                period=None,
+                interval=args.interval,
+                start=start,
+                end=end,
+            )
+        else:
+            df = fetch_prices(
+                args.ticker,
+                period=args.period,
+                interval=args.interval,
+            )
+
     if args.range:
-        start, end = args.range
-        df = fetch_prices(
-            args.ticker,
-            period=None,
-            interval=args.interval,
-            start=start,
-            end=end,
-        )
         label = f"{args.ticker.upper()}_{start}_to_{end}"
         price_start, price_end = start, end
     else:
-        df = fetch_prices(
-            args.ticker,
-            period=args.period,
-            interval=args.interval,
-        )
         label = f"{args.ticker.upper()}_{args.period}_{args.interval}"
         price_start = df.index.min().strftime("%Y-%m-%d")
         price_end = df.index.max().strftime("%Y-%m-%d")
@@ -87,15 +143,49 @@ def main() -> None:
     out_dir = Path(args.out)
     out_dir.mkdir(parents=True, exist_ok=True)
 
+    with prof.stage("import"):
+        from .report import write_report
+        from .bootstrap import BootstrapConfig
+        from .resample import periods_per_year
+
+    bootstrap = None
+    if args.bootstrap:
+        bootstrap = BootstrapConfig(
+            n_paths=args.bootstrap,
+            level=args.ci_level,
+            seed=args.seed,
+            workers=args.bootstrap_workers,
+        )
+
     report_path = write_report(
         df,
         out_dir,
         dataset_name=label,
         risk_free_rate_annual=args.rf,
+        bootstrap=bootstrap,
+        chart_workers=args.chart_workers,
+        profiler=prof,
+        periods_per_year=periods_per_year(args.interval),
     )
 
     # 2) 뉴스 크롤링 (옵션)
-    if not args.skip_news:
+    if not args.skip_news and args.news_index:
+        from .newsindex import local_news_counts
+
+        news_start = args.news_start or price_start
+        news_end = args.news_end or price_end
+        with prof.stage("news", ticker):
+            news_df = local_news_counts(query=args.news_query, start=news_start, end=news_end,
+                                        index_dir=args.news_index)
+            safe_query = args.news_query.replace(" ", "_").replace("/", "_")
+            news_path = Path(args.news_dir) / f"{safe_query}_news_counts_{news_start}_to_{news_end}.csv"
+            news_path.parent.mkdir(parents=True, exist_ok=True)
+            news_df.to_csv(news_path, index=False)
+        print(f"📚 Local news index: {int(news_df['count'].sum())} articles for '{args.news_query}'")
+        print(f"   News CSV     : {news_path.resolve()}")
+    elif not args.skip_news:
+        from .news import fetch_news_counts_for_ticker
+
         news_start = args.news_start or price_start
         news_end = args.news_end or price_end
 
@@ -105,12 +195,14 @@ def main() -> None:
         print("   Note: This may take a while. Press Ctrl+C to stop safely.")
         print("="*40 + "\n")
 
-        news_df, news_path = fetch_news_counts_for_ticker(
-            query=args.news_query,
-            start=news_start,
-            end=news_end,
-            out_dir=args.news_dir,
-        )
+        with prof.stage("news", ticker):
+            news_df, news_path = fetch_news_counts_for_ticker(
+                query=args.news_query,
+                start=news_start,
+                end=news_end,
+                out_dir=args.news_dir,
+                sessions_only=args.news_sessions_only,
+            )
         
         print(f"   News CSV     : {news_path.resolve()}")
     else:
@@ -122,6 +214,10 @@ def main() -> None:
     print(f"   Price output : {out_dir.resolve()}")
     print(f"   Report       : {report_path.resolve()}")
 
+    profile_path = prof.write(out_dir)
+    if profile_path:
+        print(f"   Profile      : {profile_path.resolve()}")
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,10 +1,15 @@
 from __future__ import annotations
 import argparse
-from typing import List, Dict, Any
-import pandas as pd
-from .data import fetch_prices
-from .analysis import compute_indicators, performance_summary
-from .export import save_artifacts
+from pathlib import Path
+from typing import Dict, TYPE_CHECKING
+
+# pandas/yfinance and the analysis stack load in main(), not at import time,
+# so argument parsing never pays for them.
+if TYPE_CHECKING:
+    import pandas as pd
+
+# names of export.BACKENDS, spelled out so building the parser doesn't import pandas
+EXPORT_FORMATS = ("parquet", "parquet-zstd", "parquet-snappy", "feather", "feather-zstd", "npz", "csv")
 
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(
@@ -18,11 +23,39 @@ def build_parser() -> argparse.ArgumentParser:
                    help="yfinance period (e.g., 1y, 3y, 5y, 10y, max) [default: 5y]")
     g.add_argument("--range", nargs=2, metavar=("START","END"),
                    help="YYYY-MM-DD YYYY-MM-DD")
-    p.add_argument("--interval", default="1d", help="1d, 1wk, 1mo")
+    p.add_argument("--interval", default="1d",
+                   help="1m, 5m, 15m, 1h, 1d, 1wk, 1mo; metrics are annualized for the interval")
     p.add_argument("-o", "--out", default="out", help="Output directory (default: out)")
     p.add_argument("--rf", type=float, default=0.0, help="Annual risk-free rate (decimal)")
-    p.add_argument("--format", choices=["parquet","csv"], default="parquet",
-                   help="Output table format (default: parquet)")
+    p.add_argument("--format", choices=EXPORT_FORMATS, default="parquet",
+                   help="Output table format/compression (default: parquet); compare with stock-bench --artifacts")
+    p.add_argument("--row-group-size", type=int, default=None,
+                   help="Rows per Parquet row group / Arrow batch (default: backend's own)")
+    p.add_argument("--bootstrap", type=int, default=0, metavar="N",
+                   help="Bootstrap N return paths for metric confidence intervals (default: off)")
+    p.add_argument("--ci-level", type=float, default=0.95, help="Confidence level (default: 0.95)")
+    p.add_argument("--seed", type=int, default=0, help="Bootstrap random seed (default: 0)")
+    p.add_argument("--bootstrap-workers", type=int, default=1,
+                   help="Processes for bootstrap resampling (default: 1)")
+    p.add_argument("--workers", type=int, default=1,
+                   help="Processes for per-ticker indicators/performance (default: 1 = in-process)")
+    p.add_argument("--cross-section", action="store_true",
+                   help="Also write per-date ranks/percentiles/z-scores across tickers (cross_section table)")
+    p.add_argument("--charts", action="store_true",
+                   help="Also write a report with charts per ticker under <out>/reports/<TICKER>/")
+    p.add_argument("--chart-workers", type=int, default=None,
+                   help="With --charts, processes rendering every ticker's charts together (default: CPU count)")
+    p.add_argument("--quality", choices=["off", "warn", "fail"], default="warn",
+                   help="Data-quality checks on each fetch: warn (report, default), "
+                        "fail (abort on errors), off")
+    p.add_argument("--repair", action="store_true",
+                   help="Apply quality.repair_prices fixes instead of a plain forward fill")
+    p.add_argument("--profile", action="store_true",
+                   help="Record per-stage/per-ticker time and memory to <out>/profile.json")
+    p.add_argument("--cprofile", action="store_true",
+                   help="With --profile, also dump cProfile stats of the slowest stage")
+    p.add_argument("--profile-time-only", action="store_true",
+                   help="With --profile, skip tracemalloc (it ~triples stage wall time) so times are undistorted")
     return p
 
 def _tidy_prices(df: pd.DataFrame) -> pd.DataFrame:
@@ -52,44 +85,135 @@ def _tidy_returns(df_ind: pd.DataFrame, ticker: str) -> pd.DataFrame:
 
 def main():
     args = build_parser().parse_args()
+
+    from .profiling import Profiler
+    prof = Profiler(enabled=args.profile, cprofile=args.cprofile, command="stock-parse",
+                    memory=not args.profile_time_only)
+
+    with prof.stage("import"):
+        from .data import fetch_prices
+        from .analysis import compute_indicators, _get_close
+        from .bootstrap import BootstrapConfig
+        from .export import ArtifactWriter, write_run_meta
+        from .portfolio import close_panel, panel_performance, to_perf_rows, attach_ci
+        from .cross_section import iter_tidy
+        from .resample import periods_per_year
+        from .quality import validate_prices, repair_prices, check_policy, write_quality
+        from .parallel import PoolStats, analyze_parallel
+        from .sketch import QuantileSketch, write_distribution
     tickers = [t.strip().upper() for t in args.tickers.split(",") if t.strip()]
+    bars_per_year = periods_per_year(args.interval)
+    cfg = None
+    if args.bootstrap:
+        cfg = BootstrapConfig(n_paths=args.bootstrap, level=args.ci_level,
+                              seed=args.seed, workers=args.bootstrap_workers)
 
-    prices_all = []
-    indicators_all = []
-    returns_all = []
-    perf_rows: List[Dict[str, Any]] = []
-
-    for t in tickers:
-        if args.range:
-            start, end = args.range
-            raw = fetch_prices(t, period=None, interval=args.interval, start=start, end=end)
-        else:
-            raw = fetch_prices(t, period=args.period, interval=args.interval)
-
-        ind = compute_indicators(raw)
-        perf = performance_summary(raw, risk_free_rate_annual=args.rf)
-
-        prices_all.append(_tidy_prices(raw).assign(Ticker=t))
-        indicators_all.append(_tidy_indicators(ind, t))
-        returns_all.append(_tidy_returns(ind, t))
-        perf_rows.append({"ticker": t, **perf.to_dict()})
-
-    prices = pd.concat(prices_all).sort_index()
-    indicators = pd.concat(indicators_all).sort_index()
-    returns = pd.concat(returns_all).sort_index()
-
-    save_artifacts(
-        prices=prices,
-        indicators=indicators,
-        returns=returns,
-        perf_rows=perf_rows,
-        out_dir=args.out,
-        fmt=args.format,
-    )
+    closes: Dict[str, pd.Series] = {}   # --cross-section only: one close column per ticker
+    reports = []
+    sketches: Dict[str, QuantileSketch] = {}   # 수익률 분포 요약 (티커별, 병합 가능)
+    charts = None                              # --charts: 티커별 리포트, 차트는 마지막에 한 번에 렌더링
+    if args.charts:
+        from .report import UniverseReport
+        charts = UniverseReport(Path(args.out) / "reports", risk_free_rate_annual=args.rf, bootstrap=cfg,
+                                periods_per_year=bars_per_year, profiler=prof)
+
+    def fetched():
+        for t in tickers:
+            with prof.stage("fetch", t):
+                if args.range:
+                    start, end = args.range
+                    raw = fetch_prices(t, period=None, interval=args.interval, start=start, end=end, fill=False)
+                else:
+                    raw = fetch_prices(t, period=args.period, interval=args.interval, fill=False)
+
+            with prof.stage("quality", t):
+                report = validate_prices(raw, ticker=t, interval=args.interval) if args.quality != "off" else None
+                if report is not None:
+                    reports.append(report)
+                    try:
+                        for msg in check_policy([report], args.quality):
+                            print(f"⚠️  Quality {msg}")
+                    except ValueError as e:
+                        write_quality(reports, args.out)
+                        raise SystemExit(f"❌ {e}")
+                raw = repair_prices(raw, report) if args.repair else raw.sort_index().ffill()
+            yield t, raw
+
+    def analyzed():
+        for t, raw in fetched():
+            with prof.stage("indicators", t):
+                ind = compute_indicators(raw)
+            # same numbers as the all-tickers panel: every metric is per column
+            with prof.stage("performance", t):
+                perf_rows = to_perf_rows(panel_performance(_get_close(raw).to_frame(t), risk_free_rate_annual=args.rf,
+                                                           periods_per_year=bars_per_year))
+            yield t, raw, ind, perf_rows
+
+    # --workers > 1: 지표/성과 계산은 프로세스 풀에서 (가격 -> 공유 메모리 -> 지표), 순서는 티커 순서 그대로
+    pool_stats = PoolStats(args.workers) if args.workers > 1 else None
+    if pool_stats is not None:
+        results = analyze_parallel(fetched(), args.workers, rf=args.rf, periods_per_year=bars_per_year,
+                                   stats=pool_stats)
+    else:
+        results = analyzed()
+
+    # stock-serve 가 기간 지정 성과를 같은 rf / 연환산 기준으로 다시 계산할 수 있도록 기록
+    write_run_meta(args.out, command="stock-parse", interval=args.interval,
+                   periods_per_year=bars_per_year, risk_free_rate_annual=args.rf)
+
+    # 티커 하나씩 처리 후 바로 기록하고 버림 -> 최대 메모리 ~ 티커 1개 분량 (--workers N 이면 ~2N개)
+    with ArtifactWriter(args.out, fmt=args.format, row_group_size=args.row_group_size) as writer:
+        for t, raw, ind, perf_rows in results:
+            close = _get_close(raw).to_frame(t)
+            if cfg is not None:
+                with prof.stage("bootstrap", t):
+                    attach_ci(perf_rows, close, cfg, risk_free_rate_annual=args.rf, periods_per_year=bars_per_year)
+
+            with prof.stage("export", t):
+                writer.write("prices", _tidy_prices(raw).assign(Ticker=t))
+                writer.write("indicators", _tidy_indicators(ind, t))
+                writer.write("returns", _tidy_returns(ind, t))
+                for row in perf_rows:
+                    writer.add_perf(row)
+            sketches[t] = QuantileSketch().update(ind["RET_DAILY"])
+            if charts is not None:
+                charts.add(raw, t, indicators=ind)
+            if args.cross_section:
+                closes[t] = close[t]
+            del raw, ind, close
+
+        # 횡단면 테이블도 날짜 블록 단위로 바로 기록 (전체 long 테이블을 메모리에 만들지 않음)
+        if args.cross_section:
+            with prof.stage("cross_section"):
+                panel = close_panel(closes)
+                closes.clear()
+                for block in iter_tidy(panel):
+                    writer.write("cross_section", block)
+                del panel
+
+    if charts is not None:
+        charts.render(args.chart_workers)
+
+    with prof.stage("distribution"):
+        dist_path = write_distribution(sketches, args.out)
+    quality_path = write_quality(reports, args.out) if reports else None
+    profile_path = prof.write(args.out)
 
     print("✅ Parse & analysis complete")
     print(f"   Tickers : {', '.join(tickers)}")
     print(f"   Output  : {args.out}")
+    print(f"   Tails   : {dist_path} (VaR/CVaR per ticker and merged)")
+    if charts is not None:
+        print(f"   Reports : {Path(args.out) / 'reports'} ({len(charts.specs)} charts)")
+    if quality_path:
+        n_bad = sum(r.status != "ok" for r in reports)
+        print(f"   Quality : {quality_path} ({n_bad} of {len(reports)} ticker(s) flagged)")
+    if pool_stats is not None:
+        print(f"   Workers : {args.workers}")
+        for line in pool_stats.lines():
+            print(f"     {line}")
+    if profile_path:
+        print(f"   Profile : {profile_path}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,215 @@
+from __future__ import annotations
+from typing import Dict, Iterable, Iterator, Optional
+import numpy as np
+import pandas as pd
+
+# Per-date views across the ticker universe, computed on the (dates x tickers)
+# close panel from portfolio.close_panel. Tickers that aren't listed on a date
+# (NaN close) are left out of that date's ranking and statistics, and every
+# feature is NaN there. The per-date stats only look at their own row, so the
+# long export (`iter_tidy`) is produced a block of dates at a time: only the
+# feature arrays are held for the whole panel, never the 16 stat panels.
+
+FEATURES = ("RET", "RSI14", "VOL21", "MOM")
+STATS = ("RANK", "PCT", "Z")
+
+def rsi_panel(closes: pd.DataFrame, period: int = 14) -> pd.DataFrame:
+    """
+    indicators.rsi for every column, stepping the Wilder recursion one date
+    at a time across all tickers. Days without a close are skipped, so each
+    column equals rsi(close.dropna()).
+    """
+    return pd.DataFrame(_rsi(closes.to_numpy(dtype=float), period), index=closes.index, columns=closes.columns)
+
+def _rsi(c: np.ndarray, period: int) -> np.ndarray:
+    alpha = 1.0 / period
+    gain = np.full(c.shape[1], np.nan)
+    loss = np.full(c.shape[1], np.nan)
+    prev = np.full(c.shape[1], np.nan)
+    out = np.full(c.shape, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for i in range(len(c)):
+            row = c[i]
+            delta = row - prev
+            ok = np.isfinite(delta)
+            up, down = np.maximum(delta, 0.0), np.maximum(-delta, 0.0)
+            seed = ok & np.isnan(gain)
+            gain = np.where(seed, up, np.where(ok, gain + alpha * (up - gain), gain))
+            loss = np.where(seed, down, np.where(ok, loss + alpha * (down - loss), loss))
+            out[i] = np.where(np.isfinite(row) & (loss != 0), 100 - 100 / (1 + gain / loss), np.nan)
+            prev = np.where(np.isfinite(row), row, prev)
+    return out
+
+def _rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    # Column-wise rolling std (ddof=1) from cumulative sums, NaN unless the
+    # whole window is valid -- same as DataFrame.rolling(window).std().
+    valid = np.isfinite(x)
+    shift = np.nanmean(np.where(valid, x, np.nan), axis=0) if valid.any() else np.zeros(x.shape[1])
+    xc = np.where(valid, x - np.nan_to_num(shift), 0.0)
+    out = np.full(x.shape, np.nan)
+    if len(x) < window:
+        return out
+    def wsum(a):
+        cs = np.cumsum(a, axis=0)
+        cs = np.vstack([np.zeros((1, a.shape[1])), cs])
+        return cs[window:] - cs[:-window]
+    n, s1, s2 = wsum(valid.astype(float)), wsum(xc), wsum(xc * xc)
+    var = np.maximum((s2 - s1 * s1 / window) / (window - 1), 0.0)
+    out[window - 1:] = np.where(n == window, np.sqrt(var), np.nan)
+    return out
+
+def _ffill(c: np.ndarray) -> np.ndarray:
+    idx = np.where(np.isfinite(c), np.arange(len(c))[:, None], 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    return np.take_along_axis(c, idx, axis=0)
+
+def _shift(a: np.ndarray, k: int) -> np.ndarray:
+    out = np.full(a.shape, np.nan)
+    if k < len(a):
+        out[k:] = a[:len(a) - k]
+    return out
+
+def feature_arrays(
+    closes: pd.DataFrame,
+    rsi_period: int = 14,
+    vol_window: int = 21,
+    momentum: tuple = (252, 21),
+) -> Dict[str, np.ndarray]:
+    """`feature_panels` as plain (dates x tickers) arrays."""
+    c = closes.to_numpy(dtype=float)
+    unlisted = np.isnan(c)
+    filled = _ffill(c)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ret = c / _shift(filled, 1) - 1.0                  # against the previous listed close
+        lookback, skip = momentum
+        mom = _shift(filled, skip) / _shift(filled, lookback) - 1.0
+    del filled
+    vol = _rolling_std(ret, vol_window)
+    vol[unlisted] = np.nan
+    mom[unlisted] = np.nan
+    return {"RET": ret, "RSI14": _rsi(c, rsi_period), "VOL21": vol, "MOM": mom}
+
+def feature_panels(
+    closes: pd.DataFrame,
+    rsi_period: int = 14,
+    vol_window: int = 21,
+    momentum: tuple = (252, 21),
+) -> Dict[str, pd.DataFrame]:
+    """
+    (dates x tickers) panels of the screening features:
+      RET   simple return against the previous listed close
+      RSI14 Wilder RSI (indicators.rsi)
+      VOL21 rolling std of RET over `vol_window` rows
+      MOM   close `momentum[1]` rows ago over close `momentum[0]` rows ago, minus 1 (12-1 momentum)
+    """
+    arrays = feature_arrays(closes, rsi_period, vol_window, momentum)
+    return {k: pd.DataFrame(a, index=closes.index, columns=closes.columns) for k, a in arrays.items()}
+
+def rank_rows(x: np.ndarray):
+    """
+    Average-tie ranks (1..n) of each row, ignoring NaN, plus the per-row
+    count of valid values. Matches DataFrame.rank(axis=1) with one argsort per row.
+    """
+    x = np.asarray(x, dtype=float)
+    n_cols = x.shape[1]
+    order = np.argsort(x, axis=1)                      # NaN sorts last; ties are averaged below
+    s = np.take_along_axis(x, order, axis=1)
+    count = np.isfinite(x).sum(axis=1)
+
+    pos = np.broadcast_to(np.arange(n_cols, dtype=float), x.shape)
+    tie = s[:, 1:] == s[:, :-1]
+    if tie.any():
+        new_group = np.ones(x.shape, dtype=bool)
+        new_group[:, 1:] = ~tie
+        end_group = np.ones(x.shape, dtype=bool)
+        end_group[:, :-1] = ~tie
+        start = np.maximum.accumulate(np.where(new_group, pos, 0), axis=1)
+        end = np.minimum.accumulate(np.where(end_group, pos, n_cols)[:, ::-1], axis=1)[:, ::-1]
+        avg = (start + end) / 2.0 + 1.0
+    else:
+        avg = pos + 1.0
+
+    ranks = np.empty(x.shape)
+    np.put_along_axis(ranks, order, avg, axis=1)
+    ranks[~np.isfinite(x)] = np.nan
+    return ranks, count
+
+def _row_stats(x: np.ndarray):
+    ranks, count = rank_rows(x)
+    n = count[:, None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pct = ranks / n
+        mean = np.nanmean(x, axis=1, keepdims=True) if n.all() else np.nansum(x, axis=1, keepdims=True) / n
+        dev = x - mean
+        var = np.nansum(dev * dev, axis=1, keepdims=True) / (n - 1)
+        z = np.where(var > 0, dev / np.sqrt(var), np.nan)
+    return ranks, pct, z
+
+def cross_section_stats(panel: pd.DataFrame, chunk_rows: int = 256) -> Dict[str, pd.DataFrame]:
+    """
+    Per-date RANK (1 = lowest), PCT (rank / count, like rank(pct=True)) and
+    Z (row z-score, ddof=1). Rows are processed `chunk_rows` dates at a time
+    so the sort temporaries stay small for wide universes.
+    """
+    x = panel.to_numpy(dtype=float)
+    out = {k: np.empty(x.shape) for k in STATS}
+    for lo in range(0, len(x), chunk_rows):
+        for k, a in zip(STATS, _row_stats(x[lo:lo + chunk_rows])):
+            out[k][lo:lo + chunk_rows] = a
+    return {k: pd.DataFrame(a, index=panel.index, columns=panel.columns) for k, a in out.items()}
+
+def cross_section(
+    closes: pd.DataFrame,
+    features: Optional[Iterable[str]] = None,
+    **feature_kwargs,
+) -> Dict[str, pd.DataFrame]:
+    """Feature panels plus their per-date stats, keyed "RET", "RET_RANK", "RET_PCT", "RET_Z", ..."""
+    panels = feature_panels(closes, **feature_kwargs)
+    out: Dict[str, pd.DataFrame] = {}
+    for name in features or FEATURES:
+        out[name] = panels[name]
+        for stat, frame in cross_section_stats(panels[name]).items():
+            out[f"{name}_{stat}"] = frame
+    return out
+
+def to_tidy(panels: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Long (date, Ticker) table in the layout of the other exported tables:
+    `date` index, one column per panel and a Ticker column. (date, ticker)
+    cells that are NaN in every panel (not listed) are dropped.
+    """
+    first = next(iter(panels.values()))
+    return _tidy({k: p.to_numpy(dtype=float) for k, p in panels.items()},
+                 first.index.values, np.asarray(first.columns, dtype=object))
+
+def _tidy(arrays: Dict[str, np.ndarray], dates: np.ndarray, tickers: np.ndarray) -> pd.DataFrame:
+    keep = np.zeros(next(iter(arrays.values())).shape, dtype=bool)
+    for a in arrays.values():
+        keep |= np.isfinite(a)
+    mask = keep.ravel()
+    data = {name: a.ravel()[mask] for name, a in arrays.items()}
+    data["Ticker"] = np.tile(tickers, len(dates))[mask]
+    return pd.DataFrame(data, index=pd.DatetimeIndex(np.repeat(dates, len(tickers))[mask], name="date"))
+
+def iter_tidy(
+    closes: pd.DataFrame,
+    features: Optional[Iterable[str]] = None,
+    chunk_rows: int = 256,
+    **feature_kwargs,
+) -> Iterator[pd.DataFrame]:
+    """
+    `to_tidy(cross_section(closes))` in blocks of `chunk_rows` dates, for
+    writing straight to an ArtifactWriter: memory is the feature arrays plus
+    one block, instead of every feature x stat panel and the whole long table.
+    """
+    arrays = feature_arrays(closes, **feature_kwargs)
+    names = list(features or FEATURES)
+    dates, tickers = closes.index.values, np.asarray(closes.columns, dtype=object)
+    for lo in range(0, len(dates), chunk_rows):
+        block: Dict[str, np.ndarray] = {}
+        for name in names:
+            x = arrays[name][lo:lo + chunk_rows]
+            block[name] = x
+            for stat, a in zip(STATS, _row_stats(x)):
+                block[f"{name}_{stat}"] = a
+        yield _tidy(block, dates[lo:lo + chunk_rows], tickers)
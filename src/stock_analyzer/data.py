@@ -66,10 +66,12 @@ def fetch_prices(
     interval: str = "1d",
     start: Optional[str] = None,
     end: Optional[str] = None,
+    fill: bool = True,
 ) -> pd.DataFrame:
     """
     Returns OHLCV with guaranteed 'Adj Close' present.
     We use auto_adjust=True so 'Close' is already adjusted; we then mirror it to 'Adj Close'.
+    fill=False skips the forward fill (quality.validate_prices wants the raw bars).
     """
     kwargs = dict(interval=interval, progress=False, group_by="column", auto_adjust=True)
     if start or end:
@@ -92,7 +94,8 @@ def fetch_prices(
         df["Adj Close"] = df["Close"]
 
     # Forward-fill occasional gaps
-    df = df.ffill()
+    if fill:
+        df = df.ffill()
 
     # Tag ticker
     df["Ticker"] = ticker.upper()
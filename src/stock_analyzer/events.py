@@ -0,0 +1,209 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, Mapping, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Event study: does a news spike (or an extreme-sentiment day) move the price
+# beyond what the market explains? Abnormal returns come from a market model
+# fitted on an estimation window before each event; all event windows of all
+# tickers are gathered from one strided view instead of looping per event.
+
+@dataclass
+class EventWindow:
+    pre: int = 5              # event window [-pre, +post] around the event bar
+    post: int = 10
+    est_len: int = 120        # estimation window length ...
+    est_gap: int = 10         # ... ending this many bars before the event window
+
+    @property
+    def span(self) -> int:
+        return self.est_len + self.est_gap + self.pre + 1 + self.post
+
+    @property
+    def offset(self) -> int:
+        # position of the event bar inside the full (estimation + event) window
+        return self.est_len + self.est_gap + self.pre
+
+def detect_events(
+    values: pd.Series,
+    method: str = "zscore",
+    threshold: float = 3.0,
+    lookback: int = 60,
+    min_gap: int = 0,
+) -> pd.DataFrame:
+    """
+    Event days in a daily series (e.g. news_count or news_sentiment).
+
+    method="zscore": value is more than `threshold` trailing std devs above
+    the trailing `lookback`-bar mean (spikes; yesterday and before only).
+    method="abs_zscore": same, either direction (extreme sentiment days).
+    method="quantile": value above the `threshold` quantile (e.g. 0.99) of the series.
+    Events within `min_gap` bars after the previous kept event are dropped.
+    """
+    x = values.astype(float)
+    if method in ("zscore", "abs_zscore"):
+        hist = x.shift(1).rolling(lookback, min_periods=max(lookback // 2, 2))
+        mu, sd = hist.mean(), hist.std()
+        z = (x - mu) / sd.where(sd > 0)
+        score = z.abs() if method == "abs_zscore" else z
+        hit = score > threshold
+        sign = np.sign(z)
+    elif method == "quantile":
+        z = x
+        hit = x > x.quantile(threshold)
+        sign = pd.Series(1.0, index=x.index)
+    else:
+        raise ValueError(f"Unknown event method: {method!r}")
+
+    pos = np.flatnonzero(hit.fillna(False).to_numpy())
+    if min_gap and len(pos):
+        # greedy: a hit is kept only if it is more than min_gap past the last kept one
+        keep, last = [], None
+        for p in pos.tolist():
+            if last is None or p - last > min_gap:
+                keep.append(p)
+                last = p
+        pos = np.asarray(keep, dtype=np.int64)
+    return pd.DataFrame({
+        "pos": pos,
+        "value": x.to_numpy()[pos],
+        "score": z.to_numpy()[pos],
+        "sign": sign.to_numpy()[pos],
+    }, index=pd.DatetimeIndex(x.index[pos], name="date"))
+
+def _windows(returns: np.ndarray, market: np.ndarray, tick: np.ndarray, pos: np.ndarray, win: EventWindow):
+    # (dates, tickers) -> strided (n_windows, tickers, span) view, gathered at (start, ticker)
+    start = pos - win.offset
+    r = sliding_window_view(returns, win.span, axis=0)[start, tick]
+    m = sliding_window_view(market, win.span, axis=0)[start]
+    return r, m
+
+def abnormal_returns(
+    returns: np.ndarray,
+    market: Optional[np.ndarray],
+    tick: np.ndarray,
+    pos: np.ndarray,
+    win: EventWindow,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Market-model abnormal returns for every event at once: (n_events, pre+1+post)
+    AR matrix plus per-event alpha and beta (OLS on the estimation window,
+    ignoring NaN bars). Without `market` the mean-adjusted model is used (beta = 0).
+    """
+    mkt = np.zeros(len(returns)) if market is None else market
+    r, m = _windows(returns, mkt, tick, pos, win)
+    est = slice(0, win.est_len)
+    ev = slice(win.offset - win.pre, win.offset + win.post + 1)
+
+    re, me = r[:, est], m[:, est]
+    ok = np.isfinite(re) & np.isfinite(me)
+    n = ok.sum(axis=1)
+    re0, me0 = np.where(ok, re, 0.0), np.where(ok, me, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mr, mm = re0.sum(axis=1) / n, me0.sum(axis=1) / n
+        dm = np.where(ok, me - mm[:, None], 0.0)
+        dr = np.where(ok, re - mr[:, None], 0.0)
+        var_m = (dm * dm).sum(axis=1)
+        beta = np.where(var_m > 0, (dm * dr).sum(axis=1) / var_m, 0.0) if market is not None else np.zeros(len(pos))
+        alpha = mr - beta * mm
+    alpha[n < max(win.est_len // 2, 2)] = np.nan
+    ar = r[:, ev] - (alpha[:, None] + beta[:, None] * m[:, ev])
+    return ar, alpha, beta
+
+@dataclass
+class EventStudyResult:
+    events: pd.DataFrame              # one row per event: ticker, date, value, alpha, beta, car
+    ar: np.ndarray                    # (n_events, pre+1+post) abnormal returns
+    summary: pd.DataFrame             # per relative day: aar, caar, t, caar_lo/hi, p_boot
+    meta: Dict = field(default_factory=dict)
+
+def bootstrap_mean(x: np.ndarray, n_boot: int = 5_000, seed: int = 0,
+                   chunk: int = 500) -> np.ndarray:
+    """
+    (n_boot, columns) bootstrap means of the rows of `x` (events resampled
+    with replacement), as multinomial count vectors times `x`: one matrix
+    product per chunk instead of materialising the resampled rows.
+    """
+    n = len(x)
+    rng = np.random.default_rng(seed)
+    probs = np.full(n, 1.0 / n)
+    out = np.empty((n_boot, x.shape[1]))
+    for lo in range(0, n_boot, chunk):
+        k = min(chunk, n_boot - lo)
+        counts = rng.multinomial(n, probs, size=k).astype(float)
+        out[lo:lo + k] = counts @ x / n
+    return out
+
+def event_study(
+    returns: Union[pd.Series, pd.DataFrame],
+    events: Union[pd.DataFrame, Mapping[str, pd.DataFrame]],
+    market: Optional[pd.Series] = None,
+    window: Optional[EventWindow] = None,
+    n_boot: int = 5_000,
+    level: float = 0.95,
+    seed: int = 0,
+) -> EventStudyResult:
+    """
+    Average (AAR) and cumulative average (CAAR) abnormal returns around events.
+
+    `returns` is one ticker's return series or a (dates x tickers) panel;
+    `events` is `detect_events` output (for a panel: a mapping ticker -> events,
+    with event dates looked up in the panel index). Events too close to either
+    end of the sample for the full window are skipped. Significance: the
+    cross-sectional t statistic and a bootstrap (events resampled) CI and
+    two-sided p-value for CAAR at each relative day.
+    """
+    win = window or EventWindow()
+    panel = returns.to_frame(returns.name or "value") if isinstance(returns, pd.Series) else returns
+    if isinstance(events, pd.DataFrame):
+        events = {panel.columns[0]: events}
+    index = pd.DatetimeIndex(panel.index)
+    r = panel.to_numpy(dtype=float)
+    m = None if market is None else market.reindex(index).to_numpy(dtype=float)
+
+    col = {t: i for i, t in enumerate(panel.columns)}
+    ticks, pos, values = [], [], []
+    for t, ev in events.items():
+        p = index.get_indexer(pd.DatetimeIndex(ev.index))
+        ok = (p >= win.offset) & (p + win.post < len(index))
+        ticks.append(np.full(ok.sum(), col[t]))
+        pos.append(p[ok])
+        values.append(ev["value"].to_numpy()[ok] if "value" in ev else np.full(ok.sum(), np.nan))
+    values = np.concatenate(values) if values else np.array([])
+    tick = np.concatenate(ticks) if ticks else np.array([], dtype=int)
+    pos = np.concatenate(pos) if pos else np.array([], dtype=int)
+    if not len(pos):
+        raise ValueError("No events with a full estimation and event window.")
+
+    ar, alpha, beta = abnormal_returns(r, m, tick.astype(int), pos.astype(int), win)
+    keep = np.isfinite(alpha) & np.isfinite(ar).all(axis=1)
+    ar, alpha, beta, tick, pos, values = ar[keep], alpha[keep], beta[keep], tick[keep], pos[keep], values[keep]
+    car = np.cumsum(ar, axis=1)
+
+    n = len(ar)
+    rel = np.arange(-win.pre, win.post + 1)
+    aar = ar.mean(axis=0)
+    caar = car.mean(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t_stat = caar / (car.std(axis=0, ddof=1) / np.sqrt(n))
+    boot = bootstrap_mean(car, n_boot=n_boot, seed=seed) if n > 1 and n_boot else np.full((1, len(rel)), np.nan)
+    a = (1 - level) / 2
+    lo, hi = np.quantile(boot, [a, 1 - a], axis=0)
+    p_boot = (np.abs(boot - caar) >= np.abs(caar)).mean(axis=0)   # centred: H0 CAAR = 0
+
+    names = np.asarray(panel.columns, dtype=object)
+    ev_frame = pd.DataFrame({
+        "ticker": names[tick],
+        "date": index[pos],
+        "value": values,
+        "alpha": alpha,
+        "beta": beta,
+        "car": car[:, -1],
+    })
+    summary = pd.DataFrame({"aar": aar, "caar": caar, "t": t_stat, "caar_lo": lo, "caar_hi": hi,
+                            "p_boot": p_boot}, index=pd.Index(rel, name="day"))
+    meta = {"n_events": n, "skipped": int((~keep).sum()), "model": "market" if market is not None else "mean",
+            "window": vars(win).copy(), "n_boot": n_boot, "level": level, "seed": seed}
+    return EventStudyResult(events=ev_frame, ar=ar, summary=summary, meta=meta)
@@ -0,0 +1,203 @@
+from __future__ import annotations
+import os
+from pathlib import Path
+from typing import Iterable, Optional, Sequence, Union
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy.linalg import blas as _blas
+except ImportError:          # plain NumPy updates (full matrix, ~5-10x slower per bar)
+    _blas = None
+
+# Exponentially weighted covariance / correlation across a ticker universe,
+# updated bar by bar. Per bar (adjust=False recursion, pandas' bias=True):
+#   d    = x - mean
+#   mean = mean + alpha * d
+#   cov  = (1 - alpha) * (cov + alpha * d d^T)
+# The matrix is kept as cov = scale * S so the (1 - alpha) decay is a scalar
+# multiply; each bar then costs one symmetric rank-1 update of S's lower
+# triangle (a block of bars: one rank-k update).
+#
+# A ticker without a return on a bar contributes no innovation (d = 0) that
+# bar, so its moments simply decay; before its first return it has no moments
+# (NaN). On a panel without gaps the result equals
+# `returns.ewm(alpha=alpha, adjust=False).cov(bias=True)` at the last bar.
+
+RENORMALIZE_BELOW = 1e-100
+
+def ew_alpha(halflife: Optional[float] = None, span: Optional[float] = None,
+             alpha: Optional[float] = None) -> float:
+    """pandas' ewm parametrisation: exactly one of halflife / span / alpha."""
+    if sum(v is not None for v in (halflife, span, alpha)) != 1:
+        raise ValueError("Pass exactly one of halflife, span, alpha.")
+    if halflife is not None:
+        return 1.0 - np.exp(np.log(0.5) / halflife)
+    if span is not None:
+        return 2.0 / (span + 1.0)
+    if not 0.0 < alpha <= 1.0:
+        raise ValueError(f"alpha must be in (0, 1], got {alpha}")
+    return float(alpha)
+
+class EwCovariance:
+    """Streaming EW covariance/correlation of a fixed ticker list."""
+
+    def __init__(self, tickers: Sequence[str], alpha: Optional[float] = None,
+                 halflife: Optional[float] = None, span: Optional[float] = None):
+        self.tickers = list(tickers)
+        self.alpha = ew_alpha(halflife, span, alpha)
+        n = len(self.tickers)
+        self.mean = np.full(n, np.nan)
+        self.count = np.zeros(n, dtype=np.int64)
+        self.S = np.zeros((n, n))            # lower triangle holds cov / scale
+        self.scale = 1.0
+        self.bars = 0
+        self.last: Optional[pd.Timestamp] = None
+        self._lower: Optional[np.ndarray] = None   # cached lower-triangle mask for read-out
+
+    def _innovations(self, X: np.ndarray) -> np.ndarray:
+        # Runs the mean recursion over the rows of X; returns the d rows.
+        D = np.zeros_like(X)
+        a = self.alpha
+        for k, x in enumerate(X):
+            ok = np.isfinite(x)
+            new = ok & (self.count == 0)
+            self.mean[new] = x[new]
+            d = np.where(ok, x - self.mean, 0.0)
+            d[new] = 0.0
+            self.mean += a * d
+            self.count += ok
+            D[k] = d
+        return D
+
+    def update_many(self, X: Union[np.ndarray, pd.DataFrame]) -> None:
+        """Feed a block of bars (rows) at once: one rank-k update of the matrix."""
+        if isinstance(X, pd.DataFrame):
+            if len(X):
+                self.last = pd.Timestamp(X.index[-1])
+            X = X.reindex(columns=self.tickers).to_numpy(dtype=float)
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        decay = 1.0 - self.alpha
+        if decay == 0.0:                      # alpha = 1: no memory, cov is 0 after every bar
+            self._innovations(X)
+            self.S[:] = 0.0
+            self.scale = 1.0
+            self.bars += len(X)
+            return
+        # sub-blocks short enough that decay**k stays above RENORMALIZE_BELOW
+        # inside each one (a short halflife underflows within a few hundred bars)
+        step = max(int(np.log(RENORMALIZE_BELOW) / np.log(decay)), 1)
+        for lo in range(0, len(X), step):
+            self._update_block(X[lo:lo + step], decay)
+
+    def _update_block(self, X: np.ndarray, decay: float) -> None:
+        if not len(X):
+            return
+        if self.scale * decay ** len(X) < RENORMALIZE_BELOW:
+            self.S *= self.scale
+            self.scale = 1.0
+        D = self._innovations(X)
+        # bar k (1-based) adds alpha*(1-alpha)/scale_k * d d^T, scale_k = scale*(1-alpha)^k
+        scales = self.scale * decay ** np.arange(1, len(X) + 1)
+        w = self.alpha * decay / scales
+        self.scale = float(scales[-1])
+        self.bars += len(X)
+        if len(X) == 1:
+            if _blas is not None:
+                _blas.dsyr(w[0], D[0], a=self.S.T, overwrite_a=1)
+            else:
+                self.S += w[0] * np.outer(D[0], D[0])
+            return
+        A = D * np.sqrt(w)[:, None]
+        if _blas is not None:
+            _blas.dsyrk(1.0, A, beta=1.0, c=self.S.T, trans=1, overwrite_c=1)
+        else:
+            self.S += A.T @ A
+
+    def update(self, x: Union[np.ndarray, pd.Series], date=None) -> None:
+        """Feed one bar: a return per ticker (NaN = no return)."""
+        if isinstance(x, pd.Series):
+            x = x.reindex(self.tickers).to_numpy(dtype=float)
+        self.update_many(np.asarray(x, dtype=float)[None, :])
+        if date is not None:
+            self.last = pd.Timestamp(date)
+
+    def cov_array(self) -> np.ndarray:
+        if self._lower is None or len(self._lower) != len(self.S):
+            self._lower = np.tri(len(self.S), dtype=bool)
+        cov = self.S.T.copy()                       # upper triangle from the transpose ...
+        np.copyto(cov, self.S, where=self._lower)   # ... lower (and diagonal) as stored
+        cov *= self.scale
+        seen = self.count > 0
+        cov[~seen, :] = np.nan
+        cov[:, ~seen] = np.nan
+        return cov
+
+    def corr_array(self) -> np.ndarray:
+        corr = self.cov_array()
+        sd = np.sqrt(np.diag(corr))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            inv = np.where(sd > 0, 1.0 / sd, np.nan)
+        corr *= inv[:, None]
+        corr *= inv
+        return np.clip(corr, -1.0, 1.0, out=corr)
+
+    def cov(self, annualize: bool = False, periods_per_year: int = 252) -> pd.DataFrame:
+        cov = self.cov_array()
+        if annualize:
+            cov = cov * periods_per_year
+        return pd.DataFrame(cov, index=self.tickers, columns=self.tickers)
+
+    def corr(self) -> pd.DataFrame:
+        return pd.DataFrame(self.corr_array(), index=self.tickers, columns=self.tickers)
+
+    def save(self, path: Union[str, Path]) -> Path:
+        """Checkpoint the full state to an .npz (written to a temp file, then renamed)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, tickers=np.asarray(self.tickers, dtype=str), alpha=self.alpha, mean=self.mean,
+                     count=self.count, S=self.S, scale=self.scale, bars=self.bars,
+                     last=np.datetime64(self.last, "ns") if self.last is not None else np.datetime64("NaT"))
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "EwCovariance":
+        with np.load(path, allow_pickle=False) as z:
+            est = cls(z["tickers"].tolist(), alpha=float(z["alpha"]))
+            est.mean = z["mean"].copy()
+            est.count = z["count"].copy()
+            est.S = np.ascontiguousarray(z["S"])
+            est.scale = float(z["scale"])
+            est.bars = int(z["bars"])
+            last = z["last"][()]
+            est.last = None if np.isnat(last) else pd.Timestamp(last)
+        return est
+
+def ew_covariance(returns: pd.DataFrame, alpha: Optional[float] = None, halflife: Optional[float] = None,
+                  span: Optional[float] = None, block: int = 64,
+                  state: Optional[EwCovariance] = None) -> EwCovariance:
+    """
+    Run a (dates x tickers) return panel through an estimator, `block` bars
+    per update. Pass `state` (e.g. a loaded checkpoint) to continue it with
+    the rows after its last date.
+    """
+    if state is None:
+        state = EwCovariance(returns.columns, alpha=alpha, halflife=halflife, span=span)
+    elif state.last is not None:
+        returns = returns[returns.index > state.last]
+    for lo in range(0, len(returns), block):
+        state.update_many(returns.iloc[lo:lo + block])
+    return state
+
+def iter_ew_corr(returns: pd.DataFrame, est: EwCovariance,
+                 dates: Optional[Iterable] = None):
+    """Yield (date, correlation frame) after every bar (or only at `dates`)."""
+    wanted = None if dates is None else set(pd.DatetimeIndex(dates))
+    values = returns.reindex(columns=est.tickers).to_numpy(dtype=float)
+    for date, x in zip(returns.index, values):
+        est.update(x, date=date)
+        if wanted is None or date in wanted:
+            yield date, est.corr()
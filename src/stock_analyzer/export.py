@@ -1,29 +1,289 @@
 from __future__ import annotations
 from pathlib import Path
-from typing import Literal, Dict, Any, List
+from dataclasses import dataclass, replace
+from typing import Dict, Any, List, Optional
 import json
+import numpy as np
 import pandas as pd
 
-def _save_table(df: pd.DataFrame, path: Path, fmt: Literal["parquet","csv"]) -> None:
+@dataclass(frozen=True)
+class Backend:
+    """How a table is stored: file suffix, codec and (Parquet/Arrow) rows per row group / batch."""
+    ext: str
+    compression: Optional[str] = None
+    level: Optional[int] = None
+    row_group_size: Optional[int] = None
+
+# `--format` choices. "parquet" keeps the pyarrow defaults (snappy, one row group
+# per write) so existing outputs are unchanged.
+BACKENDS: Dict[str, Backend] = {
+    "parquet": Backend("parquet"),
+    "parquet-zstd": Backend("parquet", "zstd", level=3, row_group_size=256_000),
+    "parquet-snappy": Backend("parquet", "snappy", row_group_size=256_000),
+    "feather": Backend("feather", "lz4"),
+    "feather-zstd": Backend("feather", "zstd"),
+    "npz": Backend("npz", "deflate"),
+    "csv": Backend("csv"),
+}
+_EXTS = ("parquet", "feather", "npz", "csv")
+
+def get_backend(fmt: str | Backend, row_group_size: Optional[int] = None) -> Backend:
+    b = fmt if isinstance(fmt, Backend) else BACKENDS.get(fmt)
+    if b is None:
+        raise ValueError(f"Unknown format {fmt!r}; choose from {', '.join(BACKENDS)}")
+    return replace(b, row_group_size=row_group_size) if row_group_size else b
+
+def _arrow(df: pd.DataFrame, schema=None):
+    import pyarrow as pa
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=True)
+
+def _widen(df: pd.DataFrame) -> pd.DataFrame:
+    # integer columns as float64, so a later ticker's fractional values (e.g. a
+    # split-adjusted Volume) fit the schema fixed by the first write
+    ints = [c for c in df.columns if pd.api.types.is_integer_dtype(df[c])]
+    return df.astype({c: "float64" for c in ints}) if ints else df
+
+def _drop_other_formats(path: Path, ext: str) -> None:
+    # `table_path` picks the first format present, so a table written as csv
+    # must not be shadowed by the parquet copy of an earlier run
+    for other in _EXTS:
+        if other != ext:
+            path.with_suffix(f".{other}").unlink(missing_ok=True)
+
+def _ipc_options(b: Backend):
+    import pyarrow as pa
+    return pa.ipc.IpcWriteOptions(compression=b.compression) if b.compression else None
+
+def _write_npz(df: pd.DataFrame, path: Path, compress: bool = True) -> None:
+    # one array per column (strings as fixed-width unicode), index under "__index__"
+    arrays = {"__index__": df.index.to_numpy(),
+              "__meta__": np.array(json.dumps({"index": df.index.name, "columns": list(map(str, df.columns))}))}
+    for c in df.columns:
+        v = df[c].to_numpy()
+        arrays[f"c:{c}"] = v.astype(str) if v.dtype == object or pd.api.types.is_string_dtype(df[c]) else v
+    (np.savez_compressed if compress else np.savez)(path, **arrays)
+
+def _read_npz(path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    with np.load(path, allow_pickle=False) as z:
+        meta = json.loads(str(z["__meta__"]))
+        cols = columns if columns is not None else meta["columns"]
+        data = {c: z[f"c:{c}"] for c in cols}
+        index = pd.Index(z["__index__"], name=meta["index"])
+    return pd.DataFrame(data, index=index)
+
+def write_table(df: pd.DataFrame, path: Path, backend: str | Backend = "parquet") -> Path:
+    """Write one table with `backend`; `path` gets the backend's suffix. Returns the file written."""
+    b = get_backend(backend)
+    path = Path(path).with_suffix(f".{b.ext}")
     path.parent.mkdir(parents=True, exist_ok=True)
-    if fmt == "parquet":
-        df.to_parquet(path, index=True)
+    _drop_other_formats(path, b.ext)
+    if b.ext == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(_arrow(df), path, compression=b.compression or "snappy",
+                       compression_level=b.level, row_group_size=b.row_group_size)
+    elif b.ext == "feather":
+        import pyarrow as pa
+        with pa.ipc.new_file(path, _arrow(df).schema, options=_ipc_options(b)) as w:
+            w.write_table(_arrow(df), max_chunksize=b.row_group_size)
+    elif b.ext == "npz":
+        _write_npz(df, path, compress=b.compression is not None)
     else:
         df.to_csv(path, index=True)
+    return path
+
+def read_table(path: str | Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Read a file written by `write_table` / `ArtifactWriter`; `columns` reads only those (plus the index)."""
+    path = Path(path)
+    ext = path.suffix.lstrip(".")
+    if ext == "parquet":
+        return pd.read_parquet(path, columns=columns)
+    if ext == "feather":
+        import pyarrow as pa
+        import pyarrow.feather as feather
+        if columns is not None:
+            with pa.memory_map(str(path)) as src:
+                meta = pa.ipc.open_file(src).schema.pandas_metadata or {}
+            columns = columns + [c for c in meta.get("index_columns", []) if isinstance(c, str)]
+        return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+    if ext == "npz":
+        return _read_npz(path, columns)
+    if columns is not None:
+        columns = [pd.read_csv(path, nrows=0).columns[0], *columns]
+    return pd.read_csv(path, index_col=0, parse_dates=True, usecols=columns)
+
+def table_path(out_dir: str | Path, name: str) -> Path:
+    out = Path(out_dir)
+    for ext in _EXTS:
+        path = out / f"{name}.{ext}"
+        if path.exists():
+            return path
+    raise FileNotFoundError(f"No {name}.{{{','.join(_EXTS)}}} in {out}")
+
+def load_table(out_dir: str | Path, name: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Read back a table written by `save_artifacts` (e.g. name="prices"), whichever format it used."""
+    return read_table(table_path(out_dir, name), columns)
 
 def save_artifacts(
     *,
-    prices: pd.DataFrame,
-    indicators: pd.DataFrame,
-    returns: pd.DataFrame,
-    perf_rows: List[Dict[str, Any]],
+    prices: Optional[pd.DataFrame] = None,
+    indicators: Optional[pd.DataFrame] = None,
+    returns: Optional[pd.DataFrame] = None,
+    perf_rows: Optional[List[Dict[str, Any]]] = None,
     out_dir: str | Path,
-    fmt: Literal["parquet","csv"] = "parquet",
+    fmt: str | Backend = "parquet",
+    tables: Optional[Dict[str, pd.DataFrame]] = None,
 ) -> None:
+    """Write the given tables (and `performance.json`) into `out_dir`; `tables` adds extra named tables."""
     out = Path(out_dir)
     out.mkdir(parents=True, exist_ok=True)
-    _save_table(prices, out / f"prices.{fmt}", fmt)
-    _save_table(indicators, out / f"indicators.{fmt}", fmt)
-    _save_table(returns, out / f"returns.{fmt}", fmt)
-    with open(out / "performance.json", "w", encoding="utf-8") as f:
-        json.dump(perf_rows, f, ensure_ascii=False, indent=2)
+    named = {"prices": prices, "indicators": indicators, "returns": returns, **(tables or {})}
+    for name, df in named.items():
+        if df is not None:
+            write_table(df, out / name, fmt)
+    if perf_rows is not None:
+        with open(out / "performance.json", "w", encoding="utf-8") as f:
+            json.dump(perf_rows, f, ensure_ascii=False, indent=2)
+
+class ArtifactWriter:
+    """
+    Streaming counterpart of `save_artifacts`: each `write()` appends one
+    ticker's frame to `<name>.<ext>` and each `add_perf()` appends a line to
+    `performance.jsonl`, so nothing has to be held until the end of the run.
+    Rows come out grouped by ticker (each date-sorted) instead of globally
+    date-sorted.
+
+    Parquet/Feather frames go out as row groups / record batches; with a
+    `row_group_size` they are buffered until that many rows are pending, so
+    groups don't shrink to one ticker each. NPZ can't be appended to and is
+    written at `close()`. `close()` also writes `performance.json`, so
+    readers of `save_artifacts` output (`load_table`, stock-serve) work unchanged.
+    """
+
+    def __init__(self, out_dir: str | Path, fmt: str | Backend = "parquet", row_group_size: Optional[int] = None):
+        self.out = Path(out_dir)
+        self.out.mkdir(parents=True, exist_ok=True)
+        self.backend = get_backend(fmt, row_group_size)
+        self._writers: Dict[str, Any] = {}
+        self._schemas: Dict[str, Any] = {}
+        self._pending: Dict[str, List[Any]] = {}
+        self._columns: Dict[str, List[str]] = {}
+        self._names: set = set()
+        self._perf: List[Dict[str, Any]] = []
+        self._jsonl = open(self.out / "performance.jsonl", "w", encoding="utf-8")
+        # a previous run's performance.json would shadow this run's jsonl until close()
+        (self.out / "performance.json").unlink(missing_ok=True)
+
+    def write(self, name: str, df: pd.DataFrame) -> None:
+        ext = self.backend.ext
+        if name not in self._names:
+            self._names.add(name)
+            _drop_other_formats(self.out / name, ext)
+        if ext in ("parquet", "feather"):
+            self._write_arrow(name, df)
+        elif ext == "npz":
+            self._pending.setdefault(name, []).append(df)
+        else:
+            self._write_csv(name, df)
+
+    def _open(self, name: str, schema):
+        b = self.backend
+        path = self.out / f"{name}.{b.ext}"
+        if b.ext == "parquet":
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(path, schema, compression=b.compression or "snappy",
+                                    compression_level=b.level)
+        import pyarrow as pa
+        return pa.ipc.new_file(path, schema, options=_ipc_options(b))
+
+    def _write_arrow(self, name: str, df: pd.DataFrame) -> None:
+        df = _widen(df)
+        if name not in self._writers:
+            table = _arrow(df)
+            self._schemas[name] = table.schema
+            self._writers[name] = self._open(name, table.schema)
+        else:
+            # later tickers are cast to the first one's schema (all numeric columns are float64)
+            table = _arrow(df, self._schemas[name])
+        size = self.backend.row_group_size
+        if not size:
+            self._writers[name].write_table(table)
+            return
+        pending = self._pending.setdefault(name, [])
+        pending.append(table)
+        if sum(t.num_rows for t in pending) >= size:
+            self._flush(name, final=False)
+
+    def _flush(self, name: str, final: bool) -> None:
+        import pyarrow as pa
+        pending = self._pending.pop(name, [])
+        if not pending:
+            return
+        table = pa.concat_tables(pending)
+        size = self.backend.row_group_size
+        full = table.num_rows if final else table.num_rows // size * size
+        kw = {"row_group_size": size} if self.backend.ext == "parquet" else {"max_chunksize": size}
+        if full:
+            self._writers[name].write_table(table.slice(0, full), **kw)
+        if full < table.num_rows:
+            self._pending[name] = [table.slice(full)]
+
+    def _write_csv(self, name: str, df: pd.DataFrame) -> None:
+        path = self.out / f"{name}.csv"
+        if name not in self._columns:
+            self._columns[name] = list(df.columns)
+            df.to_csv(path, index=True)
+        else:
+            df[self._columns[name]].to_csv(path, index=True, header=False, mode="a")
+
+    def add_perf(self, row: Dict[str, Any]) -> None:
+        self._jsonl.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._jsonl.flush()
+        self._perf.append(row)
+
+    def close(self, complete: bool = True) -> None:
+        """Finish every table; `performance.json` is only written for a `complete` run."""
+        if self.backend.ext == "npz":
+            for name, frames in self._pending.items():
+                write_table(pd.concat(frames), self.out / name, self.backend)
+            self._pending.clear()
+        for name in list(self._pending):
+            self._flush(name, final=True)
+        for w in self._writers.values():
+            w.close()
+        self._writers.clear()
+        if not self._jsonl.closed:
+            self._jsonl.close()
+            if not complete:
+                return
+            with open(self.out / "performance.json", "w", encoding="utf-8") as f:
+                json.dump(self._perf, f, ensure_ascii=False, indent=2)
+
+    def __enter__(self) -> "ArtifactWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        # a failed run keeps only performance.jsonl, so load_perf_rows doesn't
+        # mistake it for a finished one
+        self.close(complete=exc[0] is None)
+
+def load_perf_rows(out_dir: str | Path) -> List[Dict[str, Any]]:
+    """Performance rows from `performance.json`, or `performance.jsonl` of an unfinished streaming run."""
+    out = Path(out_dir)
+    path = out / "performance.json"
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8"))
+    path = out / "performance.jsonl"
+    if path.exists():
+        return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    return []
+
+def write_run_meta(out_dir: str | Path, **meta: Any) -> Path:
+    """`run.json`: settings the tables were computed with (rf, interval, ...) so readers can match them."""
+    path = Path(out_dir) / "run.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+def load_run_meta(out_dir: str | Path) -> Dict[str, Any]:
+    path = Path(out_dir) / "run.json"
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
@@ -48,3 +48,117 @@ def drawdown_curve(adj_close: pd.Series) -> pd.Series:
 
 def max_drawdown(adj_close: pd.Series) -> float:
     return float(drawdown_curve(adj_close).min())
+
+# ---- rolling risk metrics (O(n): running sums / block prefix-suffix scans) ----
+
+def _rolling_sum(x: np.ndarray, window: int) -> np.ndarray:
+    # Windowed sums from one cumulative sum; NaN until the window is full.
+    cs = np.concatenate(([0.0], np.cumsum(x)))
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        out[window - 1:] = cs[window:] - cs[:-window]
+    return out
+
+def _rolling_moments(x: np.ndarray, window: int):
+    # Centre first so the running sums of squares don't lose precision on long series.
+    shift = float(np.nanmean(x)) if np.isfinite(x).any() else 0.0
+    xc = x - shift
+    valid = np.isfinite(xc)
+    n = _rolling_sum(valid.astype(float), window)
+    s1 = _rolling_sum(np.where(valid, xc, 0.0), window)
+    s2 = _rolling_sum(np.where(valid, xc * xc, 0.0), window)
+    full = n == window
+    mean = np.where(full, s1 / window, np.nan)
+    var = np.where(full, (s2 - s1 * s1 / window) / (window - 1), np.nan)
+    return mean + shift, np.maximum(var, 0.0)
+
+def rolling_sharpe(returns: pd.Series, window: int, rf_per_period: float = 0.0,
+                   periods_per_year: int = 252) -> pd.Series:
+    mean, var = _rolling_moments(returns.to_numpy(dtype=float) - rf_per_period, window)
+    std = np.sqrt(var)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = np.where(std > 0, mean / std * np.sqrt(periods_per_year), np.nan)
+    return pd.Series(out, index=returns.index)
+
+def rolling_sortino(returns: pd.Series, window: int, target: float = 0.0,
+                    periods_per_year: int = 252) -> pd.Series:
+    # Downside deviation = sqrt(mean(min(r - target, 0)^2)) over the window.
+    x = returns.to_numpy(dtype=float) - target
+    valid = np.isfinite(x)
+    n = _rolling_sum(valid.astype(float), window)
+    s1 = _rolling_sum(np.where(valid, x, 0.0), window)
+    down = np.where(valid, np.minimum(x, 0.0), 0.0)
+    s2 = _rolling_sum(down * down, window)
+    full = n == window
+    dd = np.sqrt(s2 / window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = np.where(full & (dd > 0), (s1 / window) / dd * np.sqrt(periods_per_year), np.nan)
+    return pd.Series(out, index=returns.index)
+
+def rolling_beta(returns: pd.Series, market_returns: pd.Series, window: int) -> pd.Series:
+    x, y = market_returns.align(returns, join="right")
+    x = x.to_numpy(dtype=float)
+    y = y.to_numpy(dtype=float)
+    valid = np.isfinite(x) & np.isfinite(y)
+    x = np.where(valid, x - np.nanmean(x), 0.0)
+    y = np.where(valid, y - np.nanmean(y), 0.0)
+    n = _rolling_sum(valid.astype(float), window)
+    sx = _rolling_sum(x, window)
+    sy = _rolling_sum(y, window)
+    sxy = _rolling_sum(x * y, window)
+    sxx = _rolling_sum(x * x, window)
+    var = sxx - sx * sx / window
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = np.where((n == window) & (var > 0), (sxy - sx * sy / window) / var, np.nan)
+    return pd.Series(out, index=returns.index)
+
+def rolling_drawdown(adj_close: pd.Series, window: int) -> pd.Series:
+    # Drawdown from the trailing-window peak (pandas' rolling max is a monotonic deque, O(n)).
+    # Like the running-sum metrics, NaN wherever the window holds a missing price.
+    return adj_close / adj_close.rolling(window).max() - 1.0
+
+def rolling_max_drawdown(adj_close: pd.Series, window: int) -> pd.Series:
+    """
+    Worst peak-to-trough drawdown inside each trailing `window` of prices.
+
+    Uses the van Herk/Gil-Werman block trick: the price series is cut into
+    blocks of `window` bars and every window is the suffix of one block plus
+    the prefix of the next, so each result combines two precomputed scans.
+    For a segment, mdd = min over a of (min(p[a:]) / p[a] - 1), and the
+    cross term between the suffix part S and prefix part P is min(P) / max(S) - 1.
+    Windows are `window` bars and NaN when any of their prices is missing,
+    the same policy as rolling_drawdown.
+    """
+    raw = adj_close.to_numpy(dtype=float)
+    valid = np.isfinite(raw)
+    # gaps filled only so the block scans stay finite; windows touching them are masked below
+    p = adj_close.ffill().bfill().to_numpy(dtype=float)
+    n = len(p)
+    out = np.full(n, np.nan)
+    if n >= window and window > 1 and valid.any():
+        nb = -(-n // window)
+        pad = nb * window - n
+        blocks = np.concatenate([p, np.full(pad, p[-1])]).reshape(nb, window)
+
+        pre_max = np.maximum.accumulate(blocks, axis=1)
+        pre_min = np.minimum.accumulate(blocks, axis=1)
+        pre_mdd = np.minimum.accumulate(blocks / pre_max - 1.0, axis=1)
+
+        rev = blocks[:, ::-1]
+        suf_max = np.maximum.accumulate(rev, axis=1)[:, ::-1]
+        suf_min = np.minimum.accumulate(rev, axis=1)[:, ::-1]
+        suf_mdd = np.minimum.accumulate((suf_min / blocks - 1.0)[:, ::-1], axis=1)[:, ::-1]
+
+        pre_max, pre_min, pre_mdd = (a.ravel()[:n] for a in (pre_max, pre_min, pre_mdd))
+        suf_max, suf_mdd = (a.ravel()[:n] for a in (suf_max, suf_mdd))
+
+        end = np.arange(window - 1, n)
+        start = end - window + 1
+        aligned = start % window == 0       # window is exactly one block
+        cross = pre_min[end] / suf_max[start] - 1.0
+        combined = np.minimum(np.minimum(suf_mdd[start], pre_mdd[end]), cross)
+        out[window - 1:] = np.where(aligned, pre_mdd[end], combined)
+    elif window == 1:
+        out[:] = 0.0
+    out[_rolling_sum(valid.astype(float), window) < window] = np.nan
+    return pd.Series(out, index=adj_close.index)
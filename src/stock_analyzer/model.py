@@ -0,0 +1,311 @@
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import pickle
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+import numpy as np
+import pandas as pd
+
+# Persisted up/down classifier (the RandomForest from project_analysis_final).
+# An artifact is a directory models/<name>/v<N>/ holding
+#   meta.json   feature pipeline, data fingerprint, library versions, metrics
+#   model.pkl   the fitted scikit-learn estimator
+#   forest.npz  the same trees flattened into arrays (scored without scikit-learn)
+
+FEATURES = ["news_count", "news_sentiment", "volatility", "daily_return", "Volume"]
+TARGET = "target_up_down"
+PIPELINE_VERSION = 1      # bump whenever build_features changes
+# engine="auto": flat trees load in milliseconds (no scikit-learn import or
+# unpickling) and have no per-call overhead, so they win up to a few thousand
+# rows; in bulk scikit-learn's compiled traversal is ~1.3-1.6x faster.
+FLAT_MAX_ROWS = 5_000
+
+def build_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The feature pipeline of merge_historical / project_analysis_final for one
+    ticker's daily frame: OHLCV plus optional news_count / news_sentiment
+    (missing news = 0, neutral). Rows without a previous close are dropped.
+    """
+    out = pd.DataFrame(index=df.index)
+    out["news_count"] = df["news_count"].fillna(0) if "news_count" in df else 0.0
+    out["news_sentiment"] = df["news_sentiment"].fillna(0) if "news_sentiment" in df else 0.0
+    out["volatility"] = df["High"] - df["Low"]
+    out["daily_return"] = df["Close"].pct_change()
+    out["Volume"] = df["Volume"]
+    return out[FEATURES].dropna()
+
+def fingerprint(X: np.ndarray, y: Optional[np.ndarray] = None) -> str:
+    h = hashlib.sha256()
+    for a in (X, y):
+        if a is not None:
+            a = np.ascontiguousarray(a)
+            h.update(str((a.shape, a.dtype.str)).encode())
+            h.update(a.tobytes())
+    return h.hexdigest()
+
+# ---- flattened forest ----
+
+def _sibling_order(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    # Breadth-first node order in which every right child directly follows its left sibling.
+    order = [0]
+    for node in order:
+        if left[node] != -1:
+            order += [left[node], right[node]]
+    return np.asarray(order)
+
+@dataclass
+class FlatForest:
+    """
+    All trees of a fitted RandomForestClassifier in shared node arrays, laid
+    out so a node's children are adjacent: the next node is child[node] + (x > threshold).
+    Leaves point at themselves with threshold +inf. Prediction advances every
+    (tree, row) pair one level per step, `max_depth` vectorized gathers per
+    batch instead of a Python/Cython call per tree: quick to load and to score
+    small batches, but slower than scikit-learn in bulk (see FLAT_MAX_ROWS).
+    """
+    feature: np.ndarray        # (nodes,) split feature (0 at leaves)
+    threshold: np.ndarray      # (nodes,) float32, go left when x <= threshold
+    child: np.ndarray          # (nodes,) absolute index of the left child (self at leaves)
+    proba: np.ndarray          # (nodes, n_classes) class fractions
+    roots: np.ndarray          # (trees,) root node index of each tree
+    depth: int
+    classes: np.ndarray
+
+    @classmethod
+    def from_sklearn(cls, model) -> "FlatForest":
+        feats, thr, child, probas, roots = [], [], [], [], []
+        offset = 0
+        depth = 0
+        for est in model.estimators_:
+            t = est.tree_
+            order = _sibling_order(t.children_left, t.children_right)
+            new_id = np.empty(t.node_count, dtype=np.int64)
+            new_id[order] = np.arange(len(order)) + offset
+            left = t.children_left[order]
+            leaf = left == -1
+            feats.append(np.where(leaf, 0, t.feature[order]))
+            thr.append(np.where(leaf, np.inf, t.threshold[order]))
+            child.append(np.where(leaf, new_id[order], new_id[np.maximum(left, 0)]))
+            v = t.value[order, 0, :].astype(float)
+            probas.append(v / v.sum(axis=1, keepdims=True))
+            roots.append(offset)
+            depth = max(depth, int(t.max_depth))
+            offset += len(order)
+        # scikit-learn compares float32 features with float64 thresholds; rounding
+        # each threshold down to float32 gives the same decision for every float32 x
+        th = np.concatenate(thr)
+        th32 = th.astype(np.float32)
+        th32 = np.where(th32 > th, np.nextafter(th32, np.float32(-np.inf)), th32)
+        return cls(
+            feature=np.concatenate(feats).astype(np.intp),
+            threshold=th32,
+            child=np.concatenate(child).astype(np.intp),
+            proba=np.concatenate(probas),
+            roots=np.asarray(roots, dtype=np.intp),
+            depth=depth,
+            classes=np.asarray(model.classes_),
+        )
+
+    def predict_proba(self, X: np.ndarray, chunk: int = 1024) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        out = np.empty((len(X), self.proba.shape[1]))
+        n_trees = len(self.roots)
+        for lo in range(0, len(X), chunk):
+            x = X[lo:lo + chunk]
+            k = len(x)
+            cols = np.ascontiguousarray(x.T).ravel()          # feature-major: value of f at row i is cols[f*k + i]
+            rows = np.arange(k)
+            node = np.repeat(self.roots, k).reshape(n_trees, k)
+            for _ in range(self.depth):
+                v = cols[self.feature[node] * k + rows]
+                node = self.child[node] + (v > self.threshold[node])
+            out[lo:lo + k] = self.proba[node].mean(axis=0)
+        return out
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes[self.predict_proba(X).argmax(axis=1)]
+
+    def save(self, path: Path) -> None:
+        np.savez(path, **{k: v for k, v in asdict(self).items() if k != "depth"}, depth=np.array(self.depth))
+
+    @classmethod
+    def load(cls, path: Path) -> "FlatForest":
+        with np.load(path, allow_pickle=False) as z:
+            d = {k: z[k] for k in z.files}
+        d["depth"] = int(d["depth"])
+        return cls(**d)
+
+# ---- artifacts ----
+
+@dataclass
+class ModelArtifact:
+    path: Path
+    meta: Dict[str, Any]
+    model: Any = None              # scikit-learn estimator (loaded on demand)
+    flat: Optional[FlatForest] = None
+
+    def predict_proba(self, X: np.ndarray, engine: str = "auto") -> np.ndarray:
+        """engine: "flat", "sklearn", or "auto" (flat up to FLAT_MAX_ROWS rows, else sklearn)."""
+        if engine == "auto":
+            engine = "flat" if len(X) <= FLAT_MAX_ROWS else "sklearn"
+        if engine == "flat":
+            if self.flat is None:
+                self.flat = FlatForest.load(self.path / "forest.npz")
+            return self.flat.predict_proba(X)
+        if self.model is None:
+            with open(self.path / "model.pkl", "rb") as f:
+                self.model = pickle.load(f)
+        return self.model.predict_proba(pd.DataFrame(np.asarray(X, dtype=float), columns=self.meta["features"]))
+
+def _next_version(root: Path) -> int:
+    versions = [int(p.name[1:]) for p in root.glob("v*") if p.name[1:].isdigit()]
+    return max(versions, default=0) + 1
+
+def save_model(model, X_train: pd.DataFrame, y_train: pd.Series, root: str | Path,
+               metrics: Optional[Dict[str, float]] = None, params: Optional[Dict[str, Any]] = None) -> Path:
+    """Write model.pkl, forest.npz and meta.json to `root/v<next>` and return that directory."""
+    import sklearn
+    root = Path(root)
+    path = root / f"v{_next_version(root)}"
+    path.mkdir(parents=True)
+    with open(path / "model.pkl", "wb") as f:
+        pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+    FlatForest.from_sklearn(model).save(path / "forest.npz")
+    meta = {
+        "version": int(path.name[1:]),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "estimator": type(model).__name__,
+        "params": params if params is not None else model.get_params(),
+        "features": list(X_train.columns),
+        "target": TARGET,
+        "pipeline_version": PIPELINE_VERSION,
+        "classes": [int(c) for c in model.classes_],
+        "train": {
+            "rows": len(X_train),
+            "start": str(X_train.index.min()),
+            "end": str(X_train.index.max()),
+            "fingerprint": fingerprint(X_train.to_numpy(dtype=float), y_train.to_numpy()),
+        },
+        "metrics": metrics or {},
+        "versions": {"sklearn": sklearn.__version__, "numpy": np.__version__, "pandas": pd.__version__},
+    }
+    (path / "meta.json").write_text(json.dumps(meta, indent=2, default=str), encoding="utf-8")
+    return path
+
+def load_model(path: str | Path, version: Optional[int] = None) -> ModelArtifact:
+    """Load `path` (an artifact dir) or `path/v<version>` (latest when `version` is None and `path` holds v* dirs)."""
+    path = Path(path)
+    if not (path / "meta.json").exists():
+        v = version or _next_version(path) - 1
+        path = path / f"v{v}"
+    meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+    if meta.get("pipeline_version") != PIPELINE_VERSION:
+        raise ValueError(f"{path} was built with feature pipeline v{meta.get('pipeline_version')}, "
+                         f"this code has v{PIPELINE_VERSION}")
+    return ModelArtifact(path=path, meta=meta)
+
+# ---- batch scoring ----
+
+def _frames(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    if "Ticker" in df.columns:
+        return {t: g.drop(columns="Ticker") for t, g in df.groupby("Ticker", sort=True)}
+    return {"": df}
+
+def score_frames(art: ModelArtifact, frames: Dict[str, pd.DataFrame], engine: str = "auto") -> pd.DataFrame:
+    """Features for every ticker, stacked, then one predict_proba call over all rows."""
+    feats = [build_features(df.sort_index()).assign(Ticker=t) for t, df in frames.items()]
+    X = pd.concat(feats)
+    proba = art.predict_proba(X[art.meta["features"]].to_numpy(dtype=float), engine=engine)
+    up = art.meta["classes"].index(1)
+    out = X[["Ticker"]].copy()
+    out["prob_up"] = proba[:, up]
+    out["pred_up"] = (out["prob_up"] > 0.5).astype(int)
+    out.index.name = "date"
+    return out
+
+def benchmark(art: ModelArtifact, X: np.ndarray, repeat: int = 3, batch: int = 500) -> Dict[str, Any]:
+    """
+    Per engine: load time, bulk rows/s over all of `X`, and the latency of
+    one `batch`-row call (a day's scores for a universe); plus the largest
+    probability difference between the engines.
+    """
+    res: Dict[str, Any] = {"rows": len(X), "batch": min(batch, len(X))}
+    probs = {}
+    for engine in ("sklearn", "flat"):
+        fresh = load_model(art.path)
+        t0 = time.perf_counter()
+        fresh.predict_proba(X[:1], engine=engine)   # forces the load
+        res[f"{engine}_load_s"] = time.perf_counter() - t0
+        bulk = small = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            probs[engine] = fresh.predict_proba(X, engine=engine)
+            bulk = min(bulk, time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            fresh.predict_proba(X[:batch], engine=engine)
+            small = min(small, time.perf_counter() - t0)
+        res[f"{engine}_rows_per_s"] = len(X) / bulk
+        res[f"{engine}_batch_s"] = small
+    res["max_abs_diff"] = float(np.abs(probs["sklearn"] - probs["flat"]).max())
+    return res
+
+def _read_input(path: str) -> pd.DataFrame:
+    p = Path(path)
+    if p.is_dir():
+        from .export import load_table
+        return load_table(p, "prices")
+    if p.suffix == ".parquet":
+        return pd.read_parquet(p)
+    df = pd.read_csv(p)
+    date_col = next(c for c in df.columns if c.lower() == "date")
+    return df.set_index(pd.DatetimeIndex(pd.to_datetime(df.pop(date_col)), name="date"))
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="stock-score",
+        description="Score days with a saved up/down model (project_analysis_final artifact)."
+    )
+    p.add_argument("input", nargs="+",
+                   help="Merged dataset CSV, prices.parquet/csv, or a stock-parse output directory")
+    p.add_argument("--model", default="src/out/models/updown", help="Artifact dir or its parent of v* dirs")
+    p.add_argument("--version", type=int, help="Artifact version (default: latest)")
+    p.add_argument("--engine", choices=["auto", "flat", "sklearn"], default="auto",
+                   help="flat = flattened trees in NumPy: fast load, best up to a few thousand rows but "
+                        "~0.6-0.8x scikit-learn's rows/s in bulk; sklearn = the pickled estimator; "
+                        f"auto (default) = flat up to {FLAT_MAX_ROWS:,} rows, sklearn above")
+    p.add_argument("-o", "--out", default="scores.csv", help="Output CSV (default: scores.csv)")
+    p.add_argument("--bench", action="store_true", help="Also report load time and rows/s for both engines")
+    return p
+
+def main():
+    args = build_parser().parse_args()
+    t0 = time.perf_counter()
+    art = load_model(args.model, args.version)
+    frames: Dict[str, pd.DataFrame] = {}
+    for path in args.input:
+        for t, df in _frames(_read_input(path)).items():
+            frames[t or Path(path).stem] = df
+    scores = score_frames(art, frames, engine=args.engine)
+    elapsed = time.perf_counter() - t0
+    scores.to_csv(args.out)
+    engine = args.engine if args.engine != "auto" else ("flat" if len(scores) <= FLAT_MAX_ROWS else "sklearn")
+    print(f"✅ Scored {len(scores)} rows for {len(frames)} ticker(s) with v{art.meta['version']} "
+          f"({engine}) in {elapsed:.2f}s")
+    print(f"   Output : {args.out}")
+    if args.bench:
+        X = pd.concat([build_features(df.sort_index()) for df in frames.values()])[art.meta["features"]]
+        X = np.tile(X.to_numpy(dtype=float), (max(1, 200_000 // max(len(X), 1)), 1))
+        b = benchmark(art, X)
+        print(f"   Bench  : {b['rows']:,} rows, {b['batch']}-row batch")
+        for engine in ("sklearn", "flat"):
+            print(f"     {engine:<8} load {b[f'{engine}_load_s'] * 1000:8.1f} ms   "
+                  f"{b[f'{engine}_rows_per_s']:>12,.0f} rows/s   batch {b[f'{engine}_batch_s'] * 1000:7.2f} ms")
+        print(f"     max |Δprob| = {b['max_abs_diff']:.2e}")
+
+if __name__ == "__main__":
+    main()
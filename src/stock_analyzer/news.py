@@ -3,23 +3,51 @@ from __future__ import annotations
 
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Iterable, Tuple
+from typing import Iterable, Tuple, Sequence, TYPE_CHECKING
 import time
 import random
+import numpy as np
 import pandas as pd
-from GoogleNews import GoogleNews
+from .trading_calendar import default_calendar
+
+if TYPE_CHECKING:
+    from GoogleNews import GoogleNews
 
 # 날짜 포맷
 DATE_FMT_ISO = "%Y-%m-%d"
 # GoogleNews 라이브러리 요청용: MM/DD/YYYY
 DATE_FMT_US = "%m/%d/%Y"
 
-def _date_range(start: datetime, end: datetime) -> Iterable[datetime]:
-    """start ~ end (inclusive) 하루 단위 반복자."""
-    cur = start
-    while cur <= end:
-        yield cur
-        cur += timedelta(days=1)
+# process_news.py 와 같은 관련 기사 키워드
+NEWS_KEYWORDS = [
+    'Amazon', 'AWS', 'AMZN', 'Bezos',
+    'Tech', 'Cloud', 'Nasdaq',
+    'Fed', 'Economy', 'Inflation', 'Recession'
+]
+
+def filter_articles(df: pd.DataFrame, keywords: Sequence[str] = NEWS_KEYWORDS) -> pd.DataFrame:
+    """제목 또는 본문(description)에 키워드가 있는 기사만 남깁니다 (대소문자 무시)."""
+    pattern = '|'.join(keywords)
+    mask = df['title'].str.contains(pattern, case=False, na=False) | \
+           df['description'].str.contains(pattern, case=False, na=False)
+    return df[mask]
+
+def daily_news_stats(articles: pd.DataFrame) -> pd.DataFrame:
+    """기사 단위 데이터 -> 일별 기사 수(news_count)와 평균 감성(news_sentiment)."""
+    dates = pd.to_datetime(articles['date']).dt.date
+    return articles.groupby(dates).agg(
+        news_count=('title', 'count'),
+        news_sentiment=('sentiment', 'mean'),
+    ).rename_axis('date')
+
+def _date_range(start: datetime, end: datetime, sessions_only: bool = False) -> Iterable[datetime]:
+    """start ~ end (inclusive) 날짜 반복자. sessions_only=True 면 거래일(NYSE)만."""
+    if sessions_only:
+        days = default_calendar().sessions_in(start, end)
+    else:
+        days = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+    for d in days.tolist():
+        yield datetime(d.year, d.month, d.day)
 
 def _fetch_daily_google_news_count(
     googlenews: GoogleNews,
@@ -82,12 +110,15 @@ def fetch_news_counts_for_ticker(
     # [수정됨] 기본 대기 시간 대폭 증가 (기존 1.5~3.0 -> 6.0~10.0)
     sleep_min: float = 6.0,
     sleep_max: float = 12.0,
+    sessions_only: bool = False,
 ) -> Tuple[pd.DataFrame, Path]:
     """
     Google News를 크롤링하여 일별 기사 수(Trend)를 저장합니다.
+    sessions_only=True 면 거래일만 크롤링합니다 (요청 수 약 30% 감소, 주말/휴장일 기사는 빠짐).
     """
     
-    # GoogleNews 객체 초기화
+    # GoogleNews 객체 초기화 (크롤링할 때만 import)
+    from GoogleNews import GoogleNews
     googlenews = GoogleNews(lang='en', region='US')
     googlenews.set_encode('utf-8')
 
@@ -125,7 +156,7 @@ def fetch_news_counts_for_ticker(
     print(f"🔍 Starting Slow & Safe crawl for '{query}' from {start_dt.date()} to {end_dt.date()}")
     
     try:
-        for i, d in enumerate(_date_range(start_dt, end_dt)):
+        for i, d in enumerate(_date_range(start_dt, end_dt, sessions_only=sessions_only)):
             d_str = d.strftime(DATE_FMT_ISO)
             
             # [추가] 10일마다 한 번씩 아주 길게 쉬기 (30초)
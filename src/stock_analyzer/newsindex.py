@@ -0,0 +1,404 @@
+from __future__ import annotations
+import argparse
+import json
+import os
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+
+# On-disk inverted index over the processed article corpus
+# (src/out/processed_news_sorted.csv: date, title, sentiment, description).
+#
+#   articles.npz  per article id: day (days since 1970-01-01), sentiment, key (hash of date+title)
+#   terms.npz     sorted vocabulary; per term: byte offset into the postings, doc count, last id
+#   postings.bin  per term, its sorted article ids as LEB128 varint deltas
+#
+# Ids are assigned in arrival order (by date within each batch), so new
+# articles only ever append to the end of a posting list.
+
+TOKEN = re.compile(r"[a-z0-9]+")
+INDEX_VERSION = 1
+DEFAULT_INDEX_DIR = "src/out/news_index"
+
+# ---- varint delta coding ----
+
+def _varint_len(values: np.ndarray) -> np.ndarray:
+    v = np.asarray(values, dtype=np.uint64)
+    n = np.ones(len(v), dtype=np.int64)
+    for k in range(1, 10):
+        n += v >= (np.uint64(1) << np.uint64(7 * k))
+    return n
+
+def encode_varint(values: np.ndarray) -> np.ndarray:
+    """Non-negative ints -> LEB128 bytes (7 bits per byte, high bit = more bytes follow)."""
+    v = np.asarray(values, dtype=np.uint64)
+    nbytes = _varint_len(v)
+    start = np.concatenate(([0], np.cumsum(nbytes)[:-1]))
+    out = np.empty(int(nbytes.sum()), dtype=np.uint8)
+    for k in range(int(nbytes.max()) if len(v) else 0):
+        m = nbytes > k
+        byte = (v[m] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = (nbytes[m] - 1 > k).astype(np.uint64) << np.uint64(7)
+        out[start[m] + k] = (byte | more).astype(np.uint8)
+    return out
+
+def decode_varint(data: np.ndarray) -> np.ndarray:
+    """LEB128 bytes -> int64 values (inverse of encode_varint)."""
+    data = np.asarray(data, dtype=np.uint8)
+    if not len(data):
+        return np.zeros(0, dtype=np.int64)
+    last = (data & 0x80) == 0
+    starts = np.concatenate(([0], np.flatnonzero(last)[:-1] + 1))
+    shift = np.arange(len(data)) - np.repeat(starts, np.diff(np.append(starts, len(data))))
+    parts = (data & 0x7F).astype(np.int64) << (7 * shift)
+    return np.add.reduceat(parts, starts)
+
+def tokenize(text: pd.Series) -> pd.Series:
+    """Lower-cased alphanumeric tokens per text."""
+    return text.fillna("").astype(str).str.lower().str.findall(TOKEN.pattern)
+
+def _article_text(articles: pd.DataFrame) -> pd.Series:
+    text = articles["title"].fillna("").astype(str)
+    if "description" in articles.columns:
+        text = text + " " + articles["description"].fillna("").astype(str)
+    return text
+
+def _days(dates) -> np.ndarray:
+    return pd.DatetimeIndex(pd.to_datetime(dates)).values.astype("datetime64[D]").astype(np.int64).astype(np.int32)
+
+def _keys(articles: pd.DataFrame, days: np.ndarray) -> np.ndarray:
+    frame = pd.DataFrame({"day": days, "title": articles["title"].fillna("").astype(str).to_numpy()})
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+def _pairs(articles: pd.DataFrame, first_id: int) -> Tuple[np.ndarray, np.ndarray]:
+    # unique (term, article id) pairs, sorted by term then id
+    tokens = tokenize(_article_text(articles)).reset_index(drop=True).explode().dropna()
+    pairs = pd.DataFrame({"term": tokens.to_numpy(), "id": tokens.index.to_numpy() + first_id}).drop_duplicates()
+    pairs = pairs.sort_values(["term", "id"], kind="stable")
+    return pairs["term"].to_numpy(dtype=str), pairs["id"].to_numpy(dtype=np.int64)
+
+# ---- the index ----
+
+@dataclass
+class NewsIndex:
+    path: Path
+    day: np.ndarray             # (articles,) int32 day number
+    sentiment: np.ndarray       # (articles,) float32
+    key: np.ndarray             # (articles,) uint64
+    terms: np.ndarray           # (terms,) sorted str
+    offsets: np.ndarray         # (terms + 1,) int64 byte offsets into postings
+    doc_count: np.ndarray       # (terms,) int64
+    last_id: np.ndarray         # (terms,) int64
+    postings: np.ndarray        # uint8 varint stream
+
+    @property
+    def n_articles(self) -> int:
+        return len(self.day)
+
+    def postings_for(self, term: str) -> np.ndarray:
+        i = np.searchsorted(self.terms, term)
+        if i == len(self.terms) or self.terms[i] != term:
+            return np.zeros(0, dtype=np.int64)
+        return self._decode(i)
+
+    def _decode(self, i: int) -> np.ndarray:
+        return np.cumsum(decode_varint(self.postings[self.offsets[i]:self.offsets[i + 1]]))
+
+    def prefix(self, stem: str) -> np.ndarray:
+        """Union of the posting lists of every term starting with `stem`."""
+        lo = np.searchsorted(self.terms, stem, side="left")
+        hi = np.searchsorted(self.terms, stem + "\U0010ffff", side="left")
+        if hi <= lo:
+            return np.zeros(0, dtype=np.int64)
+        ids = np.cumsum(decode_varint(self.postings[self.offsets[lo]:self.offsets[hi]]))
+        # cumsum ran across term boundaries: undo it per term
+        starts = np.cumsum(np.concatenate(([0], self.doc_count[lo:hi - 1])))
+        base = np.concatenate(([0], ids[starts[1:] - 1]))
+        ids = ids - np.repeat(base, self.doc_count[lo:hi])
+        return _union([ids], self.n_articles)
+
+    def search(self, query: str) -> np.ndarray:
+        """Sorted article ids matching `query` (see parse_query)."""
+        return _evaluate(parse_query(query), self)
+
+    def daily(self, query: str, start: Optional[str] = None, end: Optional[str] = None,
+              fill: bool = False) -> pd.DataFrame:
+        """
+        news_count and mean news_sentiment per day for `query`, like
+        news.daily_news_stats on the matching articles. fill=True adds the
+        days in [start, end] without articles (count 0, sentiment NaN).
+        """
+        ids = self.search(query)
+        days = self.day[ids]
+        lo = _days([start])[0] if start else (days.min() if len(days) else 0)
+        hi = _days([end])[0] if end else (days.max() if len(days) else -1)
+        keep = (days >= lo) & (days <= hi)
+        d = days[keep] - lo
+        span = max(int(hi - lo + 1), 0)
+        count = np.bincount(d, minlength=span)[:span]
+        total = np.bincount(d, weights=self.sentiment[ids][keep].astype(float), minlength=span)[:span]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / count
+        dates = (np.arange(span) + lo).astype("datetime64[D]")
+        out = pd.DataFrame({"news_count": count, "news_sentiment": np.where(count > 0, mean, np.nan)},
+                           index=pd.DatetimeIndex(dates, name="date"))
+        return out if fill else out[count > 0]
+
+    def save(self) -> Path:
+        self.path.mkdir(parents=True, exist_ok=True)
+        _atomic(self.path / "articles.npz", lambda f: np.savez(f, day=self.day, sentiment=self.sentiment, key=self.key))
+        _atomic(self.path / "terms.npz", lambda f: np.savez(f, terms=self.terms, offsets=self.offsets,
+                                                            doc_count=self.doc_count, last_id=self.last_id))
+        _atomic(self.path / "postings.bin", lambda f: f.write(self.postings.tobytes()))
+        meta = {"version": INDEX_VERSION, "articles": self.n_articles, "terms": len(self.terms),
+                "postings_bytes": len(self.postings),
+                "first_date": str(np.datetime64(int(self.day.min()), "D")) if self.n_articles else None,
+                "last_date": str(np.datetime64(int(self.day.max()), "D")) if self.n_articles else None,
+                "updated": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        (self.path / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        return self.path
+
+def _atomic(path: Path, write) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+def _empty(path: Path) -> NewsIndex:
+    return NewsIndex(path=path, day=np.zeros(0, np.int32), sentiment=np.zeros(0, np.float32),
+                     key=np.zeros(0, np.uint64), terms=np.zeros(0, dtype=str), offsets=np.zeros(1, np.int64),
+                     doc_count=np.zeros(0, np.int64), last_id=np.zeros(0, np.int64),
+                     postings=np.zeros(0, np.uint8))
+
+def load_index(path: Union[str, Path] = DEFAULT_INDEX_DIR) -> NewsIndex:
+    path = Path(path)
+    meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+    if meta.get("version") != INDEX_VERSION:
+        raise ValueError(f"{path}: index version {meta.get('version')}, expected {INDEX_VERSION}")
+    with np.load(path / "articles.npz") as a, np.load(path / "terms.npz") as t:
+        return NewsIndex(path=path, day=a["day"], sentiment=a["sentiment"], key=a["key"],
+                         terms=t["terms"], offsets=t["offsets"], doc_count=t["doc_count"],
+                         last_id=t["last_id"], postings=np.fromfile(path / "postings.bin", dtype=np.uint8))
+
+def update_index(path: Union[str, Path], articles: pd.DataFrame) -> Tuple[NewsIndex, int]:
+    """
+    Add articles (date, title, sentiment[, description]) to the index at
+    `path`, creating it if needed. Articles already indexed (same date and
+    title) are skipped. Returns the saved index and the number added.
+    """
+    path = Path(path)
+    idx = load_index(path) if (path / "meta.json").exists() else _empty(path)
+
+    days = _days(articles["date"])
+    keys = _keys(articles, days)
+    new = ~np.isin(keys, idx.key) & ~pd.Series(keys).duplicated().to_numpy()
+    articles, days, keys = articles[new], days[new], keys[new]
+    order = np.argsort(days, kind="stable")
+    articles, days, keys = articles.iloc[order], days[order], keys[order]
+    if not len(articles):
+        return idx, 0
+
+    first_id = idx.n_articles
+    terms, ids = _pairs(articles, first_id)
+    new_terms, term_start = np.unique(terms, return_index=True)
+    counts = np.diff(np.append(term_start, len(terms)))
+
+    # merged vocabulary and where old / new terms land in it
+    vocab = np.union1d(idx.terms, new_terms)
+    old_pos = np.searchsorted(vocab, idx.terms)
+    new_pos = np.searchsorted(vocab, new_terms)
+
+    # deltas of the new ids, the first of each term relative to that term's previous last id
+    prev_last = np.full(len(new_terms), -1, dtype=np.int64)
+    if len(idx.terms):
+        hit = np.searchsorted(idx.terms, new_terms)
+        hit = np.minimum(hit, len(idx.terms) - 1)
+        known = idx.terms[hit] == new_terms
+        prev_last[known] = idx.last_id[hit[known]]
+    deltas = np.diff(ids, prepend=0)
+    deltas[term_start] = ids[term_start] - np.maximum(prev_last, 0)    # new terms: absolute first id
+    new_bytes = encode_varint(deltas)
+    nb = np.add.reduceat(_varint_len(deltas), term_start)               # bytes added per new term
+
+    old_len = np.zeros(len(vocab), dtype=np.int64)
+    old_len[old_pos] = np.diff(idx.offsets)
+    add_len = np.zeros(len(vocab), dtype=np.int64)
+    add_len[new_pos] = nb
+    offsets = np.concatenate(([0], np.cumsum(old_len + add_len)))
+
+    postings = np.empty(offsets[-1], dtype=np.uint8)
+    if len(idx.postings):
+        shift = offsets[:-1][old_pos] - idx.offsets[:-1]
+        postings[np.arange(len(idx.postings)) + np.repeat(shift, np.diff(idx.offsets))] = idx.postings
+    new_src = np.concatenate(([0], np.cumsum(nb)[:-1]))
+    shift = (offsets[:-1] + old_len)[new_pos] - new_src
+    postings[np.arange(len(new_bytes)) + np.repeat(shift, nb)] = new_bytes
+
+    doc_count = np.zeros(len(vocab), dtype=np.int64)
+    doc_count[old_pos] = idx.doc_count
+    doc_count[new_pos] += counts
+    last_id = np.full(len(vocab), -1, dtype=np.int64)
+    last_id[old_pos] = idx.last_id
+    last_id[new_pos] = ids[term_start + counts - 1]
+
+    sentiment = articles["sentiment"].to_numpy(dtype=np.float32) if "sentiment" in articles else \
+        np.full(len(articles), np.nan, dtype=np.float32)
+    out = NewsIndex(path=path, day=np.concatenate([idx.day, days]),
+                    sentiment=np.concatenate([idx.sentiment, sentiment]), key=np.concatenate([idx.key, keys]),
+                    terms=vocab, offsets=offsets, doc_count=doc_count, last_id=last_id, postings=postings)
+    out.save()
+    return out, len(articles)
+
+def build_index(path: Union[str, Path], articles: pd.DataFrame) -> NewsIndex:
+    """Index `articles` from scratch at `path` (an existing index there is replaced)."""
+    path = Path(path)
+    for name in ("meta.json", "articles.npz", "terms.npz", "postings.bin"):
+        (path / name).unlink(missing_ok=True)
+    return update_index(path, articles)[0]
+
+# ---- queries ----
+
+def parse_query(query: str):
+    """
+    Query syntax: terms (case-insensitive, whole tokens; a trailing * matches
+    any term with that prefix), AND / OR (AND binds tighter; adjacent terms
+    are ANDed) and parentheses, e.g. "amazon OR (aws AND cloud*)".
+    Returns a nested tuple tree ("or" | "and", [children]) / ("term" | "prefix", str).
+    """
+    tokens = re.findall(r"\(|\)|[^\s()]+", query)
+    pos = 0
+
+    def peek():
+        return tokens[pos] if pos < len(tokens) else None
+
+    def take():
+        nonlocal pos
+        pos += 1
+        return tokens[pos - 1]
+
+    def parse_or():
+        parts = [parse_and()]
+        while peek() is not None and peek().upper() == "OR":
+            take()
+            parts.append(parse_and())
+        return parts[0] if len(parts) == 1 else ("or", parts)
+
+    def parse_and():
+        parts = [parse_atom()]
+        while peek() is not None and peek() != ")" and peek().upper() != "OR":
+            if peek().upper() == "AND":
+                take()
+            parts.append(parse_atom())
+        return parts[0] if len(parts) == 1 else ("and", parts)
+
+    def parse_atom():
+        tok = take() if peek() is not None else None
+        if tok is None or tok == ")" or tok.upper() in ("AND", "OR"):
+            raise ValueError(f"Bad query: {query!r}")
+        if tok == "(":
+            node = parse_or()
+            if peek() != ")":
+                raise ValueError(f"Unbalanced parentheses: {query!r}")
+            take()
+            return node
+        words = TOKEN.findall(tok.lower())
+        if tok.endswith("*") and len(words) == 1:
+            return ("prefix", words[0])
+        if len(words) != 1:
+            raise ValueError(f"Bad query term {tok!r} in {query!r}")
+        return ("term", words[0])
+
+    node = parse_or()
+    if pos != len(tokens):
+        raise ValueError(f"Bad query: {query!r}")
+    return node
+
+def _union(parts, n: int) -> np.ndarray:
+    # id sets as a bitmap over all articles: O(articles) without sorting
+    mask = np.zeros(n, dtype=bool)
+    for p in parts:
+        mask[p] = True
+    return np.flatnonzero(mask)
+
+def _intersect(parts, n: int) -> np.ndarray:
+    hits = np.zeros(n, dtype=np.uint16)
+    for p in parts:
+        hits[p] += 1
+    return np.flatnonzero(hits == len(parts))
+
+def _evaluate(node, idx: NewsIndex) -> np.ndarray:
+    kind, arg = node
+    if kind == "term":
+        return idx.postings_for(arg)
+    if kind == "prefix":
+        return idx.prefix(arg)
+    parts = [_evaluate(child, idx) for child in arg]
+    return (_intersect if kind == "and" else _union)(parts, idx.n_articles)
+
+def local_news_counts(*, query: str, start: str, end: str,
+                      index_dir: Union[str, Path] = DEFAULT_INDEX_DIR) -> pd.DataFrame:
+    """
+    Same rows as news.fetch_news_counts_for_ticker (date, query, count; every
+    day from start to end), plus the mean sentiment, from the local index.
+    """
+    daily = load_index(index_dir).daily(query, start=start, end=end, fill=True)
+    return pd.DataFrame({
+        "date": daily.index.strftime("%Y-%m-%d"),
+        "query": query,
+        "count": daily["news_count"].to_numpy(),
+        "sentiment": daily["news_sentiment"].to_numpy(),
+    })
+
+# ---- CLI ----
+
+def _read_articles(path: str) -> pd.DataFrame:
+    return pd.read_csv(path, usecols=lambda c: c in ("date", "title", "sentiment", "description"))
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="stock-news-index",
+                                description="Inverted index over processed news articles.")
+    p.add_argument("--index", default=DEFAULT_INDEX_DIR, help=f"Index directory (default: {DEFAULT_INDEX_DIR})")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="Index article CSVs from scratch")
+    b.add_argument("csv", nargs="+", help="Article CSVs (date, title, sentiment, description)")
+    a = sub.add_parser("add", help="Add new articles to an existing index")
+    a.add_argument("csv", nargs="+")
+    q = sub.add_parser("query", help="Daily count / mean sentiment for a query")
+    q.add_argument("query", help='e.g. "amazon OR aws OR bezos"')
+    q.add_argument("--start")
+    q.add_argument("--end")
+    q.add_argument("-o", "--out", help="Write the daily series to this CSV")
+    return p
+
+def main():
+    args = build_parser().parse_args()
+    t0 = time.perf_counter()
+    if args.cmd in ("build", "add"):
+        articles = pd.concat([_read_articles(p) for p in args.csv], ignore_index=True)
+        if args.cmd == "build":
+            idx = build_index(args.index, articles)
+            added = idx.n_articles
+        else:
+            idx, added = update_index(args.index, articles)
+        print(f"✅ Indexed {added} new article(s) in {time.perf_counter() - t0:.2f}s "
+              f"({idx.n_articles} articles, {len(idx.terms)} terms, {len(idx.postings) / 2 ** 20:.1f} MB postings)")
+        print(f"   Index : {args.index}")
+        return
+    idx = load_index(args.index)
+    t1 = time.perf_counter()
+    daily = idx.daily(args.query, start=args.start, end=args.end, fill=bool(args.start and args.end))
+    t2 = time.perf_counter()
+    print(f"🔎 {args.query!r}: {int(daily['news_count'].sum())} articles on {int((daily['news_count'] > 0).sum())} days "
+          f"(load {1000 * (t1 - t0):.1f} ms, query {1000 * (t2 - t1):.1f} ms)")
+    if args.out:
+        daily.to_csv(args.out)
+        print(f"   Output : {args.out}")
+    else:
+        print(daily.tail(10))
+
+if __name__ == "__main__":
+    main()
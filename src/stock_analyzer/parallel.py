@@ -0,0 +1,153 @@
+from __future__ import annotations
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .analysis import TRADING_DAYS, compute_indicators, _get_close
+from .portfolio import panel_performance, to_perf_rows
+
+# Per-ticker analysis (compute_indicators + performance) fanned out over a
+# process pool. A ticker's OHLCV goes to the worker as one shared-memory
+# block (index + numeric columns) and the indicator columns come back in a
+# second block the parent allocated; only the block names and the small
+# performance rows are pickled. Results are yielded in input order.
+
+# compute_indicators' columns, in the order it adds them
+IND_COLUMNS = ["SMA20", "SMA50", "EMA12", "EMA26", "RSI14", "MACD", "MACD_SIGNAL", "MACD_HIST",
+               "BB_MID", "BB_UPPER", "BB_LOWER", "RET_DAILY", "RET_CUM", "VOL21", "DRAWDOWN"]
+
+@dataclass
+class _Block:
+    name: str
+    rows: int
+    columns: List[str]
+    unit: str                      # datetime64 unit of the index ("ns", "us", ...)
+
+@dataclass
+class PoolStats:
+    workers: int
+    wall: float = 0.0
+    busy: Dict[int, float] = field(default_factory=dict)     # worker pid -> seconds in analysis
+    tasks: Dict[int, int] = field(default_factory=dict)
+
+    def utilization(self) -> Dict[int, float]:
+        return {pid: b / self.wall if self.wall else 0.0 for pid, b in self.busy.items()}
+
+    def lines(self) -> List[str]:
+        util = self.utilization()
+        return [f"worker {i + 1} (pid {pid}): {self.tasks[pid]} ticker(s), {self.busy[pid]:.2f}s busy, "
+                f"{util[pid]:.0%} of {self.wall:.2f}s" for i, pid in enumerate(sorted(self.busy))]
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # Pool workers share the parent's resource tracker, so attaching here only
+    # repeats the parent's registration; the parent unlinks every block.
+    return shared_memory.SharedMemory(name=name)
+
+def _put_frame(df: pd.DataFrame) -> Tuple[shared_memory.SharedMemory, _Block]:
+    columns = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
+    index = pd.DatetimeIndex(df.index)
+    n = len(df)
+    shm = shared_memory.SharedMemory(create=True, size=max(8 * n * (len(columns) + 1), 1))
+    stamps = index.values
+    unit = np.datetime_data(stamps.dtype)[0]
+    np.ndarray((n,), dtype=np.int64, buffer=shm.buf)[:] = stamps.view(np.int64)
+    values = np.ndarray((len(columns), n), dtype=np.float64, buffer=shm.buf, offset=8 * n)
+    for i, c in enumerate(columns):
+        values[i] = df[c].to_numpy(dtype=np.float64, na_value=np.nan)
+    del values
+    return shm, _Block(shm.name, n, columns, unit)
+
+def _analyze_shared(job) -> Tuple[str, List[Dict[str, Any]], int, float]:
+    ticker, src, dst_name, rf, periods_per_year = job
+    t0 = time.perf_counter()
+    shm_in, shm_out = _attach(src.name), _attach(dst_name)
+    try:
+        n = src.rows
+        stamps = np.ndarray((n,), dtype=np.int64, buffer=shm_in.buf).view(f"datetime64[{src.unit}]")
+        values = np.ndarray((len(src.columns), n), dtype=np.float64, buffer=shm_in.buf, offset=8 * n)
+        df = pd.DataFrame({c: values[i].copy() for i, c in enumerate(src.columns)},
+                          index=pd.DatetimeIndex(stamps.copy()))
+        del stamps, values
+        ind = compute_indicators(df)
+        out = np.ndarray((len(IND_COLUMNS), n), dtype=np.float64, buffer=shm_out.buf)
+        for i, c in enumerate(IND_COLUMNS):
+            out[i] = ind[c].to_numpy(dtype=np.float64, na_value=np.nan)
+        del out
+        rows = to_perf_rows(panel_performance(_get_close(df).to_frame(ticker), risk_free_rate_annual=rf,
+                                              periods_per_year=periods_per_year))
+    finally:
+        shm_in.close()
+        shm_out.close()
+    return ticker, rows, os.getpid(), time.perf_counter() - t0
+
+def analyze_one(ticker: str, raw: pd.DataFrame, rf: float = 0.0,
+                periods_per_year: int = TRADING_DAYS) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    """The serial equivalent of one pool task: indicators frame and performance rows."""
+    ind = compute_indicators(raw)
+    rows = to_perf_rows(panel_performance(_get_close(raw).to_frame(ticker), risk_free_rate_annual=rf,
+                                          periods_per_year=periods_per_year))
+    return ind, rows
+
+def analyze_parallel(
+    items: Iterable[Tuple[str, pd.DataFrame]],
+    workers: int,
+    rf: float = 0.0,
+    periods_per_year: int = TRADING_DAYS,
+    in_flight: Optional[int] = None,
+    stats: Optional[PoolStats] = None,
+) -> Iterator[Tuple[str, pd.DataFrame, pd.DataFrame, List[Dict[str, Any]]]]:
+    """
+    Yield (ticker, raw, indicators, perf_rows) for each (ticker, raw) in
+    `items`, in input order, with the analysis run in `workers` processes.
+    At most `in_flight` tickers (default 2 x workers) are submitted but not
+    yet yielded, so memory stays bounded while `items` (e.g. fetches) runs
+    ahead of the pool. Outputs equal analyze_one's.
+    """
+    in_flight = in_flight or 2 * workers
+    stats = stats if stats is not None else PoolStats(workers)
+    pending: deque = deque()
+    t0 = time.perf_counter()
+
+    def collect():
+        ticker, raw, shm_in, shm_out, fut = pending.popleft()
+        try:
+            _, rows, pid, busy = fut.result()
+            n = len(raw)
+            out = np.ndarray((len(IND_COLUMNS), n), dtype=np.float64, buffer=shm_out.buf).copy()
+        finally:
+            for shm in (shm_in, shm_out):
+                shm.close()
+                shm.unlink()
+        ind = pd.concat([raw, pd.DataFrame(out.T, index=raw.index, columns=IND_COLUMNS)], axis=1)
+        stats.busy[pid] = stats.busy.get(pid, 0.0) + busy
+        stats.tasks[pid] = stats.tasks.get(pid, 0) + 1
+        stats.wall = time.perf_counter() - t0
+        return ticker, raw, ind, rows
+
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        try:
+            for ticker, raw in items:
+                shm_in, block = _put_frame(raw)
+                shm_out = shared_memory.SharedMemory(create=True, size=max(8 * len(raw) * len(IND_COLUMNS), 1))
+                fut = ex.submit(_analyze_shared, (ticker, block, shm_out.name, rf, periods_per_year))
+                pending.append((ticker, raw, shm_in, shm_out, fut))
+                while len(pending) >= in_flight:
+                    yield collect()
+            while pending:
+                yield collect()
+        finally:
+            # aborted (consumer stopped early, or `items` raised): queued tasks are
+            # cancelled, running ones can't be, so let them finish with their blocks
+            # before unlinking them
+            for *_, fut in pending:
+                fut.cancel()
+            ex.shutdown(wait=True)
+            for _, _, shm_in, shm_out, _ in pending:
+                for shm in (shm_in, shm_out):
+                    shm.close()
+                    shm.unlink()
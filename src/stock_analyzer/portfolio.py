@@ -0,0 +1,196 @@
+from __future__ import annotations
+from typing import Dict, Any, List, Mapping, Optional, Union
+import numpy as np
+import pandas as pd
+from .analysis import TRADING_DAYS, PerfSummary, _get_close
+from .bootstrap import BootstrapConfig, bootstrap_ci
+from .trading_calendar import default_calendar
+
+PERF_COLUMNS = [f for f in PerfSummary.__dataclass_fields__ if f != "ci"]
+
+def close_panel(frames: Mapping[str, Union[pd.DataFrame, pd.Series]]) -> pd.DataFrame:
+    """(dates x tickers) close panel from per-ticker OHLCV frames or close series (outer-joined on date)."""
+    series = {t: _get_close(df) if isinstance(df, pd.DataFrame) else df for t, df in frames.items()}
+    panel = pd.concat(series, axis=1)
+    return panel.sort_index()
+
+def returns_panel(closes: pd.DataFrame) -> pd.DataFrame:
+    """
+    Simple returns per column against the previous *listed* close.
+    Rows where a ticker has no close stay NaN, so each column matches
+    `close.dropna().pct_change()` of that ticker alone.
+    """
+    prev = closes.ffill().shift(1)
+    ret = closes / prev - 1.0
+    return ret.where(closes.notna())
+
+def _first_last_valid(mask: np.ndarray):
+    n = mask.shape[0]
+    has = mask.any(axis=0)
+    first = np.where(has, mask.argmax(axis=0), 0)
+    last = np.where(has, n - 1 - mask[::-1].argmax(axis=0), 0)
+    return first, last, has
+
+def panel_performance(closes: pd.DataFrame, risk_free_rate_annual: float = 0.0,
+                      periods_per_year: int = TRADING_DAYS) -> pd.DataFrame:
+    """
+    `performance_summary` for every column of a close panel in one pass.
+    Returns a frame indexed by ticker with the PerfSummary fields plus
+    annualized `volatility`. Tickers are only measured over their listed span.
+    """
+    values = closes.to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    first, last, has = _first_last_valid(valid)
+    cols = np.arange(values.shape[1])
+
+    c0 = values[first, cols]
+    c1 = values[last, cols]
+    total_return = c1 / c0 - 1.0
+
+    idx = pd.DatetimeIndex(closes.index)
+    start = idx[first]
+    end = idx[last]
+    n_days = np.asarray((end - start).days, dtype=np.int64)
+    years = np.maximum(default_calendar().years_between(start, end), 1e-9)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cagr = np.where(total_return > -1, (1 + total_return) ** (1 / years) - 1, -1.0)
+
+    ret = returns_panel(closes)
+    avg = ret.mean().to_numpy()
+    std = ret.std().to_numpy()
+    count = ret.count().to_numpy()
+
+    rf_daily = (1 + risk_free_rate_annual) ** (1 / periods_per_year) - 1
+    excess = ret - rf_daily
+    ex_mean = excess.mean().to_numpy()
+    ex_std = excess.std().to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sharpe = np.where((ex_std > 0) & (count > 2), ex_mean / ex_std * np.sqrt(periods_per_year), np.nan)
+
+    mdd = (closes / closes.cummax() - 1.0).min().to_numpy()
+
+    out = pd.DataFrame(
+        {
+            "start": [str(d.date()) for d in start],
+            "end": [str(d.date()) for d in end],
+            "days": n_days,
+            "cagr": cagr,
+            "total_return": total_return,
+            "sharpe": sharpe,
+            "max_drawdown": mdd,
+            "avg_daily_return": avg,
+            "std_daily_return": std,
+            "volatility": std * np.sqrt(periods_per_year),
+        },
+        index=pd.Index(closes.columns, name="ticker"),
+    )
+    return out[has]
+
+def to_perf_rows(perf: pd.DataFrame) -> List[Dict[str, Any]]:
+    """`panel_performance` output as the `perf_rows` records written to performance.json."""
+    rows = []
+    for ticker, rec in zip(perf.index, perf[PERF_COLUMNS].to_dict("records")):
+        summary = PerfSummary(
+            start=rec["start"],
+            end=rec["end"],
+            days=int(rec["days"]),
+            **{k: float(rec[k]) for k in PERF_COLUMNS[3:]},
+        )
+        rows.append({"ticker": ticker, **summary.to_dict()})
+    return rows
+
+def attach_ci(
+    rows: List[Dict[str, Any]],
+    closes: pd.DataFrame,
+    config: BootstrapConfig,
+    risk_free_rate_annual: float = 0.0,
+    periods_per_year: int = TRADING_DAYS,
+) -> List[Dict[str, Any]]:
+    """Add bootstrap intervals (`"ci"`) to `to_perf_rows` records, one resampling run per ticker."""
+    ret = returns_panel(closes)
+    rf_daily = (1 + risk_free_rate_annual) ** (1 / periods_per_year) - 1
+    cal = default_calendar()
+    for row in rows:
+        years = max(float(cal.years_between(row["start"], row["end"])), 1e-9)
+        row["ci"] = bootstrap_ci(ret[row["ticker"]].dropna().to_numpy(), years, config,
+                                 rf_per_period=rf_daily, periods_per_year=periods_per_year)
+    return rows
+
+def _pairwise_moments(returns: pd.DataFrame):
+    x = returns.to_numpy(dtype=float)
+    m = (~np.isnan(x)).astype(float)
+    x0 = np.where(m > 0, x, 0.0)
+    n = m.T @ m                   # rows where both i and j are present
+    sx = x0.T @ m                 # sum of x_i over rows where j is present
+    sxx = (x0 * x0).T @ m         # sum of x_i^2 over rows where j is present
+    sxy = x0.T @ x0               # sum of x_i x_j over shared rows
+    return n, sx, sxx, sxy
+
+def covariance_matrix(returns: pd.DataFrame, annualize: bool = False,
+                      periods_per_year: int = TRADING_DAYS) -> pd.DataFrame:
+    """Pairwise-complete sample covariance (same as `DataFrame.cov()`), in matrix form."""
+    n, sx, _, sxy = _pairwise_moments(returns)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = (sxy - sx * sx.T / n) / (n - 1)
+    cov[n < 2] = np.nan
+    if annualize:
+        cov = cov * periods_per_year
+    return pd.DataFrame(cov, index=returns.columns, columns=returns.columns)
+
+def correlation_matrix(returns: pd.DataFrame) -> pd.DataFrame:
+    """Pairwise-complete Pearson correlation (same as `DataFrame.corr()`), in matrix form."""
+    n, sx, sxx, sxy = _pairwise_moments(returns)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sx.T / n
+        var_i = sxx - sx * sx / n          # var of i over rows shared with j
+        corr = cov / np.sqrt(var_i * var_i.T)
+    corr = np.clip(corr, -1.0, 1.0)
+    corr[n < 2] = np.nan
+    return pd.DataFrame(corr, index=returns.columns, columns=returns.columns)
+
+def _segments(index: pd.DatetimeIndex, rebalance: Optional[str]) -> np.ndarray:
+    if rebalance is None:
+        return np.zeros(len(index), dtype=np.int64)
+    if rebalance.upper() == "D":
+        return np.arange(len(index), dtype=np.int64)
+    periods = index.to_period(rebalance)
+    return pd.factorize(periods)[0]
+
+def portfolio_returns(
+    returns: pd.DataFrame,
+    weights: Union[Mapping[str, float], pd.Series, pd.DataFrame],
+    rebalance: Optional[str] = "M",
+) -> pd.Series:
+    """
+    Daily returns of a weighted portfolio.
+
+    `weights` is either a static target (mapping/Series over tickers) that is
+    restored at the start of each `rebalance` period ("D", "W", "M", "Q", "Y",
+    or None for buy-and-hold), or a DataFrame of target weights indexed by
+    rebalance dates. Between rebalances holdings drift with asset returns.
+    Missing returns (ticker not listed yet) count as 0, i.e. the sleeve idles.
+    """
+    returns = returns.sort_index()
+    idx = pd.DatetimeIndex(returns.index)
+    growth = 1.0 + returns.fillna(0.0)
+
+    if isinstance(weights, pd.DataFrame):
+        schedule = weights.sort_index().reindex(columns=returns.columns).fillna(0.0)
+        seg = np.searchsorted(pd.DatetimeIndex(schedule.index).values, idx.values, side="right") - 1
+        live = seg >= 0
+        w = schedule.to_numpy(dtype=float)[np.maximum(seg, 0)]
+        w[~live] = 0.0
+    else:
+        target = pd.Series(weights, dtype=float).reindex(returns.columns).fillna(0.0)
+        seg = _segments(idx, rebalance)
+        w = np.broadcast_to(target.to_numpy(), growth.shape)
+
+    # value of each sleeve since the last rebalance, per unit of starting capital
+    cum = growth.groupby(seg).cumprod().to_numpy()
+    value = (w * cum).sum(axis=1)
+    prev = pd.Series(value).groupby(seg).shift(1).to_numpy()
+    start_value = w.sum(axis=1)
+    prev = np.where(np.isnan(prev), start_value, prev)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = np.where(prev != 0, value / prev - 1.0, 0.0)
+    return pd.Series(out, index=returns.index, name="portfolio")
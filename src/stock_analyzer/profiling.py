@@ -0,0 +1,131 @@
+from __future__ import annotations
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_NULL = nullcontext()
+
+def _rss_max_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return rss / 2 ** 20 if sys.platform == "darwin" else rss / 2 ** 10
+
+class Profiler:
+    """
+    Per-stage (and per-ticker) wall time, CPU time and peak memory.
+
+    `peak_mb` is the stage's own tracemalloc peak above what was allocated
+    when it started. tracemalloc hooks every allocation: on the pandas-heavy
+    indicator/performance stages it roughly triples wall time, so with
+    `memory=False` it stays off and the times are undistorted (`peak_mb` is
+    then None). `process_rss_peak_mb` is the whole process's
+    resident-set high-water mark so far, not the stage's: it only grows.
+
+    When disabled, `stage()` hands back one shared null context, so the
+    instrumented code paths cost a method call and nothing else.
+    With `cprofile=True` every stage also runs under cProfile and the stats
+    of the slowest stage (by total wall time) are dumped next to profile.json.
+    """
+
+    def __init__(self, enabled: bool = False, cprofile: bool = False, command: str = "", memory: bool = True):
+        self.enabled = enabled or cprofile
+        self.cprofile = cprofile
+        self.memory = memory
+        self.command = command
+        self.records: List[Dict[str, Any]] = []
+        self._profiles: Dict[str, Any] = {}
+        self._t0 = time.perf_counter()
+        self._c0 = time.process_time()
+        if self.enabled and self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stage(self, name: str, ticker: Optional[str] = None):
+        if not self.enabled:
+            return _NULL
+        return self._measure(name, ticker)
+
+    @contextmanager
+    def _measure(self, name: str, ticker: Optional[str]):
+        prof = None
+        if self.cprofile:
+            import cProfile
+            prof = self._profiles.setdefault(name, cProfile.Profile())
+        tracing = self.memory and tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+        w0, c0 = time.perf_counter(), time.process_time()
+        if prof is not None:
+            prof.enable()
+        try:
+            yield
+        finally:
+            if prof is not None:
+                prof.disable()
+            wall, cpu = time.perf_counter() - w0, time.process_time() - c0
+            peak_mb = None
+            if tracing:
+                _, peak = tracemalloc.get_traced_memory()
+                peak_mb = max(peak - base, 0) / 2 ** 20
+            self.records.append({
+                "stage": name,
+                "ticker": ticker,
+                "wall_s": wall,
+                "cpu_s": cpu,
+                "peak_mb": peak_mb,
+                "process_rss_peak_mb": _rss_max_mb(),
+            })
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        out: Dict[str, Dict[str, Any]] = {}
+        for r in self.records:
+            s = out.setdefault(r["stage"], {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "peak_mb": None})
+            s["calls"] += 1
+            s["wall_s"] += r["wall_s"]
+            s["cpu_s"] += r["cpu_s"]
+            if r["peak_mb"] is not None:
+                s["peak_mb"] = max(s["peak_mb"] or 0.0, r["peak_mb"])
+        return out
+
+    def write(self, out_dir: str | Path, argv: Optional[List[str]] = None) -> Optional[Path]:
+        """Write `profile.json` (and `profile_<stage>.prof` with cProfile) into `out_dir`."""
+        if not self.enabled:
+            return None
+        out = Path(out_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        summary = self.summary()
+        slowest = max(summary, key=lambda k: summary[k]["wall_s"]) if summary else None
+
+        dump = None
+        if self.cprofile and slowest is not None:
+            dump = out / f"profile_{slowest}.prof"
+            self._profiles[slowest].dump_stats(str(dump))
+
+        doc = {
+            "command": self.command,
+            "argv": argv if argv is not None else sys.argv[1:],
+            "total": {
+                "wall_s": time.perf_counter() - self._t0,
+                "cpu_s": time.process_time() - self._c0,
+                "process_rss_peak_mb": _rss_max_mb(),
+            },
+            "tracemalloc": self.memory,
+            "slowest_stage": slowest,
+            "cprofile": dump.name if dump else None,
+            "summary": summary,
+            "stages": self.records,
+        }
+        path = out / "profile.json"
+        path.write_text(json.dumps(doc, indent=2), encoding="utf-8")
+        return path
@@ -0,0 +1,195 @@
+from __future__ import annotations
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+from .trading_calendar import default_calendar
+
+# Data-quality checks for fetched OHLCV frames (data.fetch_prices output
+# before its forward fill). Every check is one vectorized pass over the
+# columns; `repair_prices` applies the fixes that are safe to automate.
+
+ERRORS = ("duplicates", "non_positive", "high_low", "split_like")
+WARNINGS = ("nan_rows", "unsorted", "ohlc_range", "jumps", "stale", "zero_volume", "gaps")
+# 3:2 and 4:3 are left out: their moves (-33% / -25%) are ordinary crash sizes
+SPLIT_RATIOS = np.array([2.0, 3.0, 4.0, 5.0, 8.0, 10.0, 20.0])
+DAILY_INTERVALS = ("1d", "5d", "1wk", "1mo", "3mo")
+POLICIES = ("off", "warn", "fail")
+
+@dataclass
+class QualityReport:
+    ticker: str
+    rows: int
+    counts: Dict[str, int]                 # offending rows per check
+    first: Dict[str, str]                  # first offending timestamp per check
+    missing_sessions: int = 0              # exchange sessions without a bar
+    repairs: Dict[str, int] = field(default_factory=dict)
+    flags: Dict[str, np.ndarray] = field(default_factory=dict, repr=False)
+
+    @property
+    def errors(self) -> List[str]:
+        return [k for k in ERRORS if self.counts.get(k)]
+
+    @property
+    def warnings(self) -> List[str]:
+        return [k for k in WARNINGS if self.counts.get(k)]
+
+    @property
+    def status(self) -> str:
+        return "fail" if self.errors else ("warn" if self.warnings else "ok")
+
+    def summary(self) -> str:
+        parts = [f"{k}={self.counts[k]} (first {self.first[k]})" for k in self.errors + self.warnings]
+        return f"{self.ticker}: {self.status}" + (": " + ", ".join(parts) if parts else "")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"ticker": self.ticker, "status": self.status, "rows": self.rows,
+                "counts": self.counts, "first": self.first,
+                "missing_sessions": self.missing_sessions, "repairs": self.repairs}
+
+def _col(df: pd.DataFrame, name: str) -> np.ndarray:
+    if name in df.columns:
+        return df[name].to_numpy(dtype=float, na_value=np.nan)
+    return np.full(len(df), np.nan)
+
+def _prev(a: np.ndarray) -> np.ndarray:
+    out = np.empty_like(a)
+    out[:1] = np.nan
+    out[1:] = a[:-1]
+    return out
+
+def validate_prices(
+    df: pd.DataFrame,
+    ticker: str = "",
+    interval: str = "1d",
+    jump: float = 0.4,
+    split_tol: float = 0.03,
+    max_gap: int = 3,
+) -> QualityReport:
+    """
+    Check one ticker's OHLCV frame (rows in the order fetched):
+      errors    duplicates (repeated timestamps), non_positive prices,
+                high_low (High < Low), split_like (a `jump` whose close ratio is
+                within `split_tol` in log terms of a common split ratio and
+                whose whole High-Low range gapped past the previous bar's)
+      warnings  nan_rows, unsorted timestamps, ohlc_range (Open/Close outside
+                [Low, High]), jumps (|log close change| > `jump`), and for daily
+                bars: stale (OHLC identical to the previous bar), zero_volume,
+                gaps (more than `max_gap` exchange sessions without a bar)
+    """
+    o, h, l, c, v = (_col(df, k) for k in ("Open", "High", "Low", "Close", "Volume"))
+    n = len(df)
+    index = pd.DatetimeIndex(df.index)
+    daily = interval in DAILY_INTERVALS
+    flags: Dict[str, np.ndarray] = {}
+
+    prices = np.column_stack([o, h, l, c])
+    flags["nan_rows"] = np.isnan(prices).any(axis=1)
+    flags["duplicates"] = index.duplicated(keep="last")
+    stamps = index.values
+    flags["unsorted"] = np.concatenate(([False], stamps[1:] < stamps[:-1]))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        flags["non_positive"] = (prices <= 0).any(axis=1)
+        flags["high_low"] = h < l
+        tol = 1e-9 * np.abs(h)
+        flags["ohlc_range"] = ~flags["high_low"] & ((np.fmax(o, c) > h + tol) | (np.fmin(o, c) < l - tol))
+        logret = np.log(c / _prev(c))
+        flags["jumps"] = np.abs(logret) > jump
+        dist = np.abs(np.abs(logret)[:, None] - np.log(SPLIT_RATIOS)[None, :]).min(axis=1)
+        # corroboration: a split rescales the whole bar, so the ranges don't overlap
+        gapped = np.where(logret < 0, h < _prev(l), l > _prev(h))
+        flags["split_like"] = flags["jumps"] & (dist < split_tol) & gapped
+        flags["jumps"] &= ~flags["split_like"]
+    flags["stale"] = np.zeros(n, dtype=bool)
+    flags["zero_volume"] = np.zeros(n, dtype=bool)
+    flags["gaps"] = np.zeros(n, dtype=bool)
+    missing_sessions = 0
+    if daily and n > 1:
+        flags["stale"] = (prices == np.vstack([np.full((1, 4), np.nan), prices[:-1]])).all(axis=1)
+        flags["zero_volume"] = v == 0
+        if interval == "1d":
+            days = stamps.astype("datetime64[D]")
+            missing = default_calendar().count_sessions(days[:-1], days[1:]) - 1
+            missing = np.where(flags["unsorted"][1:] | flags["duplicates"][:-1], 0, np.maximum(missing, 0))
+            missing_sessions = int(missing.sum())
+            flags["gaps"] = np.concatenate(([False], missing > max_gap))
+
+    counts = {k: int(flags[k].sum()) for k in ERRORS + WARNINGS}
+    first = {k: str(index[np.argmax(flags[k])]) for k in counts if counts[k]}
+    return QualityReport(ticker=ticker, rows=n, counts=counts, first=first,
+                         missing_sessions=missing_sessions, flags=flags)
+
+def repair_prices(df: pd.DataFrame, report: Optional[QualityReport] = None,
+                  **validate_kwargs) -> pd.DataFrame:
+    """
+    Fixed copy of `df`: duplicate timestamps dropped (last kept) and rows
+    sorted; non-positive prices set to NaN; High/Low swapped where High < Low;
+    High/Low widened to contain Open/Close; history before a split-like jump
+    back-adjusted by the split ratio (prices divided, volume multiplied); then
+    the remaining gaps forward-filled as fetch_prices does. Stale bars, zero
+    volumes and missing sessions are only reported. The counts of each fix
+    are stored in `report.repairs` when a report is passed.
+    """
+    kw = {"ticker": report.ticker if report else "", **validate_kwargs}
+    repairs: Dict[str, int] = {}
+    out = df
+    if report is None or report.counts["duplicates"] or report.counts["unsorted"]:
+        dup = out.index.duplicated(keep="last")
+        repairs["duplicates"] = int(dup.sum())
+        out = out[~dup].sort_index(kind="stable")
+    out = out.copy()
+    flags = validate_prices(out, **kw).flags
+
+    price_cols = [k for k in ("Open", "High", "Low", "Close", "Adj Close") if k in out.columns]
+    if flags["non_positive"].any():
+        out.loc[flags["non_positive"], price_cols] = np.nan
+        repairs["non_positive"] = int(flags["non_positive"].sum())
+    h, l = _col(out, "High"), _col(out, "Low")
+    if flags["high_low"].any():
+        m = flags["high_low"]
+        out.loc[m, "High"], out.loc[m, "Low"] = l[m], h[m]
+        repairs["high_low"] = int(m.sum())
+    if flags["ohlc_range"].any():
+        o, c = _col(out, "Open"), _col(out, "Close")
+        out["High"] = np.fmax(_col(out, "High"), np.fmax(o, c))
+        out["Low"] = np.fmin(_col(out, "Low"), np.fmin(o, c))
+        repairs["ohlc_range"] = int(flags["ohlc_range"].sum())
+    if flags["split_like"].any():
+        c = _col(out, "Close")
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ratio = c / _prev(c)
+        logr = np.log(ratio)
+        nearest = SPLIT_RATIOS[np.abs(np.abs(logr)[:, None] - np.log(SPLIT_RATIOS)[None, :]).argmin(axis=1)]
+        step = np.where(flags["split_like"], np.where(logr < 0, 1.0 / nearest, nearest), 1.0)
+        # factor[j] = product of the split steps after bar j
+        factor = np.append(np.cumprod(step[::-1])[::-1][1:], 1.0)
+        for k in price_cols:
+            out[k] = _col(out, k) * factor
+        if "Volume" in out.columns:
+            out["Volume"] = _col(out, "Volume") / factor
+        repairs["split_like"] = int(flags["split_like"].sum())
+
+    out = out.ffill()
+    if report is not None:
+        report.repairs = repairs
+    return out
+
+def check_policy(reports: Iterable[QualityReport], policy: str = "warn") -> List[str]:
+    """Messages for reports that aren't ok. Under "fail", raises ValueError if any report has errors."""
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown quality policy: {policy!r}")
+    reports = list(reports)
+    if policy == "off":
+        return []
+    bad = [r for r in reports if r.status == "fail"]
+    if policy == "fail" and bad:
+        raise ValueError("Data-quality errors:\n  " + "\n  ".join(r.summary() for r in bad))
+    return [r.summary() for r in reports if r.status != "ok"]
+
+def write_quality(reports: Iterable[QualityReport], out_dir: str | Path) -> Path:
+    path = Path(out_dir) / "quality.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps([r.to_dict() for r in reports], indent=2), encoding="utf-8")
+    return path
@@ -0,0 +1,239 @@
+from __future__ import annotations
+import csv
+import hashlib
+import json
+import re
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .trading_calendar import default_calendar
+
+# Loader for raw OHLCV CSV exports (raw/stock_data, Yahoo/Nasdaq downloads).
+# The schema of each file -- which column is the date and how it's written,
+# which columns map to Open/High/Low/Close/Adj Close/Volume, whether numbers
+# carry "$" or thousands separators -- is sniffed from the header and a few
+# rows once, cached per file fingerprint, and the file is then parsed with
+# explicit dtypes instead of per-load string munging and date fallbacks. A
+# file whose "$"/"," only show up past the sample fails that parse; it is then
+# re-sniffed over every row and the cache entry replaced.
+
+WANTED_COLS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]   # same as data.WANTED_COLS
+SNIFF_ROWS = 64
+EXCHANGE_TZ = "America/New_York"
+
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_ISO_DATETIME = re.compile(r"^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?([+-]\d{2}:?\d{2}|Z)?$")
+_US_DATE = re.compile(r"^\d{1,2}/\d{1,2}/\d{4}$")
+
+@dataclass
+class CsvSchema:
+    date_col: str
+    date_kind: str                    # "iso-date" | "iso-daily-tz" | "iso-datetime" | "us-date"
+    columns: Dict[str, str]           # source column -> standard name
+    dtypes: Dict[str, str]            # standard name -> "float64" | "int64"
+    dirty: List[str] = field(default_factory=list)   # source columns with "$" / "," to strip
+    fingerprint: str = ""
+
+def _standard_name(col: str) -> Optional[str]:
+    # same mapping as merge_historical used to apply on every load
+    c = col.lower().replace("_", " ")
+    if "adj" in c and "close" in c:
+        return "Adj Close"
+    if "close" in c or c == "last" or "종가" in c:
+        return "Close"
+    for key, name in (("open", "Open"), ("high", "High"), ("low", "Low"), ("vol", "Volume")):
+        if key in c:
+            return name
+    return None
+
+def _date_kind(values: List[str]) -> str:
+    vals = [v.strip() for v in values if v.strip()]
+    if vals and all(_ISO_DATE.match(v) for v in vals):
+        return "iso-date"
+    if vals and all(_ISO_DATETIME.match(v) for v in vals):
+        daily = all(v[11:19] in ("00:00:00", "00:00") for v in vals)
+        tz = any(re.search(r"([+-]\d{2}:?\d{2}|Z)$", v[10:]) for v in vals)
+        return "iso-daily-tz" if daily and tz else ("iso-date" if daily else "iso-datetime")
+    if vals and all(_US_DATE.match(v) for v in vals):
+        return "us-date"
+    raise ValueError(f"Unrecognised date format, e.g. {vals[:1]}")
+
+def fingerprint(path: str | Path) -> str:
+    """Size + mtime + header line: changes whenever the file is replaced or rewritten."""
+    path = Path(path)
+    st = path.stat()
+    with open(path, "rb") as f:
+        header = f.readline()
+    return hashlib.sha1(b"%d:%d:" % (st.st_size, st.st_mtime_ns) + header).hexdigest()
+
+def sniff_schema(path: str | Path, sample_rows: Optional[int] = SNIFF_ROWS) -> CsvSchema:
+    """`sample_rows=None` looks at every row."""
+    path = Path(path)
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = [h.strip() for h in next(reader)]
+        rows = list(reader) if sample_rows is None else [r for _, r in zip(range(sample_rows), reader)]
+
+    date_col = next((h for h in header if "date" in h.lower() or h in ("날짜", "일자")), None)
+    if date_col is None:
+        raise ValueError(f"No date column in {path.name}: {header}")
+    di = header.index(date_col)
+
+    columns: Dict[str, str] = {}
+    for h in header:
+        name = _standard_name(h) if h != date_col else None
+        if name and name not in columns.values():
+            columns[h] = name
+    if "Close" not in columns.values():
+        raise ValueError(f"No close column in {path.name}: {header}")
+
+    dtypes: Dict[str, str] = {}
+    dirty: List[str] = []
+    for h, name in columns.items():
+        i = header.index(h)
+        vals = [r[i].strip() for r in rows if i < len(r) and r[i].strip()]
+        if any("$" in v or "," in v for v in vals):
+            dirty.append(h)
+        clean = [v.replace("$", "").replace(",", "") for v in vals]
+        is_int = bool(clean) and all(re.fullmatch(r"-?\d+", v) for v in clean)
+        dtypes[name] = "int64" if name == "Volume" and is_int else "float64"
+
+    return CsvSchema(
+        date_col=date_col,
+        date_kind=_date_kind([r[di] for r in rows if di < len(r)]),
+        columns=columns,
+        dtypes=dtypes,
+        dirty=dirty,
+        fingerprint=fingerprint(path),
+    )
+
+class SchemaCache:
+    """Resolved schemas keyed by file fingerprint, optionally persisted as JSON."""
+
+    def __init__(self, path: Optional[str | Path] = None):
+        self.path = Path(path) if path else None
+        self._data: Dict[str, CsvSchema] = {}
+        if self.path and self.path.exists():
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+            self._data = {k: CsvSchema(**v) for k, v in raw.items()}
+
+    def get(self, path: str | Path) -> CsvSchema:
+        fp = fingerprint(path)
+        schema = self._data.get(fp)
+        if schema is None:
+            schema = sniff_schema(path)
+            self.put(schema)
+        return schema
+
+    def put(self, schema: CsvSchema) -> None:
+        """Store (or replace) the entry for `schema.fingerprint`."""
+        self._data[schema.fingerprint] = schema
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps({k: asdict(v) for k, v in self._data.items()}, indent=1),
+                                 encoding="utf-8")
+
+_MEMORY_CACHE = SchemaCache()
+
+def _parse_dates(s: pd.Series, kind: str) -> pd.DatetimeIndex:
+    if kind in ("iso-date", "iso-daily-tz"):
+        # daily bars (midnight exchange-local when tz-stamped): the calendar date is the first 10 chars
+        return pd.DatetimeIndex(pd.to_datetime(s.str.slice(0, 10), format="%Y-%m-%d"))
+    if kind == "us-date":
+        return pd.DatetimeIndex(pd.to_datetime(s, format="%m/%d/%Y"))
+    ts = pd.to_datetime(s, format="ISO8601", utc=True)
+    return pd.DatetimeIndex(ts).tz_convert(EXCHANGE_TZ).tz_localize(None)
+
+def _read_columns(path: str | Path, schema: CsvSchema) -> pd.DataFrame:
+    usecols = [schema.date_col, *schema.columns]
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pcsv
+    except ImportError:
+        pa = None
+    if pa is not None:
+        # pyarrow's reader directly: explicit column types, no inference pass
+        types = {c: pa.string() if c in schema.dirty or c == schema.date_col else pa.float64() for c in usecols}
+        table = pcsv.read_csv(path, convert_options=pcsv.ConvertOptions(column_types=types, include_columns=usecols))
+        return pd.DataFrame({c: table.column(c).to_pandas() for c in usecols})
+    dtype = {c: str if c in schema.dirty or c == schema.date_col else "float64" for c in usecols}
+    return pd.read_csv(path, usecols=usecols, dtype=dtype, float_precision="round_trip")
+
+def read_price_csv(path: str | Path, schema: Optional[CsvSchema] = None,
+                   cache: Optional[SchemaCache] = None) -> pd.DataFrame:
+    """
+    One raw CSV as a date-indexed OHLCV frame with the standard column names
+    ("Adj Close" mirrors Close when the file has none), sorted by date.
+    """
+    cache = cache or _MEMORY_CACHE
+    schema = schema or cache.get(path)
+    try:
+        df = _read_columns(path, schema)
+    except ValueError:
+        # the sample missed "$"/"," further down (pyarrow's ArrowInvalid is a ValueError too)
+        full = sniff_schema(path, sample_rows=None)
+        if full.dirty == schema.dirty:
+            raise
+        schema = full
+        cache.put(schema)
+        df = _read_columns(path, schema)
+
+    index = _parse_dates(df[schema.date_col], schema.date_kind)
+    out = {}
+    for src, name in schema.columns.items():
+        col = df[src]
+        if src in schema.dirty:
+            col = pd.to_numeric(col.str.replace(r"[$,\s]", "", regex=True), errors="coerce")
+        values = col.to_numpy(dtype="float64", na_value=np.nan)
+        if schema.dtypes.get(name) == "int64" and not np.isnan(values).any():
+            values = values.astype("int64")
+        out[name] = values
+    frame = pd.DataFrame(out, index=pd.DatetimeIndex(index, name="date"))
+    if "Adj Close" not in frame:
+        frame["Adj Close"] = frame["Close"]
+    frame = frame[[c for c in WANTED_COLS if c in frame.columns]]
+    return frame.sort_index(kind="stable")
+
+@dataclass
+class LoadReport:
+    files: List[str]
+    rows: int
+    duplicates: int                   # rows dropped because an earlier/later file had the same date
+    conflicts: int                    # of those, how many disagreed on Close
+    gaps: List[Tuple[str, str, int]]  # (last date before, first date after, sessions missing)
+
+def load_price_history(
+    paths: Iterable[str | Path],
+    cache: Optional[SchemaCache] = None,
+    max_gap_bdays: int = 5,
+    keep: str = "last",
+) -> Tuple[pd.DataFrame, LoadReport]:
+    """
+    Read several raw files (each with its own cached schema), concatenate,
+    drop duplicate dates (`keep="last"`: later files win) and report gaps of
+    more than `max_gap_bdays` missing exchange sessions between consecutive bars.
+    """
+    paths = [Path(p) for p in paths]
+    frames = [read_price_csv(p, cache=cache) for p in paths]
+    df = pd.concat(frames).sort_index(kind="stable")
+
+    dup = df.index.duplicated(keep=keep)
+    conflicts = 0
+    if dup.any():
+        dates = df.index[dup]
+        closes = df.loc[df.index.isin(dates), "Close"].groupby(level=0)
+        conflicts = int((closes.max() - closes.min() > 1e-9 * closes.max().abs()).sum())
+    df = df[~dup]
+
+    gaps: List[Tuple[str, str, int]] = []
+    if len(df) > 1:
+        d = df.index.values.astype("datetime64[D]")
+        missing = default_calendar().count_sessions(d[:-1], d[1:]) - 1
+        for i in np.flatnonzero(missing > max_gap_bdays):
+            gaps.append((str(d[i]), str(d[i + 1]), int(missing[i])))
+
+    report = LoadReport(files=[p.name for p in paths], rows=len(df), duplicates=int(dup.sum()),
+                        conflicts=conflicts, gaps=gaps)
+    return df, report
@@ -0,0 +1,354 @@
+from __future__ import annotations
+import argparse
+import json
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+# Replay a stored price file bar by bar, as if it were a live feed:
+# indicators and alert rules are updated in O(1) per bar and each bar's
+# processing time is recorded, so we know the headroom before bars queue up.
+#   stock-replay "raw/stock_data/Amazon stock data 2006.12-2021.10.csv" --speed 86400
+#   stock-replay out/prices.parquet --ticker AAPL --rsi 30,70 --sma 20,50 --max-drawdown 0.2
+
+_RAW_COLUMNS = {"open": "Open", "high": "High", "low": "Low", "close": "Close",
+                "adj_close": "Adj Close", "adj close": "Adj Close", "volume": "Volume", "ticker": "Ticker"}
+
+def load_bars(path: str | Path, ticker: Optional[str] = None) -> pd.DataFrame:
+    """
+    OHLCV bars from a raw `date,open,...,adj_close,volume` CSV or an exported
+    `prices.parquet` / `prices.csv` (pick one ticker with `ticker`).
+    Timezone-aware dates are converted to exchange-local naive timestamps.
+    """
+    path = Path(path)
+    df = pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path)
+    df = df.rename(columns={c: _RAW_COLUMNS.get(str(c).lower(), c) for c in df.columns})
+    if "date" in df.columns:
+        df = df.set_index("date")
+    idx = df.index
+    if not isinstance(idx, pd.DatetimeIndex):
+        idx = pd.to_datetime(idx, utc=True).tz_convert("America/New_York").tz_localize(None)
+    elif idx.tz is not None:
+        idx = idx.tz_convert("America/New_York").tz_localize(None)
+    df.index = pd.DatetimeIndex(idx, name="date")
+    if ticker is not None and "Ticker" in df.columns:
+        df = df[df["Ticker"] == ticker.upper()]
+    elif "Ticker" in df.columns and df["Ticker"].nunique() > 1:
+        raise ValueError(f"{path} holds several tickers; pick one with ticker=")
+    if df.empty:
+        raise ValueError(f"No bars in {path}" + (f" for {ticker}" if ticker else ""))
+    if "Adj Close" not in df.columns:
+        df["Adj Close"] = df["Close"]
+    return df.sort_index()
+
+# ---- incremental indicators ----
+
+class _Window:
+    """Fixed-size window with running sum / sum of squares (centred on the first value)."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.buf: deque = deque(maxlen=size)
+        self.shift: Optional[float] = None
+        self.s1 = 0.0
+        self.s2 = 0.0
+
+    def push(self, x: float) -> None:
+        if self.shift is None:
+            self.shift = x
+        x -= self.shift
+        if len(self.buf) == self.size:
+            old = self.buf[0]
+            self.s1 -= old
+            self.s2 -= old * old
+        self.buf.append(x)
+        self.s1 += x
+        self.s2 += x * x
+
+    @property
+    def full(self) -> bool:
+        return len(self.buf) == self.size
+
+    def mean(self) -> float:
+        return self.s1 / self.size + self.shift if self.full else math.nan
+
+    def std(self) -> float:
+        if not self.full:
+            return math.nan
+        return math.sqrt(max((self.s2 - self.s1 * self.s1 / self.size) / (self.size - 1), 0.0))
+
+class _Ema:
+    # pandas ewm(adjust=False): seeded with the first value
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.value = math.nan
+
+    def push(self, x: float) -> float:
+        self.value = x if math.isnan(self.value) else self.value + self.alpha * (x - self.value)
+        return self.value
+
+class IncrementalIndicators:
+    """
+    Per-bar versions of the `compute_indicators` columns. `update(close)`
+    returns the same values the batch function gives for that bar.
+    """
+
+    def __init__(self):
+        self.sma20 = _Window(20)
+        self.sma50 = _Window(50)
+        self.ret21 = _Window(21)
+        self.ema12 = _Ema(2 / 13)
+        self.ema26 = _Ema(2 / 27)
+        self.signal = _Ema(2 / 10)
+        self.gain = _Ema(1 / 14)
+        self.loss = _Ema(1 / 14)
+        self.prev: Optional[float] = None
+        self.first: Optional[float] = None
+        self.peak = -math.inf
+
+    def update(self, close: float) -> Dict[str, float]:
+        self.sma20.push(close)
+        self.sma50.push(close)
+        e12, e26 = self.ema12.push(close), self.ema26.push(close)
+        macd_line = e12 - e26
+        sig = self.signal.push(macd_line)
+
+        ret = math.nan
+        rsi = math.nan
+        if self.prev is None:
+            self.first = close
+        else:
+            ret = close / self.prev - 1.0
+            self.ret21.push(ret)
+            delta = close - self.prev
+            gain = self.gain.push(max(delta, 0.0))
+            loss = self.loss.push(max(-delta, 0.0))
+            if loss > 0:
+                rsi = 100 - 100 / (1 + gain / loss)
+        self.prev = close
+        self.peak = max(self.peak, close)
+
+        mid, sd = self.sma20.mean(), self.sma20.std()
+        return {
+            "SMA20": mid,
+            "SMA50": self.sma50.mean(),
+            "EMA12": e12,
+            "EMA26": e26,
+            "RSI14": rsi,
+            "MACD": macd_line,
+            "MACD_SIGNAL": sig,
+            "MACD_HIST": macd_line - sig,
+            "BB_MID": mid,
+            "BB_UPPER": mid + 2 * sd,
+            "BB_LOWER": mid - 2 * sd,
+            "RET_DAILY": ret,
+            "RET_CUM": close / self.first - 1.0 if ret == ret else math.nan,
+            "VOL21": self.ret21.std(),
+            "DRAWDOWN": close / self.peak - 1.0,
+        }
+
+# ---- alert rules ----
+
+@dataclass
+class Alert:
+    time: str
+    rule: str
+    message: str
+    value: float
+
+class RsiThreshold:
+    """Fires when RSI14 crosses below `low` or above `high`."""
+
+    def __init__(self, low: float = 30.0, high: float = 70.0):
+        self.name = f"rsi<{low:g}|>{high:g}"
+        self.low, self.high = low, high
+        self.zone = 0
+
+    def check(self, ind: Dict[str, float]) -> Optional[str]:
+        r = ind["RSI14"]
+        if r != r:
+            return None
+        zone = -1 if r < self.low else (1 if r > self.high else 0)
+        fired = zone != 0 and zone != self.zone
+        self.zone = zone
+        if fired:
+            return f"RSI14 {r:.1f} {'below' if zone < 0 else 'above'} {self.low if zone < 0 else self.high:g}"
+        return None
+
+class SmaCross:
+    """Fires when SMA`fast` crosses SMA`slow` (golden / death cross)."""
+
+    def __init__(self, fast: int = 20, slow: int = 50):
+        self.name = f"sma{fast}x{slow}"
+        self.fast, self.slow = f"SMA{fast}", f"SMA{slow}"
+        self.side = 0
+
+    def check(self, ind: Dict[str, float]) -> Optional[str]:
+        f, s = ind[self.fast], ind[self.slow]
+        if f != f or s != s or f == s:
+            return None
+        side = 1 if f > s else -1
+        fired = self.side != 0 and side != self.side
+        self.side = side
+        if fired:
+            return f"{self.fast} crossed {'above' if side > 0 else 'below'} {self.slow}"
+        return None
+
+class DrawdownLimit:
+    """Fires when the drawdown from the running peak breaches `-limit` (re-arms after recovery)."""
+
+    def __init__(self, limit: float = 0.2):
+        self.name = f"drawdown>{limit:.0%}"
+        self.limit = abs(limit)
+        self.breached = False
+
+    def check(self, ind: Dict[str, float]) -> Optional[str]:
+        dd = ind["DRAWDOWN"]
+        breached = dd <= -self.limit
+        fired = breached and not self.breached
+        self.breached = breached
+        return f"drawdown {dd:.1%} beyond -{self.limit:.0%}" if fired else None
+
+_RULE_VALUE = {RsiThreshold: "RSI14", SmaCross: "SMA20", DrawdownLimit: "DRAWDOWN"}
+
+# ---- replay loop ----
+
+def iter_bars(df: pd.DataFrame, speed: Optional[float] = None) -> Iterator[Tuple[pd.Timestamp, Dict[str, float], float]]:
+    """
+    Yield (timestamp, bar, lag_seconds). With `speed` (market seconds per
+    wall second, e.g. 86400 = one daily bar per second) bars are paced to
+    their timestamps; lag is how late each bar is handed out.
+    """
+    cols = [c for c in ("Open", "High", "Low", "Close", "Adj Close", "Volume") if c in df.columns]
+    values = df[cols].to_numpy(dtype=float)
+    ts = df.index
+    offsets = (ts.values - ts.values[0]) / np.timedelta64(1, "s")
+    t0 = time.perf_counter()
+    for i in range(len(df)):
+        lag = 0.0
+        if speed:
+            due = t0 + offsets[i] / speed
+            now = time.perf_counter()
+            if due > now:
+                time.sleep(due - now)
+            else:
+                lag = now - due
+        yield ts[i], dict(zip(cols, values[i])), lag
+
+def _percentiles(x: np.ndarray) -> Dict[str, float]:
+    if not len(x):
+        return {}
+    q = np.percentile(x, [50, 90, 99])
+    return {"p50": float(q[0]), "p90": float(q[1]), "p99": float(q[2]), "max": float(x.max()), "mean": float(x.mean())}
+
+def replay(
+    df: pd.DataFrame,
+    rules: Sequence[Any] = (),
+    speed: Optional[float] = None,
+    on_alert: Optional[Callable[[Alert], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Stream `df` through IncrementalIndicators and `rules`; returns alerts,
+    per-bar latency percentiles (microseconds) and the headroom against the
+    bar interval at `speed`.
+    """
+    ind = IncrementalIndicators()
+    alerts: List[Alert] = []
+    latency = np.empty(len(df))
+    lags = np.empty(len(df))
+    close_col = "Adj Close" if "Adj Close" in df.columns else "Close"
+    t_start = time.perf_counter()
+    for i, (ts, bar, lag) in enumerate(iter_bars(df, speed)):
+        t0 = time.perf_counter()
+        values = ind.update(bar[close_col])
+        for rule in rules:
+            msg = rule.check(values)
+            if msg is not None:
+                alert = Alert(str(ts), rule.name, msg, float(values[_RULE_VALUE.get(type(rule), "RSI14")]))
+                alerts.append(alert)
+                if on_alert is not None:
+                    on_alert(alert)
+        latency[i] = time.perf_counter() - t0
+        lags[i] = lag
+    elapsed = time.perf_counter() - t_start
+
+    lat_us = latency * 1e6
+    bar_seconds = float(np.median(np.diff(df.index.values) / np.timedelta64(1, "s"))) if len(df) > 1 else math.nan
+    budget_us = bar_seconds / speed * 1e6 if speed else math.nan
+    p99 = float(np.percentile(lat_us, 99)) if len(lat_us) else math.nan
+    return {
+        "bars": len(df),
+        "start": str(df.index[0]),
+        "end": str(df.index[-1]),
+        "speed": speed,
+        "elapsed_s": elapsed,
+        "bars_per_s": len(df) / elapsed if elapsed > 0 else math.nan,
+        "latency_us": _percentiles(lat_us),
+        "lag_ms": _percentiles(lags * 1e3) if speed else {},
+        "bar_budget_us": budget_us,
+        # how many times faster than the feed we process a bar at p99 (NaN when unpaced)
+        "headroom_p99": budget_us / p99 if speed and p99 > 0 else math.nan,
+        # fastest feed (market s per wall s) we'd keep up with at p99 latency
+        "max_speed_p99": bar_seconds / (p99 / 1e6) if p99 > 0 else math.nan,
+        "alerts": [asdict(a) for a in alerts],
+    }
+
+def build_rules(rsi: Optional[str] = None, sma: Optional[str] = None,
+                max_drawdown: Optional[float] = None) -> List[Any]:
+    rules: List[Any] = []
+    if rsi:
+        low, high = (float(v) for v in rsi.split(","))
+        rules.append(RsiThreshold(low, high))
+    if sma:
+        fast, slow = (int(v) for v in sma.split(","))
+        if {fast, slow} - {20, 50}:
+            raise ValueError("Only SMA20/SMA50 are maintained incrementally (use --sma 20,50)")
+        rules.append(SmaCross(fast, slow))
+    if max_drawdown is not None:
+        rules.append(DrawdownLimit(max_drawdown))
+    return rules
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="stock-replay",
+        description="Replay a stored price file as a live bar stream with incremental indicators and alerts."
+    )
+    p.add_argument("path", help="Raw OHLCV CSV or exported prices.parquet/prices.csv")
+    p.add_argument("--ticker", help="Ticker to replay when the file holds several")
+    p.add_argument("--speed", type=float, default=0,
+                   help="Market seconds per wall second (86400 = 1 daily bar/s); 0 = as fast as possible")
+    p.add_argument("--rsi", default="30,70", help="RSI14 alert thresholds LOW,HIGH [default: 30,70]")
+    p.add_argument("--sma", default="20,50", help="SMA cross alert FAST,SLOW [default: 20,50]")
+    p.add_argument("--max-drawdown", type=float, default=0.2,
+                   help="Drawdown alert limit as a fraction [default: 0.2]")
+    p.add_argument("--quiet", action="store_true", help="Don't print alerts as they fire")
+    p.add_argument("--json", help="Write the latency report and alerts to this JSON path")
+    return p
+
+def main():
+    args = build_parser().parse_args()
+    df = load_bars(args.path, args.ticker)
+    rules = build_rules(args.rsi, args.sma, args.max_drawdown)
+    on_alert = None if args.quiet else (lambda a: print(f"🔔 {a.time}  {a.rule:<16} {a.message}"))
+    result = replay(df, rules, speed=args.speed or None, on_alert=on_alert)
+
+    lat = result["latency_us"]
+    print(f"✅ Replayed {result['bars']} bars ({result['start']} → {result['end']}) in {result['elapsed_s']:.2f}s")
+    print(f"   Alerts     : {len(result['alerts'])}")
+    print(f"   Latency µs : p50 {lat['p50']:.1f}  p90 {lat['p90']:.1f}  p99 {lat['p99']:.1f}  max {lat['max']:.1f}")
+    if args.speed:
+        lag = result["lag_ms"]
+        print(f"   Budget/bar : {result['bar_budget_us']:.0f} µs  (headroom ×{result['headroom_p99']:.0f} at p99)")
+        print(f"   Feed lag ms: p50 {lag['p50']:.2f}  p99 {lag['p99']:.2f}  max {lag['max']:.2f}")
+    print(f"   Max speed  : ×{result['max_speed_p99']:,.0f} before bars queue (p99)")
+    if args.json:
+        Path(args.json).write_text(json.dumps(result, indent=2), encoding="utf-8")
+        print(f"   Report     : {args.json}")
+
+if __name__ == "__main__":
+    main()
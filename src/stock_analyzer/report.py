@@ -1,73 +1,98 @@
 from __future__ import annotations
 from pathlib import Path
+from typing import Optional, List, Mapping, Tuple
+import os
 import pandas as pd
-import matplotlib.pyplot as plt
-from .analysis import compute_indicators, performance_summary
-
-def _save_price_chart(df: pd.DataFrame, out: Path):
-    fig, ax = plt.subplots()
-    df["Adj Close"].plot(ax=ax, label="Adj Close")
-    if "SMA20" in df: df["SMA20"].plot(ax=ax, label="SMA20")
-    if "SMA50" in df: df["SMA50"].plot(ax=ax, label="SMA50")
-    ax.set_title("Price (Adj Close) with SMAs")
-    ax.set_xlabel("Date"); ax.set_ylabel("Price")
-    ax.legend()
-    fig.tight_layout()
-    fig.savefig(out / "price.png", dpi=160)
-    plt.close(fig)
-
-def _save_returns_hist(ret: pd.Series, out: Path):
-    fig, ax = plt.subplots()
-    ret.hist(ax=ax, bins=50)
-    ax.set_title("Daily Returns Histogram")
-    ax.set_xlabel("Return"); ax.set_ylabel("Frequency")
-    fig.tight_layout()
-    fig.savefig(out / "returns_hist.png", dpi=160)
-    plt.close(fig)
-
-def _save_drawdown_curve(df: pd.DataFrame, out: Path):
-    if "DRAWDOWN" not in df: return
-    fig, ax = plt.subplots()
-    df["DRAWDOWN"].plot(ax=ax)
-    ax.set_title("Drawdown")
-    ax.set_xlabel("Date"); ax.set_ylabel("Drawdown")
-    fig.tight_layout()
-    fig.savefig(out / "drawdown.png", dpi=160)
-    plt.close(fig)
+from .analysis import TRADING_DAYS, compute_indicators, performance_summary
+from .bootstrap import BootstrapConfig, flatten_ci
+from .charts import ChartSpec, line_data, render_charts
+from .profiling import Profiler
+from .sketch import QuantileSketch
 
-def write_report(
+def _price_chart(df: pd.DataFrame, out: Path) -> ChartSpec:
+    lines = {"Adj Close": line_data(df["Adj Close"])}
+    if "SMA20" in df: lines["SMA20"] = line_data(df["SMA20"])
+    if "SMA50" in df: lines["SMA50"] = line_data(df["SMA50"])
+    return ChartSpec(out / "price.png", "Price (Adj Close) with SMAs", "Date", "Price",
+                     lines=lines, legend=True)
+
+def _returns_hist(sketch: QuantileSketch, out: Path) -> ChartSpec:
+    return ChartSpec(out / "returns_hist.png", "Daily Returns Histogram", "Return", "Frequency",
+                     hist=sketch.histogram(bins=50))
+
+def _drawdown_curve(df: pd.DataFrame, out: Path) -> Optional[ChartSpec]:
+    if "DRAWDOWN" not in df: return None
+    return ChartSpec(out / "drawdown.png", "Drawdown", "Date", "Drawdown",
+                     lines={"DRAWDOWN": line_data(df["DRAWDOWN"])})
+
+def _chart_specs(df: pd.DataFrame, out: Path, sketch: Optional[QuantileSketch] = None) -> List[ChartSpec]:
+    specs = [_price_chart(df, out)]
+    if sketch is not None and sketch.count:
+        specs.append(_returns_hist(sketch, out))
+    dd = _drawdown_curve(df, out)
+    if dd is not None:
+        specs.append(dd)
+    return specs
+
+def _prepare_report(
     raw_df: pd.DataFrame,
     out_dir: str | Path,
     dataset_name: str,
     risk_free_rate_annual: float = 0.0,
-) -> Path:
+    bootstrap: Optional[BootstrapConfig] = None,
+    profiler: Optional[Profiler] = None,
+    periods_per_year: int = TRADING_DAYS,
+    indicators: Optional[pd.DataFrame] = None,
+) -> Tuple[Path, List[ChartSpec]]:
+    # Writes every artifact except the PNGs and returns the chart specs to render.
+    prof = profiler or Profiler()
     out = Path(out_dir)
     out.mkdir(parents=True, exist_ok=True)
 
     # compute indicators & perf
-    df = compute_indicators(raw_df)
-    perf = performance_summary(raw_df, risk_free_rate_annual=risk_free_rate_annual)
+    if indicators is not None:        # already computed by the caller (stock-parse)
+        df = indicators
+    else:
+        with prof.stage("indicators", dataset_name):
+            df = compute_indicators(raw_df)
+    with prof.stage("performance", dataset_name):
+        perf = performance_summary(raw_df, risk_free_rate_annual=risk_free_rate_annual,
+                                   bootstrap=bootstrap, periods_per_year=periods_per_year)
 
     # save artifacts
-    df.to_csv(out / "timeseries_with_indicators.csv")
-    raw_df.to_csv(out / "raw_prices.csv")
-    pd.DataFrame([perf.to_dict()]).to_csv(out / "performance_summary.csv", index=False)
+    with prof.stage("export", dataset_name):
+        df.to_csv(out / "timeseries_with_indicators.csv")
+        raw_df.to_csv(out / "raw_prices.csv")
+        row = perf.to_dict()
+        row.update(flatten_ci(row.pop("ci", None)))
+        pd.DataFrame([row]).to_csv(out / "performance_summary.csv", index=False)
 
-    # charts
-    _save_price_chart(df, out)
-    if "RET_DAILY" in df:
-        _save_returns_hist(df["RET_DAILY"].dropna(), out)
-    _save_drawdown_curve(df, out)
+    # histogram and tail risk come from the returns sketch, not the full series
+    sketch = QuantileSketch().update(df["RET_DAILY"]) if "RET_DAILY" in df else None
+    with prof.stage("chart_data", dataset_name):
+        specs = _chart_specs(df, out, sketch)
 
     # markdown report
     md = []
     md.append(f"# Stock Price Analyzer — {dataset_name}\n")
     md.append("## Performance Summary")
+    pct_keys = {"cagr", "total_return", "max_drawdown", "avg_daily_return", "std_daily_return"}
+    ci = perf.ci or {}
     for k, v in perf.to_dict().items():
-        if isinstance(v, float) and k in {"cagr", "total_return", "max_drawdown", "avg_daily_return", "std_daily_return"}:
-            md.append(f"- **{k}**: {v:.4%}")
-        else:
-            md.append(f"- **{k}**: {v}")
+        if k == "ci":
+            continue
+        fmt = "{:.4%}" if isinstance(v, float) and k in pct_keys else "{}"
+        line = f"- **{k}**: {fmt.format(v)}"
+        if k in ci:
+            lo, hi = ci[k]
+            line += f" ({ci['level']:.0%} CI: {fmt.format(lo)} – {fmt.format(hi)})"
+        md.append(line)
+    if ci:
+        md.append(f"\n_Intervals: {ci['method']} bootstrap, {ci['n_paths']:,} paths, seed {ci['seed']}._")
+    if sketch is not None and sketch.count:
+        md.append("\n## Tail Risk (daily returns)")
+        for level in (0.95, 0.99):
+            md.append(f"- **VaR {level:.0%}**: {sketch.var(level):.4%} · **CVaR {level:.0%}**: {sketch.cvar(level):.4%}")
     md.append("\n## Files")
     md.append("- `raw_prices.csv` — original OHLCV")
     md.append("- `timeseries_with_indicators.csv` — price + indicators")
@@ -80,4 +105,72 @@ def write_report(
 
     report_path = out / "report.md"
     report_path.write_text("\n".join(md), encoding="utf-8")
+    return report_path, specs
+
+def write_report(
+    raw_df: pd.DataFrame,
+    out_dir: str | Path,
+    dataset_name: str,
+    risk_free_rate_annual: float = 0.0,
+    bootstrap: Optional[BootstrapConfig] = None,
+    chart_workers: int = 1,
+    profiler: Optional[Profiler] = None,
+    periods_per_year: int = TRADING_DAYS,
+) -> Path:
+    prof = profiler or Profiler()
+    report_path, specs = _prepare_report(raw_df, out_dir, dataset_name,
+                                         risk_free_rate_annual=risk_free_rate_annual,
+                                         bootstrap=bootstrap, profiler=prof,
+                                         periods_per_year=periods_per_year)
+    # charts whose inputs haven't changed since the last run are not redrawn
+    with prof.stage("charts", dataset_name):
+        render_charts(specs, workers=chart_workers)
     return report_path
+
+class UniverseReport:
+    """
+    Reports for many tickers under `out_dir/<TICKER>/`. `add()` writes one
+    ticker's CSVs and report.md and keeps only its (downsampled) chart specs,
+    so tickers can stream through; `render()` then draws every chart of every
+    ticker in a single process pool.
+    """
+
+    def __init__(self, out_dir: str | Path, risk_free_rate_annual: float = 0.0,
+                 bootstrap: Optional[BootstrapConfig] = None, periods_per_year: int = TRADING_DAYS,
+                 profiler: Optional[Profiler] = None):
+        self.out = Path(out_dir)
+        self.rf = risk_free_rate_annual
+        self.bootstrap = bootstrap
+        self.periods_per_year = periods_per_year
+        self.prof = profiler or Profiler()
+        self.paths: List[Path] = []
+        self.specs: List[ChartSpec] = []
+
+    def add(self, raw_df: pd.DataFrame, ticker: str, indicators: Optional[pd.DataFrame] = None) -> Path:
+        """Write `ticker`'s report files; `indicators` = compute_indicators(raw_df) if already at hand."""
+        path, specs = _prepare_report(raw_df, self.out / ticker, ticker, risk_free_rate_annual=self.rf,
+                                      bootstrap=self.bootstrap, profiler=self.prof,
+                                      periods_per_year=self.periods_per_year, indicators=indicators)
+        self.paths.append(path)
+        self.specs.extend(specs)
+        return path
+
+    def render(self, workers: Optional[int] = None, force: bool = False) -> List[bool]:
+        """Draw all collected charts (unchanged ones are skipped); `workers` defaults to the CPU count."""
+        with self.prof.stage("charts"):
+            return render_charts(self.specs, workers=workers or os.cpu_count() or 1, force=force)
+
+def write_universe_report(
+    raw_frames: Mapping[str, pd.DataFrame],
+    out_dir: str | Path,
+    risk_free_rate_annual: float = 0.0,
+    bootstrap: Optional[BootstrapConfig] = None,
+    chart_workers: Optional[int] = None,
+    periods_per_year: int = TRADING_DAYS,
+) -> List[Path]:
+    """One report per ticker under `out_dir/<TICKER>/`; all charts render in a single process pool."""
+    report = UniverseReport(out_dir, risk_free_rate_annual, bootstrap, periods_per_year)
+    for ticker, raw_df in raw_frames.items():
+        report.add(raw_df, ticker)
+    report.render(chart_workers)
+    return report.paths
@@ -0,0 +1,118 @@
+from __future__ import annotations
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from .analysis import TRADING_DAYS
+
+# Minute bars -> 5m -> 15m -> 1h -> 1d, each level built from the one before it.
+# Buckets are anchored at the session open and never cross a session boundary,
+# so 1h bars are 09:30-10:30, ..., 15:30-16:00 (the last one is a half hour).
+
+LEVEL_MINUTES = {"1m": 1, "2m": 2, "5m": 5, "15m": 15, "30m": 30, "1h": 60, "60m": 60, "90m": 90}
+DEFAULT_LEVELS = ("5m", "15m", "1h", "1d")
+REGULAR_SESSION = ("09:30", "16:00")
+OHLCV = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+
+def session_minutes(session: Tuple[str, str] = REGULAR_SESSION) -> int:
+    open_, close = (pd.Timedelta(f"{s}:00") for s in session)
+    return int((close - open_) / pd.Timedelta(minutes=1))
+
+def periods_per_year(interval: str, session: Tuple[str, str] = REGULAR_SESSION) -> int:
+    """Bars per year for a yfinance-style interval ("1m", "1h", "1d", "1wk", "1mo", ...)."""
+    if interval in ("1d", "5d"):
+        return TRADING_DAYS // (5 if interval == "5d" else 1)
+    if interval == "1wk":
+        return 52
+    if interval == "1mo":
+        return 12
+    if interval == "3mo":
+        return 4
+    if interval not in LEVEL_MINUTES:
+        raise ValueError(f"Unknown interval: {interval!r}")
+    bars_per_session = -(-session_minutes(session) // LEVEL_MINUTES[interval])
+    return TRADING_DAYS * bars_per_session
+
+def _aggregate(cols: Dict[str, np.ndarray], keys: np.ndarray, labels: np.ndarray) -> pd.DataFrame:
+    n = len(keys)
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1]))) if n else np.array([], dtype=np.int64)
+    ends = np.concatenate((starts[1:], [n])) - 1 if n else starts
+    out = {}
+    if n:
+        out["Open"] = cols["Open"][starts]
+        out["High"] = np.maximum.reduceat(cols["High"], starts)
+        out["Low"] = np.minimum.reduceat(cols["Low"], starts)
+        out["Close"] = cols["Close"][ends]
+        out["Adj Close"] = cols["Adj Close"][ends]
+        out["Volume"] = np.add.reduceat(cols["Volume"], starts)
+    else:
+        out = {c: np.array([], dtype=float) for c in OHLCV}
+    return pd.DataFrame(out, index=pd.DatetimeIndex(labels[starts] if n else [], name=None))[OHLCV]
+
+def _columns(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    cols = {c: df[c].to_numpy(dtype=float) for c in ("Open", "High", "Low", "Close")}
+    cols["Adj Close"] = df["Adj Close"].to_numpy(dtype=float) if "Adj Close" in df else cols["Close"]
+    cols["Volume"] = np.nan_to_num(df["Volume"].to_numpy(dtype=float)) if "Volume" in df else np.zeros(len(df))
+    return cols
+
+def _step(df: pd.DataFrame, level: str, open_offset: np.timedelta64, session_len: int) -> pd.DataFrame:
+    ts = df.index.values
+    day = ts.astype("datetime64[D]")
+    if level == "1d":
+        keys = day.astype(np.int64)
+        labels = day.astype(ts.dtype)
+    else:
+        width = LEVEL_MINUTES[level]
+        offset = ((ts - day - open_offset) // np.timedelta64(1, "m")).astype(np.int64)
+        bucket = offset // width
+        keys = day.astype(np.int64) * (session_len // width + 2) + bucket
+        labels = (day + open_offset + bucket * np.timedelta64(width, "m")).astype(ts.dtype)
+    return _aggregate(_columns(df), keys, labels)
+
+def resample_ohlcv(
+    df: pd.DataFrame,
+    levels: Sequence[str] = DEFAULT_LEVELS,
+    session: Optional[Tuple[str, str]] = REGULAR_SESSION,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Cascade one ticker's minute bars up through `levels` (finest first).
+    Bars outside `session` are dropped first (pass session=None to keep all
+    bars and anchor buckets at midnight). Bars are labelled by bucket start;
+    daily bars by the session date.
+    """
+    order = [lv for lv in levels if lv != "1d"]
+    widths = [LEVEL_MINUTES[lv] for lv in order]
+    if any(b % a for a, b in zip(widths, widths[1:])):
+        raise ValueError(f"Each level must be a multiple of the previous one: {list(levels)}")
+
+    df = df.sort_index()
+    ticker = df["Ticker"].iloc[0] if "Ticker" in df and len(df) else None
+    if session is None:
+        open_offset, session_len = np.timedelta64(0, "m"), 24 * 60
+    else:
+        open_offset = np.timedelta64(int(pd.Timedelta(f"{session[0]}:00") / pd.Timedelta(minutes=1)), "m")
+        session_len = session_minutes(session)
+        ts = df.index.values
+        offset = (ts - ts.astype("datetime64[D]") - open_offset) // np.timedelta64(1, "m")
+        df = df[(offset >= 0) & (offset < session_len)]
+
+    out: Dict[str, pd.DataFrame] = {}
+    cur = df
+    for level in levels:
+        cur = _step(cur, level, open_offset, session_len)
+        if ticker is not None:
+            cur["Ticker"] = ticker
+        out[level] = cur
+    return out
+
+def iter_resampled(
+    frames: Iterable[Tuple[str, pd.DataFrame]],
+    levels: Sequence[str] = DEFAULT_LEVELS,
+    session: Optional[Tuple[str, str]] = REGULAR_SESSION,
+) -> Iterator[Tuple[str, Dict[str, pd.DataFrame]]]:
+    """
+    Resample a universe one ticker at a time. Pass a generator of
+    (ticker, minute frame) pairs (e.g. reading one file per ticker) and only
+    that ticker's minute data is held in memory at once.
+    """
+    for ticker, df in frames:
+        yield ticker, resample_ohlcv(df, levels=levels, session=session)
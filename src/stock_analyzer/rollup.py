@@ -0,0 +1,249 @@
+from __future__ import annotations
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+import numpy as np
+import pandas as pd
+
+# Period rollup cube: per ticker and measure, additive cells (count, sum,
+# M2 = sum of squared deviations, min, max) at day -> month -> quarter -> year.
+# Cells are keyed by integer period codes (datetime64 day / month numbers,
+# month // 3, quarter // 4), so a parent's code is plain integer arithmetic,
+# and stored as (sorted codes, values[cell, measure, stat]) arrays.
+# An update builds day cells for the new rows, merges them into the stored
+# day cells, then recomputes only the month/quarter/year cells above the
+# touched days, each from its children (Chan's formula for M2, so the
+# variance stays exact for price levels where a raw sum of squares would
+# cancel). Means, std/var and totals are derived from the cells on query and
+# match pandas' groupby output. `append` also keeps a digest of the source rows
+# each ticker's cells cover and rebuilds the ticker when those rows changed
+# (e.g. the source file was regenerated), so a persisted cube never goes stale.
+
+LEVELS = ("day", "month", "quarter", "year")
+STATS = ("n", "sum", "m2", "min", "max")
+AGGS = ("count", "sum", "mean", "var", "std", "min", "max")
+N, SUM, M2, MIN, MAX = range(5)
+
+Cells = Tuple[np.ndarray, np.ndarray]     # (codes, values[cell, measure, stat])
+
+def _parent_codes(codes: np.ndarray, level: str) -> np.ndarray:
+    # codes of `level` -> codes of the next coarser level
+    if level == "day":
+        return codes.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    return codes // (3 if level == "month" else 4)
+
+def _labels(codes: np.ndarray, level: str) -> pd.PeriodIndex:
+    if level == "day":
+        return pd.PeriodIndex(codes.astype("datetime64[D]"), freq="D")
+    if level == "month":
+        return pd.PeriodIndex(codes.astype("datetime64[M]"), freq="M")
+    if level == "quarter":
+        return pd.PeriodIndex((codes * 3).astype("datetime64[M]"), freq="Q")
+    return pd.PeriodIndex(codes.astype("datetime64[Y]"), freq="Y")
+
+def _naive(stamps) -> pd.DatetimeIndex:
+    # exchange-local wall time, so day cells follow the trading date
+    stamps = pd.DatetimeIndex(stamps)
+    return stamps.tz_localize(None) if stamps.tz is not None else stamps
+
+def _groups(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # stable sort order, first position of each key run, group id per sorted row
+    order = np.argsort(keys, kind="stable")
+    k = keys[order]
+    first = np.r_[True, k[1:] != k[:-1]] if len(k) else np.zeros(0, dtype=bool)
+    return order, np.flatnonzero(first), np.cumsum(first) - 1
+
+def _combine(keys: np.ndarray, values: np.ndarray) -> Cells:
+    """Merge cells that share a key (Chan's parallel formula for M2)."""
+    order, starts, gid = _groups(keys)
+    x = values[order]
+    n = np.add.reduceat(x[:, :, N], starts, axis=0)
+    s = np.add.reduceat(x[:, :, SUM], starts, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = s / n
+        dev = np.where(x[:, :, N] > 0, x[:, :, N] * (x[:, :, SUM] / x[:, :, N] - mean[gid]) ** 2, 0.0)
+    out = np.empty((len(starts),) + values.shape[1:])
+    out[:, :, N], out[:, :, SUM] = n, s
+    out[:, :, M2] = np.add.reduceat(x[:, :, M2] + dev, starts, axis=0)
+    out[:, :, MIN] = np.fmin.reduceat(x[:, :, MIN], starts, axis=0)
+    out[:, :, MAX] = np.fmax.reduceat(x[:, :, MAX], starts, axis=0)
+    return keys[order][starts], out
+
+def _day_cells(df: pd.DataFrame, measures: Sequence[str]) -> Cells:
+    codes = _naive(df.index).values.astype("datetime64[D]").astype(np.int64)
+    order, starts, gid = _groups(codes)
+    x = df.reindex(columns=list(measures)).to_numpy(dtype=float, na_value=np.nan)[order]
+    ok = ~np.isnan(x)
+    x0 = np.where(ok, x, 0.0)
+    n = np.add.reduceat(ok, starts, axis=0).astype(float)
+    s = np.add.reduceat(x0, starts, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = s / n
+    out = np.empty((len(starts), len(measures), len(STATS)))
+    out[:, :, N], out[:, :, SUM] = n, s
+    out[:, :, M2] = np.add.reduceat(np.where(ok, (x - mean[gid]) ** 2, 0.0), starts, axis=0)
+    out[:, :, MIN] = np.fmin.reduceat(x, starts, axis=0)
+    out[:, :, MAX] = np.fmax.reduceat(x, starts, axis=0)
+    return codes[order][starts], out
+
+def _digest(df: pd.DataFrame, measures: Sequence[str]) -> str:
+    hashed = pd.util.hash_pandas_object(df.reindex(columns=list(measures)), index=True)
+    return hashlib.sha1(hashed.to_numpy().tobytes()).hexdigest()
+
+def _replace(old: Optional[Cells], new: Cells) -> Cells:
+    # stored cells with the keys of `new` replaced by `new`, kept sorted
+    if old is None:
+        return new
+    keep = ~np.isin(old[0], new[0])
+    codes = np.concatenate([old[0][keep], new[0]])
+    values = np.concatenate([old[1][keep], new[1]])
+    if len(codes) > 1 and not np.all(codes[1:] > codes[:-1]):
+        order = np.argsort(codes, kind="stable")
+        codes, values = codes[order], values[order]
+    return codes, values
+
+class RollupCube:
+    """Additive per-ticker period aggregates of `measures`, kept incrementally."""
+
+    def __init__(self, measures: Sequence[str]):
+        self.measures = list(measures)
+        self.cells: Dict[str, Dict[str, Cells]] = {lvl: {} for lvl in LEVELS}
+        self.last: Dict[str, pd.Timestamp] = {}      # latest (naive, local) timestamp added per ticker
+        self.digest: Dict[str, str] = {}             # per ticker, digest of the source rows `append` covered
+
+    @property
+    def tickers(self) -> List[str]:
+        return sorted(self.cells["day"])
+
+    def update(self, df: pd.DataFrame, ticker: str) -> int:
+        """Add `df`'s rows (DatetimeIndex, one column per measure) for `ticker`; returns the day cells touched."""
+        if not len(df):
+            return 0
+        self.digest.pop(ticker, None)
+        new = _day_cells(df, self.measures)
+        old = self.cells["day"].get(ticker)
+        if old is not None:
+            stale = np.isin(old[0], new[0])
+            if stale.any():
+                new = _combine(np.r_[old[0][stale], new[0]], np.concatenate([old[1][stale], new[1]]))
+        self.cells["day"][ticker] = _replace(old, new)
+        touched = new[0]
+        for prev, level in zip(LEVELS, LEVELS[1:]):
+            touched = np.unique(_parent_codes(touched, prev))
+            codes, values = self.cells[prev][ticker]
+            parents = _parent_codes(codes, prev)
+            pick = np.isin(parents, touched)
+            self.cells[level][ticker] = _replace(self.cells[level].get(ticker),
+                                                 _combine(parents[pick], values[pick]))
+        end = _naive(df.index).max()
+        self.last[ticker] = max(end, self.last.get(ticker, end))
+        return len(new[0])
+
+    def drop(self, ticker: str) -> None:
+        for level in LEVELS:
+            self.cells[level].pop(ticker, None)
+        self.last.pop(ticker, None)
+        self.digest.pop(ticker, None)
+
+    def append(self, df: pd.DataFrame, ticker: str) -> int:
+        """
+        `update` with only the rows after `ticker`'s last stored timestamp
+        (re-runs on a growing file). If the rows already covered differ from
+        the ones seen by the previous `append`, the ticker is rebuilt from `df`.
+        """
+        source, last, known = df, self.last.get(ticker), self.digest.get(ticker)
+        if last is not None:
+            old = _naive(df.index) <= last
+            if known is not None and known != _digest(df[old], self.measures):
+                self.drop(ticker)
+            else:
+                df = df[~old]
+        added = self.update(df, ticker)
+        if ticker in self.last:
+            covered = source[_naive(source.index) <= self.last[ticker]]
+            self.digest[ticker] = _digest(covered, self.measures)
+        return added
+
+    def table(self, level: str = "month", ticker: Optional[str] = None) -> pd.DataFrame:
+        """Stored cells of one ticker (or all, indexed by ticker and period) with (measure, stat) columns."""
+        if level not in LEVELS:
+            raise ValueError(f"Unknown rollup level: {level!r} (choose from {', '.join(LEVELS)})")
+        if ticker is not None and ticker not in self.cells[level]:
+            raise KeyError(f"Unknown ticker: {ticker!r}")
+        tickers = [ticker] if ticker is not None else self.tickers
+        columns = pd.MultiIndex.from_product([self.measures, STATS])
+        frames = []
+        for t in tickers:
+            codes, values = self.cells[level][t]
+            frames.append(pd.DataFrame(values.reshape(len(codes), -1), columns=columns,
+                                       index=_labels(codes, level).rename(level)))
+        if ticker is not None:
+            return frames[0]
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, keys=tickers, names=["ticker", level])
+
+    def agg(self, level: str, spec: Union[str, Mapping[str, str]] = "mean",
+            ticker: Optional[str] = None) -> pd.DataFrame:
+        """
+        groupby(period).agg(spec) from the cube: `spec` maps measure -> one of
+        AGGS (or one name for every measure). Without `ticker` the result is
+        indexed by (ticker, period).
+        """
+        if isinstance(spec, str):
+            spec = {m: spec for m in self.measures}
+        cells = self.table(level, ticker)
+        out = {}
+        for m, how in spec.items():
+            if how not in AGGS:
+                raise ValueError(f"Unsupported rollup aggregate: {how!r} (choose from {', '.join(AGGS)})")
+            n, s, m2 = cells[(m, "n")], cells[(m, "sum")], cells[(m, "m2")]
+            if how == "count":
+                out[m] = n.astype(np.int64)
+            elif how == "sum":
+                out[m] = s
+            elif how == "mean":
+                out[m] = s / n.where(n > 0)
+            elif how in ("var", "std"):
+                var = m2 / (n - 1).where(n > 1)
+                out[m] = np.sqrt(var) if how == "std" else var
+            else:
+                out[m] = cells[(m, how)]
+        return pd.DataFrame(out, index=cells.index)
+
+    def save(self, path: Union[str, Path]) -> Path:
+        """All cells in one .npz (written to a temp file, then renamed)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {"measures": np.asarray(self.measures, dtype=str),
+                  "tickers": np.asarray(self.tickers, dtype=str),
+                  "last": np.asarray([self.last[t].to_datetime64() for t in self.tickers], dtype="datetime64[ns]"),
+                  "digest": np.asarray([self.digest.get(t, "") for t in self.tickers], dtype=str)}
+        for level in LEVELS:
+            for i, t in enumerate(self.tickers):
+                arrays[f"{level}/{i}/code"], arrays[f"{level}/{i}/values"] = self.cells[level][t]
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "RollupCube":
+        with np.load(path, allow_pickle=False) as z:
+            cube = cls(z["measures"].tolist())
+            digests = z["digest"].tolist() if "digest" in z else []
+            for i, t in enumerate(z["tickers"].tolist()):
+                cube.last[t] = pd.Timestamp(z["last"][i])
+                if i < len(digests) and digests[i]:
+                    cube.digest[t] = digests[i]
+                for level in LEVELS:
+                    cube.cells[level][t] = (z[f"{level}/{i}/code"], z[f"{level}/{i}/values"])
+        return cube
+
+def build_cube(frames: Mapping[str, pd.DataFrame], measures: Iterable[str]) -> RollupCube:
+    cube = RollupCube(list(measures))
+    for t, df in frames.items():
+        cube.update(df, t)
+    return cube
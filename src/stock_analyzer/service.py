@@ -0,0 +1,258 @@
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+import pandas as pd
+from .analysis import TRADING_DAYS, _get_close, compute_indicators, performance_summary
+from .export import load_table, load_perf_rows, load_run_meta
+from .rollup import RollupCube
+
+# Local read-only query service over the artifacts written by `stock-parse`.
+#   GET /tickers
+#   GET /prices?ticker=AAPL&start=2024-01-01&end=2024-12-31&columns=Close,Volume
+#   GET /indicators?ticker=AAPL&start=...&end=...&columns=RSI14,MACD
+#   GET /performance?ticker=AAPL[&start=...&end=...]
+#   GET /rollup?level=month[&ticker=AAPL][&agg=mean | &columns=Close:mean,Volume:sum]
+#   GET /stats
+
+ROLLUP_MEASURES = ["Close", "Volume", "RET_DAILY"]
+# routes that may compute (indicators, range metrics, the cube build): run off
+# the event loop on one worker thread, which also keeps the caches single-threaded
+HEAVY_PATHS = {"/indicators", "/performance", "/rollup"}
+
+class LRUCache:
+    """LRU cache bounded by the total byte size of its values, not their count."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[0]
+
+    def put(self, key: Hashable, value: Any, size: int) -> None:
+        if key in self._data:
+            self.bytes -= self._data.pop(key)[1]
+        if size > self.max_bytes:
+            return
+        self._data[key] = (value, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, (_, old) = self._data.popitem(last=False)
+            self.bytes -= old
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._data), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+def _frame_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True, deep=False).sum())
+
+class ArtifactStore:
+    """
+    In-memory index over `prices` (one date-sorted frame per ticker) plus
+    `performance.json`. Indicators are computed per ticker on first request
+    and kept in the LRU cache; evicted tickers are simply recomputed. Ranged
+    performance uses the risk-free rate and bars per year of the run that
+    wrote the artifacts (`run.json`), so it matches the stored rows.
+    """
+
+    def __init__(self, out_dir: str | Path, cache_bytes: int = 256 * 2 ** 20):
+        self.out_dir = Path(out_dir)
+        prices = load_table(self.out_dir, "prices")
+        prices.index = pd.DatetimeIndex(prices.index, name="date")
+        self.prices: Dict[str, pd.DataFrame] = {
+            t: g.drop(columns="Ticker").sort_index()
+            for t, g in prices.groupby("Ticker", sort=True)
+        }
+        self._dates: Dict[str, np.ndarray] = {t: df.index.values for t, df in self.prices.items()}
+        self.performance: Dict[str, Dict[str, Any]] = {r["ticker"]: r for r in load_perf_rows(self.out_dir)}
+        meta = load_run_meta(self.out_dir)
+        self.risk_free_rate_annual = float(meta.get("risk_free_rate_annual", 0.0))
+        self.periods_per_year = int(meta.get("periods_per_year", TRADING_DAYS))
+        self.cache = LRUCache(cache_bytes)
+        self._cube: Optional[RollupCube] = None
+
+    def tickers(self) -> List[Dict[str, Any]]:
+        return [{"ticker": t, "start": str(df.index[0].date()), "end": str(df.index[-1].date()),
+                 "rows": len(df)} for t, df in self.prices.items()]
+
+    def _bounds(self, ticker: str, start: Optional[str], end: Optional[str]) -> Tuple[int, int]:
+        dates = self._dates[ticker]
+        lo = np.searchsorted(dates, np.datetime64(start), side="left") if start else 0
+        hi = np.searchsorted(dates, np.datetime64(end) + np.timedelta64(1, "D"), side="left") if end else len(dates)
+        return int(lo), int(hi)
+
+    def _ticker(self, ticker: Optional[str]) -> str:
+        t = (ticker or "").upper()
+        if t not in self.prices:
+            raise KeyError(f"Unknown ticker: {ticker!r}")
+        return t
+
+    def prices_slice(self, ticker: str, start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        t = self._ticker(ticker)
+        lo, hi = self._bounds(t, start, end)
+        return self.prices[t].iloc[lo:hi]
+
+    def indicators_slice(self, ticker: str, start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        t = self._ticker(ticker)
+        ind = self.cache.get(("indicators", t))
+        if ind is None:
+            # full history so warm-up windows (SMA50, EMA26, ...) match the exported values
+            ind = compute_indicators(self.prices[t]).drop(columns=self.prices[t].columns)
+            self.cache.put(("indicators", t), ind, _frame_bytes(ind))
+        lo, hi = self._bounds(t, start, end)
+        return ind.iloc[lo:hi]
+
+    def performance_for(self, ticker: str, start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, Any]:
+        t = self._ticker(ticker)
+        if not start and not end and t in self.performance:
+            return self.performance[t]
+        key = ("performance", t, start, end)
+        row = self.cache.get(key)
+        if row is None:
+            sl = self.prices_slice(t, start, end)
+            if len(sl) < 2:
+                raise ValueError("Need at least two bars in range")
+            row = {"ticker": t, **performance_summary(sl, risk_free_rate_annual=self.risk_free_rate_annual,
+                                                      periods_per_year=self.periods_per_year).to_dict()}
+            self.cache.put(key, row, 1024)
+        return row
+
+    def rollup(self, level: str = "month", ticker: Optional[str] = None, agg: str = "mean",
+               columns: Optional[str] = None) -> pd.DataFrame:
+        """Day/month/quarter/year statistics of Close (Adj Close when present), Volume and daily return from the rollup cube."""
+        if self._cube is None:
+            # built once on first request; period queries then only read its cells
+            self._cube = RollupCube(ROLLUP_MEASURES)
+            for t, df in self.prices.items():
+                close = _get_close(df)
+                self._cube.update(pd.DataFrame({"Close": close, "Volume": df.get("Volume"),
+                                                "RET_DAILY": close.pct_change()}), t)
+        spec: Any = agg
+        if columns:
+            spec = dict(c.partition(":")[::2] for c in columns.split(","))
+            spec = {m: how or agg for m, how in spec.items()}
+            unknown = [m for m in spec if m not in ROLLUP_MEASURES]
+            if unknown:
+                raise ValueError(f"Unknown rollup column(s): {', '.join(unknown)}")
+        return self._cube.agg(level, spec, ticker=self._ticker(ticker) if ticker else None)
+
+def _frame_payload(df: pd.DataFrame, ticker: str, columns: Optional[str]) -> bytes:
+    if columns:
+        df = df[[c for c in columns.split(",") if c in df.columns]]
+    body = df.to_json(orient="split", date_format="iso", double_precision=10)
+    return ('{"ticker":%s,' % json.dumps(ticker) + body[1:]).encode()
+
+def _rollup_payload(df: pd.DataFrame, level: str) -> bytes:
+    rows = df.reset_index()
+    rows[level] = rows[level].astype(str)
+    return ('{"level":%s,"rows":' % json.dumps(level) + rows.to_json(orient="records", double_precision=10) + "}").encode()
+
+def handle(store: ArtifactStore, path: str, query: Dict[str, str]) -> Tuple[int, bytes]:
+    """Route one GET request; returns (status, JSON body)."""
+    try:
+        t, start, end = query.get("ticker"), query.get("start"), query.get("end")
+        if path == "/tickers":
+            return 200, json.dumps(store.tickers()).encode()
+        if path == "/prices":
+            return 200, _frame_payload(store.prices_slice(t, start, end), t.upper(), query.get("columns"))
+        if path == "/indicators":
+            return 200, _frame_payload(store.indicators_slice(t, start, end), t.upper(), query.get("columns"))
+        if path == "/performance":
+            return 200, json.dumps(store.performance_for(t, start, end)).encode()
+        if path == "/rollup":
+            level = query.get("level", "month")
+            df = store.rollup(level, t, agg=query.get("agg", "mean"), columns=query.get("columns"))
+            return 200, _rollup_payload(df, level)
+        if path == "/stats":
+            return 200, json.dumps(store.cache.stats()).encode()
+        return 404, json.dumps({"error": f"Unknown path {path}"}).encode()
+    except KeyError as e:
+        return 404, json.dumps({"error": str(e.args[0])}).encode()
+    except ValueError as e:
+        return 400, json.dumps({"error": str(e)}).encode()
+    except Exception as e:
+        return 500, json.dumps({"error": f"{type(e).__name__}: {e}"}).encode()
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            500: "Internal Server Error"}
+
+async def _serve_client(store: ArtifactStore, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                        pool: Optional[ThreadPoolExecutor] = None) -> None:
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, ConnectionError):
+                break
+            lines = head.decode("latin-1").split("\r\n")
+            method, target, version = (lines[0].split(" ") + ["", "", ""])[:3]
+            headers = {k.strip().lower(): v.strip() for k, _, v in (l.partition(":") for l in lines[1:] if l)}
+            if method != "GET":
+                status, body = 405, b'{"error":"GET only"}'
+            else:
+                url = urlsplit(target)
+                query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                if url.path in HEAVY_PATHS:
+                    loop = asyncio.get_running_loop()
+                    status, body = await loop.run_in_executor(pool, handle, store, url.path, query)
+                else:
+                    status, body = handle(store, url.path, query)
+            keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+            writer.write(
+                f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+            if not keep_alive:
+                break
+    finally:
+        writer.close()
+
+async def serve(store: ArtifactStore, host: str = "127.0.0.1", port: int = 8765) -> None:
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="stock-serve") as pool:
+        server = await asyncio.start_server(lambda r, w: _serve_client(store, r, w, pool), host, port)
+        print(f"📡 Serving {store.out_dir} ({len(store.prices)} tickers) on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="stock-serve",
+        description="Serve price/indicator/performance slices from stock-parse artifacts over local HTTP."
+    )
+    p.add_argument("-o", "--out", default="out", help="Artifacts directory written by stock-parse (default: out)")
+    p.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    p.add_argument("--port", type=int, default=8765, help="Port (default: 8765)")
+    p.add_argument("--cache-mb", type=float, default=256, help="Indicator/metric cache size in MB (default: 256)")
+    return p
+
+def main():
+    args = build_parser().parse_args()
+    store = ArtifactStore(args.out, cache_bytes=int(args.cache_mb * 2 ** 20))
+    try:
+        asyncio.run(serve(store, args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n🛑 Stopped")
+
+if __name__ == "__main__":
+    main()
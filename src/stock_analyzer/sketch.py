@@ -0,0 +1,201 @@
+from __future__ import annotations
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence, Tuple, Union
+import numpy as np
+import pandas as pd
+
+# Mergeable summaries of a return distribution: running moments (count, mean,
+# M2, min, max; merged with Chan's formula) plus a merging t-digest. Values
+# are buffered and folded into the centroids in one vectorized pass: sort,
+# map each point's cumulative weight q onto the k1 scale
+#   k(q) = compression / (2 pi) * asin(2q - 1)
+# and merge the points that share an integer k bin. Bins are narrow in q near
+# the tails (about (pi / compression)^2 of the mass at the extremes), so tail
+# quantiles / VaR / CVaR are the most accurate; the widest bin, at the median,
+# holds about pi / compression of the mass. Memory is O(compression)
+# whatever the number of values, and sketches of chunks, tickers or periods
+# merge by concatenating centroids.
+
+BUFFER_FACTOR = 20          # compress once the buffer holds this many x compression values
+LEVELS = (0.95, 0.99)
+
+class QuantileSketch:
+    """Streaming quantile / moment summary of a series of values (NaNs skipped)."""
+
+    def __init__(self, compression: float = 500.0):
+        self.compression = float(compression)
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self._buf: list = []          # (values, weights or None) waiting to be compressed
+        self._buffered = 0
+
+    def _add_moments(self, n: int, mean: float, m2: float, lo: float, hi: float) -> None:
+        total = self.count + n
+        d = mean - self.mean
+        self.mean += d * n / total
+        self.m2 += m2 + d * d * self.count * n / total
+        self.count = total
+        self.min = min(self.min, lo)
+        self.max = max(self.max, hi)
+
+    def update(self, values: Union[np.ndarray, pd.Series, Sequence[float]]) -> "QuantileSketch":
+        """Add a chunk of values."""
+        x = np.asarray(values, dtype=float).ravel()
+        x = x[np.isfinite(x)]
+        if not len(x):
+            return self
+        m = float(x.mean())
+        self._add_moments(len(x), m, float(((x - m) ** 2).sum()), float(x.min()), float(x.max()))
+        self._push(x, None)
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Fold `other` (another chunk, ticker or period) into this sketch."""
+        if not other.count:
+            return self
+        other._compress()
+        self._add_moments(other.count, other.mean, other.m2, other.min, other.max)
+        self._push(other.means, other.weights)
+        return self
+
+    def _push(self, values: np.ndarray, weights: Optional[np.ndarray]) -> None:
+        self._buf.append((values, weights))
+        self._buffered += len(values)
+        if self._buffered >= BUFFER_FACTOR * self.compression:
+            self._compress()
+
+    def _compress(self) -> None:
+        if not self._buf:
+            return
+        x = np.concatenate([self.means] + [v for v, _ in self._buf])
+        w = np.concatenate([self.weights] + [np.ones(len(v)) if wt is None else wt for v, wt in self._buf])
+        self._buf, self._buffered = [], 0
+        order = np.argsort(x, kind="stable")
+        x, w = x[order], w[order]
+        cum = np.cumsum(w)
+        q = (cum - w) / cum[-1]                               # mass to the left of each point
+        k = np.floor(self.compression / (2 * np.pi) * np.arcsin(np.clip(2 * q - 1, -1.0, 1.0)))
+        starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+        self.weights = np.add.reduceat(w, starts)
+        self.means = np.add.reduceat(w * x, starts) / self.weights
+
+    def _knots(self) -> Tuple[np.ndarray, np.ndarray]:
+        # Piecewise-linear quantile function: (cumulative mass, value) at each
+        # centroid's midpoint, pinned to (0, min) and (1, max).
+        self._compress()
+        p = (np.cumsum(self.weights) - self.weights / 2) / self.count
+        return np.r_[0.0, p, 1.0], np.r_[self.min, self.means, self.max]
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else float("nan")
+
+    def quantile(self, q: Union[float, Sequence[float]]) -> Union[float, np.ndarray]:
+        if not self.count:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else float("nan")
+        p, v = self._knots()
+        out = np.interp(q, p, v)
+        return out if np.ndim(q) else float(out)
+
+    def cdf(self, x: Union[float, Sequence[float]]) -> Union[float, np.ndarray]:
+        if not self.count:
+            return np.full(np.shape(x), np.nan) if np.ndim(x) else float("nan")
+        p, v = self._knots()
+        out = np.interp(x, v, p, left=0.0, right=1.0)
+        return out if np.ndim(x) else float(out)
+
+    def var(self, level: float = 0.95) -> float:
+        """Value at risk: the loss (positive) not exceeded with probability `level`."""
+        return -self.quantile(1.0 - level)
+
+    def cvar(self, level: float = 0.95) -> float:
+        """Expected shortfall: mean loss (positive) over the worst 1 - `level` of outcomes."""
+        if not self.count:
+            return float("nan")
+        a = 1.0 - level
+        p, v = self._knots()
+        # Centroids wholly inside the tail contribute their exact sums (weight
+        # x mean); only the one straddling the cut-off uses the interpolated
+        # quantile function, which overstates a heavy tail if used throughout.
+        target = a * self.count
+        cum = np.cumsum(self.weights)
+        inside = cum <= target
+        tail_sum = float(np.sum(self.weights[inside] * self.means[inside]))
+        lo = float(cum[inside][-1]) / self.count if inside.any() else 0.0
+        if lo < a:
+            knots = (p > lo) & (p < a)
+            pp = np.r_[lo, p[knots], a]
+            vv = np.r_[np.interp(lo, p, v), v[knots], np.interp(a, p, v)]
+            # trapezoid rule by hand (np.trapezoid is numpy >= 2 only, np.trapz was removed in 2.4)
+            tail_sum += float(np.sum(np.diff(pp) * (vv[1:] + vv[:-1]) / 2)) * self.count
+        return -tail_sum / target
+
+    def histogram(self, bins: int = 50,
+                  range: Optional[Tuple[float, float]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(counts, edges) like np.histogram, with counts estimated from the sketch's CDF."""
+        lo, hi = range if range is not None else (self.min, self.max)
+        if not self.count or not lo < hi:
+            lo, hi = (lo - 0.5, hi + 0.5) if self.count else (0.0, 1.0)
+        edges = np.linspace(lo, hi, bins + 1)
+        cdf = self.cdf(edges)
+        if range is None:
+            cdf[0], cdf[-1] = 0.0, 1.0
+        return np.diff(cdf) * self.count, edges
+
+    def summary(self, levels: Iterable[float] = LEVELS) -> Dict[str, float]:
+        qs = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+        out: Dict[str, float] = {"count": self.count, "mean": self.mean if self.count else float("nan"),
+                                 "std": self.std, "min": self.min, "max": self.max}
+        out.update({f"p{round(q * 100):02d}": float(v) for q, v in zip(qs, np.atleast_1d(self.quantile(qs)))})
+        for level in levels:
+            out[f"var_{round(level * 100)}"] = self.var(level)
+            out[f"cvar_{round(level * 100)}"] = self.cvar(level)
+        return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        self._compress()
+        return {"compression": self.compression, "count": self.count, "mean": self.mean, "m2": self.m2,
+                "min": self.min, "max": self.max, "means": self.means.tolist(), "weights": self.weights.tolist()}
+
+    @classmethod
+    def from_dict(cls, d: Mapping[str, Any]) -> "QuantileSketch":
+        sk = cls(d["compression"])
+        sk.count, sk.mean, sk.m2 = int(d["count"]), float(d["mean"]), float(d["m2"])
+        sk.min, sk.max = float(d["min"]), float(d["max"])
+        sk.means = np.asarray(d["means"], dtype=float)
+        sk.weights = np.asarray(d["weights"], dtype=float)
+        return sk
+
+def merge_sketches(sketches: Iterable[QuantileSketch], compression: Optional[float] = None) -> QuantileSketch:
+    sketches = list(sketches)
+    out = QuantileSketch(compression or (sketches[0].compression if sketches else 500.0))
+    for sk in sketches:
+        out.merge(sk)
+    return out
+
+def write_distribution(sketches: Mapping[str, QuantileSketch], out_dir: Union[str, Path],
+                       bins: int = 50) -> Path:
+    """
+    `distribution.json`: {"tickers": {ticker: entry}, "universe": entry or
+    null}, each entry a summary, histogram and sketch state; "universe" is
+    the merge of all tickers (kept apart so no ticker symbol can collide
+    with it). The stored states can be merged with those of other runs
+    (e.g. other periods) via QuantileSketch.from_dict.
+    """
+    def entry(sk: QuantileSketch) -> Dict[str, Any]:
+        counts, edges = sk.histogram(bins)
+        return {**sk.summary(), "histogram": {"counts": counts.tolist(), "edges": edges.tolist()},
+                "sketch": sk.to_dict()}
+
+    doc = {"tickers": {t: entry(sk) for t, sk in sketches.items()},
+           "universe": entry(merge_sketches(sketches.values())) if sketches else None}
+    path = Path(out_dir) / "distribution.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(doc, indent=2), encoding="utf-8")
+    return path
@@ -0,0 +1,126 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Sequence, Union
+import numpy as np
+import pandas as pd
+
+# Deterministic synthetic data for benchmarks and tests. Same seed -> same frames.
+
+SESSION_MINUTES = 390   # 09:30-16:00 regular US session
+
+def _ticker_names(tickers: Union[int, Sequence[str]]) -> List[str]:
+    if isinstance(tickers, int):
+        return [f"T{i:04d}" for i in range(tickers)]
+    return [t.upper() for t in tickers]
+
+def bar_index(years: float, freq: str = "1d", start: str = "2010-01-04") -> pd.DatetimeIndex:
+    """Business-day index, or 1-minute bars inside each business day's regular session."""
+    days = pd.bdate_range(start, periods=max(int(round(years * 252)), 2))
+    if freq == "1d":
+        return days
+    if freq != "1m":
+        raise ValueError(f"Unsupported freq: {freq!r} (use '1d' or '1m')")
+    minutes = pd.to_timedelta(np.arange(SESSION_MINUTES), unit="min") + pd.Timedelta(hours=9, minutes=30)
+    stamps = days.values[:, None] + minutes.values[None, :]
+    return pd.DatetimeIndex(stamps.ravel())
+
+def gbm_ohlcv(
+    index: pd.DatetimeIndex,
+    rng: np.random.Generator,
+    s0: float = 100.0,
+    mu: float = 0.08,
+    sigma: float = 0.25,
+    jump_rate: float = 3.0,
+    jump_mean: float = -0.02,
+    jump_std: float = 0.06,
+    bars_per_year: int = 252,
+    ticker: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    One ticker of OHLCV from geometric Brownian motion with Merton jumps.
+    `jump_rate` is jumps per year; jump sizes are normal in log space.
+    Columns match `data.fetch_prices` (Open/High/Low/Close/Adj Close/Volume[/Ticker]).
+    """
+    n = len(index)
+    dt = 1.0 / bars_per_year
+    diffusion = (mu - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * rng.standard_normal(n)
+    n_jumps = rng.poisson(jump_rate * dt, n)
+    jumps = n_jumps * jump_mean + np.sqrt(n_jumps) * jump_std * rng.standard_normal(n)
+    close = s0 * np.exp(np.cumsum(diffusion + jumps))
+
+    bar_vol = sigma * np.sqrt(dt)
+    open_ = np.concatenate(([s0], close[:-1])) * np.exp(0.1 * bar_vol * rng.standard_normal(n))
+    high = np.maximum(open_, close) * np.exp(0.5 * bar_vol * np.abs(rng.standard_normal(n)))
+    low = np.minimum(open_, close) * np.exp(-0.5 * bar_vol * np.abs(rng.standard_normal(n)))
+    volume = np.round(rng.lognormal(mean=14.0, sigma=0.5, size=n))
+
+    df = pd.DataFrame(
+        {"Open": open_, "High": high, "Low": low, "Close": close, "Adj Close": close, "Volume": volume},
+        index=index,
+    )
+    if ticker is not None:
+        df["Ticker"] = ticker
+    return df
+
+def synthetic_universe(
+    tickers: Union[int, Sequence[str]] = 10,
+    years: float = 5,
+    freq: str = "1d",
+    seed: int = 0,
+    start: str = "2010-01-04",
+) -> Dict[str, pd.DataFrame]:
+    """{ticker: OHLCV frame} for N tickers x M years at daily or 1-minute resolution."""
+    names = _ticker_names(tickers)
+    index = bar_index(years, freq=freq, start=start)
+    bars_per_year = 252 if freq == "1d" else 252 * SESSION_MINUTES
+    children = np.random.SeedSequence(seed).spawn(len(names))
+    out = {}
+    for name, child in zip(names, children):
+        rng = np.random.default_rng(child)
+        out[name] = gbm_ohlcv(
+            index, rng,
+            s0=float(rng.uniform(10, 500)),
+            mu=float(rng.normal(0.07, 0.05)),
+            sigma=float(rng.uniform(0.15, 0.6)),
+            bars_per_year=bars_per_year,
+            ticker=name,
+        )
+    return out
+
+_KEYWORDS = "Amazon AWS Cloud Fed Economy Inflation Recession Nasdaq Tech Bezos".split()
+_WORDS = _KEYWORDS + (
+    "earnings market stocks rally selloff outlook guidance rates growth jobs retail oil bank "
+    "China trade shares investors quarter profit revenue analysts deal merger energy housing "
+    "consumer spending dollar bonds yields futures report week says could after amid new "
+    "sales prices higher lower record CEO plan company deal talks government policy"
+).split()
+
+def synthetic_news(
+    n_articles: int = 10_000,
+    start: str = "2010-01-01",
+    end: str = "2020-12-31",
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Articles shaped like `src/out/processed_news_sorted.csv` (date, title,
+    sentiment, description) plus the raw `published_at` timestamp.
+    """
+    rng = np.random.default_rng(seed)
+    t0 = pd.Timestamp(start, tz="UTC").value
+    t1 = pd.Timestamp(end, tz="UTC").value
+    published = pd.to_datetime(np.sort(rng.integers(t0, t1, n_articles)), utc=True)
+    words = np.array(_WORDS)
+    # keywords are rare so only a minority of articles pass news.filter_articles
+    weights = np.where(np.isin(words, _KEYWORDS), 0.05, 1.0)
+    weights /= weights.sum()
+    title_words = rng.choice(words, size=(n_articles, 6), p=weights)
+    desc_words = rng.choice(words, size=(n_articles, 12), p=weights)
+    titles = [" ".join(w) for w in title_words]
+    descriptions = [" ".join(w) for w in desc_words]
+    sentiment = np.clip(rng.normal(0.05, 0.2, n_articles), -1.0, 1.0)
+    return pd.DataFrame({
+        "published_at": published,
+        "date": published.date,
+        "title": titles,
+        "sentiment": sentiment,
+        "description": descriptions,
+    })
@@ -0,0 +1,155 @@
+from __future__ import annotations
+from functools import lru_cache
+from typing import Any, Iterable, Optional
+import numpy as np
+
+# Exchange trading calendar (NYSE rules), built offline from holiday rules
+# into sorted datetime64[D] session arrays. Next/previous-session lookups are
+# a binary search over the session array; session counts between dates use
+# np.busday_count with the same holidays, vectorized over arrays of dates.
+
+DEFAULT_RANGE = ("1970-01-01", "2060-12-31")
+
+# unscheduled full-day closures (weather, national mourning, 9/11)
+SPECIAL_CLOSURES = [
+    "1972-12-28", "1973-01-25", "1977-07-14", "1985-09-27", "1994-04-27",
+    "2001-09-11", "2001-09-12", "2001-09-13", "2001-09-14",
+    "2004-06-11", "2007-01-02", "2012-10-29", "2012-10-30", "2018-12-05", "2025-01-09",
+]
+
+def _weekday(days: np.ndarray) -> np.ndarray:
+    # Monday = 0 (1970-01-01 was a Thursday)
+    return (days.astype(np.int64) + 3) % 7
+
+def _date(years: np.ndarray, month: int, day: int) -> np.ndarray:
+    months = (years - 1970) * 12 + (month - 1)
+    return months.astype("datetime64[M]").astype("datetime64[D]") + (day - 1)
+
+def _nth_weekday(years: np.ndarray, month: int, weekday: int, n: int) -> np.ndarray:
+    # n-th `weekday` (Monday = 0) of the month; n = -1 for the last one
+    mask = [i == weekday for i in range(7)]
+    first = _date(years, month, 1)
+    if n > 0:
+        return np.busday_offset(first, n - 1, roll="forward", weekmask=mask)
+    last = (first.astype("datetime64[M]") + 1).astype("datetime64[D]") - 1
+    return np.busday_offset(last, 0, roll="backward", weekmask=mask)
+
+def _observed(days: np.ndarray, saturday_to_friday: bool = True) -> np.ndarray:
+    # Saturday holidays move to Friday (or are dropped), Sunday holidays to Monday
+    wd = _weekday(days)
+    out = np.where(wd == 6, days + 1, np.where(wd == 5, days - 1, days))
+    return out if saturday_to_friday else out[wd != 5]
+
+def _easter(years: np.ndarray) -> np.ndarray:
+    # anonymous Gregorian algorithm
+    y = years
+    a, b, c = y % 19, y // 100, y % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    return ((y - 1970) * 12 + month - 1).astype("datetime64[M]").astype("datetime64[D]") + (day - 1)
+
+def nyse_holidays(first_year: int, last_year: int) -> np.ndarray:
+    """NYSE full-day holidays (rules in force each year) plus SPECIAL_CLOSURES, sorted datetime64[D]."""
+    years = np.arange(first_year, last_year + 1)
+    presidential = years[(years % 4 == 0) & (years <= 1980)]
+    parts = [
+        _observed(_date(years, 1, 1), saturday_to_friday=False),     # New Year's Day (not moved to Dec 31)
+        _nth_weekday(years[years >= 1998], 1, 0, 3),                 # Martin Luther King Jr. Day
+        _nth_weekday(years, 2, 0, 3),                                # Washington's Birthday
+        _easter(years) - 2,                                          # Good Friday
+        _nth_weekday(years, 5, 0, -1),                               # Memorial Day
+        _observed(_date(years[years >= 2022], 6, 19)),               # Juneteenth
+        _observed(_date(years, 7, 4)),                               # Independence Day
+        _nth_weekday(years, 9, 0, 1),                                # Labor Day
+        _nth_weekday(presidential, 11, 0, 1) + 1,                    # Election Day (presidential years through 1980)
+        _nth_weekday(years, 11, 3, 4),                               # Thanksgiving
+        _observed(_date(years, 12, 25)),                             # Christmas
+        np.array(SPECIAL_CLOSURES, dtype="datetime64[D]"),
+    ]
+    days = np.unique(np.concatenate(parts))
+    days = days[_weekday(days) < 5]
+    lo, hi = np.datetime64(f"{first_year}-01-01"), np.datetime64(f"{last_year}-12-31")
+    return days[(days >= lo) & (days <= hi)]
+
+def to_days(dates: Any) -> np.ndarray:
+    """Dates (strings, datetime/date, pd.Timestamp/DatetimeIndex/Series, datetime64) as datetime64[D]; tz-aware values keep their local date."""
+    if hasattr(dates, "dt"):                    # pd.Series of datetimes
+        dates = dates.dt.tz_localize(None) if dates.dt.tz is not None else dates
+        dates = dates.to_numpy()
+    elif getattr(dates, "tz", None) is not None:
+        dates = dates.tz_localize(None)
+    if hasattr(dates, "to_datetime64"):
+        dates = dates.to_datetime64()
+    return np.asarray(dates).astype("datetime64[D]")
+
+class TradingCalendar:
+    """Sessions of one exchange between `start` and `end` (inclusive)."""
+
+    def __init__(self, holidays: Iterable, start: str = DEFAULT_RANGE[0], end: str = DEFAULT_RANGE[1],
+                 weekmask: str = "1111100", name: str = ""):
+        self.name = name
+        self.holidays = np.unique(to_days(list(holidays)))
+        self.busdaycal = np.busdaycalendar(weekmask=weekmask, holidays=self.holidays)
+        self.first, self.last = np.datetime64(start, "D"), np.datetime64(end, "D")
+        days = np.arange(self.first, self.last + 1)
+        self.sessions = days[np.is_busday(days, busdaycal=self.busdaycal)]
+        n_years = (self.last - self.first + 1).astype(np.int64) / 365.2425
+        self.sessions_per_year = len(self.sessions) / n_years
+
+    def _positions(self, dates: Any, side: str) -> np.ndarray:
+        d = to_days(dates)
+        if np.any((d < self.first) | (d > self.last)):
+            raise ValueError(f"Date outside the {self.name or 'trading'} calendar ({self.first} ~ {self.last})")
+        return np.searchsorted(self.sessions, d, side=side)
+
+    def is_session(self, dates: Any) -> np.ndarray:
+        return np.is_busday(to_days(dates), busdaycal=self.busdaycal)
+
+    def next_session(self, dates: Any, inclusive: bool = True) -> np.ndarray:
+        """First session on/after each date (strictly after with inclusive=False)."""
+        pos = self._positions(dates, "left" if inclusive else "right")
+        if np.any(pos >= len(self.sessions)):
+            raise ValueError(f"No session after the calendar's end ({self.last})")
+        return self.sessions[pos]
+
+    def previous_session(self, dates: Any, inclusive: bool = True) -> np.ndarray:
+        """Last session on/before each date (strictly before with inclusive=False)."""
+        pos = self._positions(dates, "right" if inclusive else "left") - 1
+        if np.any(pos < 0):
+            raise ValueError(f"No session before the calendar's start ({self.first})")
+        return self.sessions[pos]
+
+    def count_sessions(self, start: Any, end: Any) -> np.ndarray:
+        """
+        Sessions in [start, end) per pair of dates, like np.busday_count (negative if end < start).
+        Unlike the lookups this doesn't raise outside [first, last]: there every
+        weekday counts, with no holidays -- so performance_summary's years for
+        history before DEFAULT_RANGE are a weekday count.
+        """
+        return np.busday_count(to_days(start), to_days(end), busdaycal=self.busdaycal)
+
+    def sessions_in(self, start: Any, end: Any) -> np.ndarray:
+        """Sessions from start to end, inclusive."""
+        lo, hi = self._positions(start, "left"), self._positions(end, "right")
+        return self.sessions[int(lo):int(hi)]
+
+    def years_between(self, start: Any, end: Any) -> np.ndarray:
+        """Elapsed time in years, counted in sessions (sessions_per_year per year)."""
+        return self.count_sessions(start, end) / self.sessions_per_year
+
+@lru_cache(maxsize=None)
+def nyse_calendar(start: str = DEFAULT_RANGE[0], end: str = DEFAULT_RANGE[1]) -> TradingCalendar:
+    first, last = int(start[:4]), int(end[:4])
+    return TradingCalendar(nyse_holidays(first, last), start=start, end=end, name="NYSE")
+
+def default_calendar(name: Optional[str] = None) -> TradingCalendar:
+    if name not in (None, "NYSE"):
+        raise ValueError(f"Unknown trading calendar: {name!r}")
+    return nyse_calendar()
@@ -0,0 +1,25 @@
+import pandas as pd
+
+from stock_analyzer.bench import compare, run
+from stock_analyzer.synthetic import synthetic_universe, synthetic_news
+
+
+def test_synthetic_data_is_deterministic():
+    a = synthetic_universe(3, years=1, seed=42)
+    b = synthetic_universe(3, years=1, seed=42)
+    for t in a:
+        pd.testing.assert_frame_equal(a[t], b[t])
+        assert (a[t]["High"] >= a[t][["Open", "Close"]].max(axis=1)).all()
+        assert (a[t]["Low"] <= a[t][["Open", "Close"]].min(axis=1)).all()
+    pd.testing.assert_frame_equal(synthetic_news(500, seed=1), synthetic_news(500, seed=1))
+
+
+def test_compare_flags_regressions():
+    current = run(["small"], ["performance_summary"], repeat=1, log=lambda _: None)
+    key = "performance_summary[small]"
+    baseline = {"results": {key: dict(current["results"][key])}}
+    assert compare(current, baseline) == []
+
+    baseline["results"][key]["seconds"] = current["results"][key]["seconds"] / 10
+    current["results"][key]["seconds"] = max(current["results"][key]["seconds"], 0.01)
+    assert compare(current, baseline, threshold=0.25)
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from stock_analyzer.bootstrap import METRICS, BootstrapConfig, bootstrap_ci, flatten_ci, path_metrics, resample_indices
+from stock_analyzer.portfolio import attach_ci, panel_performance, to_perf_rows
+
+
+def test_resample_indices_shape_range_and_blocks():
+    idx = resample_indices(50, 200, np.random.default_rng(0), mean_block=10.0)
+    assert idx.shape == (200, 50) and idx.min() >= 0 and idx.max() < 50
+    assert np.array_equal(idx, resample_indices(50, 200, np.random.default_rng(0), mean_block=10.0))
+    # inside a block the index advances by one (mod n): ~1 - 1/mean_block of the steps
+    cont = ((np.diff(idx, axis=1) % 50) == 1).mean()
+    assert 0.85 < cont < 0.95
+    iid = resample_indices(50, 200, np.random.default_rng(0), method="iid")
+    assert ((np.diff(iid, axis=1) % 50) == 1).mean() < 0.1
+
+
+def test_bootstrap_ci_is_seeded_worker_independent_and_brackets_the_estimate():
+    ret = np.random.default_rng(1).normal(0.0005, 0.01, 500)
+    cfg = BootstrapConfig(n_paths=400, chunk_size=100, seed=7)
+    ci = bootstrap_ci(ret, years=2.0, config=cfg)
+    assert ci == bootstrap_ci(ret, years=2.0, config=cfg)
+    assert ci == bootstrap_ci(ret, years=2.0, config=BootstrapConfig(n_paths=400, chunk_size=100, seed=7, workers=2))
+    assert ci != bootstrap_ci(ret, years=2.0, config=BootstrapConfig(n_paths=400, chunk_size=100, seed=8))
+
+    point = path_metrics(ret[None, :], years=2.0)
+    for m in METRICS:
+        lo, hi = ci[m]
+        assert lo < point[m][0] < hi, m
+
+    flat = flatten_ci(ci)
+    assert flat["sharpe_ci_lo"] == ci["sharpe"][0] and flat["sharpe_ci_hi"] == ci["sharpe"][1]
+    assert len(flat) == 2 * len(METRICS) and flatten_ci(None) == {}
+
+
+def test_too_few_returns_give_nan_intervals_instead_of_aborting():
+    idx = pd.bdate_range("2024-01-01", periods=300)
+    closes = pd.DataFrame({"OLD": 100 * np.exp(np.cumsum(np.full(300, 0.001))), "NEW": np.nan}, index=idx)
+    closes.iloc[-3:, 1] = [10.0, 10.5, 10.2]               # listed two returns ago
+    cfg = BootstrapConfig(n_paths=200, chunk_size=100)
+    rows = attach_ci(to_perf_rows(panel_performance(closes)), closes, cfg)
+    new = next(r for r in rows if r["ticker"] == "NEW")["ci"]
+    assert new["n_paths"] == 200 and new["method"] == "stationary"
+    assert all(np.isnan(new[m]).all() for m in METRICS)
+    old = next(r for r in rows if r["ticker"] == "OLD")["ci"]
+    assert np.isfinite(old["cagr"]).all()
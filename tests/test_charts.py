@@ -0,0 +1,27 @@
+import numpy as np
+
+from stock_analyzer.charts import ChartSpec, lttb_indices, render_chart
+
+
+def test_lttb_keeps_endpoints_count_and_peaks():
+    x = np.arange(10_000)
+    y = np.sin(x / 300.0)
+    y[4321] = 50.0                                  # a one-bar spike must survive downsampling
+    idx = lttb_indices(x, y, 500)
+    assert len(idx) == 500 and idx[0] == 0 and idx[-1] == len(x) - 1
+    assert np.all(np.diff(idx) > 0) and 4321 in idx
+    assert np.array_equal(lttb_indices(x[:100], y[:100], 500), np.arange(100))
+
+
+def test_unchanged_chart_is_not_redrawn(tmp_path):
+    x = np.arange(50.0)
+    spec = ChartSpec(tmp_path / "c.png", "t", "x", "y", lines={"a": (x, x ** 2)})
+    assert render_chart(spec) is True
+    mtime = spec.path.stat().st_mtime_ns
+    assert render_chart(spec) is False and spec.path.stat().st_mtime_ns == mtime
+    assert render_chart(spec, force=True) is True
+
+    spec.lines["a"] = (x, x ** 3)
+    assert render_chart(spec) is True
+    spec.path.write_bytes(b"not a png")             # corrupt file: redrawn, not an error
+    assert render_chart(spec) is True
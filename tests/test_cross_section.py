@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from stock_analyzer.cross_section import cross_section, iter_tidy, rank_rows, rsi_panel, to_tidy
+from stock_analyzer.indicators import rsi
+
+
+def _closes():
+    rng = np.random.default_rng(11)
+    idx = pd.bdate_range("2019-01-01", periods=300)
+    c = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.02, (300, 12)), axis=0)),
+                     index=idx, columns=[f"T{i}" for i in range(12)])
+    c.iloc[:80, 2] = np.nan      # listed late
+    c.iloc[200:, 3] = np.nan     # delisted
+    c.iloc[150:153, 4] = np.nan  # gap
+    return c
+
+
+def test_rank_rows_matches_pandas_with_ties_and_gaps():
+    x = _closes().round(0).to_numpy()
+    ranks, count = rank_rows(x)
+    np.testing.assert_allclose(ranks, pd.DataFrame(x).rank(axis=1).to_numpy())
+    np.testing.assert_array_equal(count, np.isfinite(x).sum(axis=1))
+
+
+def test_cross_section_stats_and_rsi():
+    c = _closes()
+    cs = cross_section(c)
+    ret = cs["RET"]
+    np.testing.assert_allclose(cs["RET_PCT"], ret.rank(axis=1, pct=True))
+    z = ret.sub(ret.mean(axis=1), axis=0).div(ret.std(axis=1), axis=0)
+    np.testing.assert_allclose(cs["RET_Z"], z)
+    for t in ("T2", "T4"):
+        np.testing.assert_allclose(rsi_panel(c)[t].dropna(), rsi(c[t].dropna()).dropna())
+
+    tidy = to_tidy(cs)
+    # every listed (date, ticker) but each ticker's first close, where no feature exists yet
+    assert len(tidy) == int(c.notna().sum().sum()) - c.shape[1]
+    assert set(tidy.columns) >= {"Ticker", "RET", "RSI14_RANK", "VOL21_PCT", "MOM_Z"}
+
+    blocks = list(iter_tidy(c, chunk_rows=64))
+    assert len(blocks) == 5
+    pd.testing.assert_frame_equal(pd.concat(blocks), tidy)
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from stock_analyzer.events import EventWindow, detect_events, event_study
+
+
+def test_market_model_matches_ols_and_finds_injected_effect():
+    rng = np.random.default_rng(5)
+    n, k = 1500, 20
+    idx = pd.bdate_range("2015-01-01", periods=n)
+    market = pd.Series(rng.normal(0.0003, 0.01, n), index=idx)
+    betas = rng.uniform(0.5, 1.5, k)
+    noise = rng.normal(0, 0.01, (n, k))
+    spikes = rng.random((n, k)) < 0.01
+    returns = pd.DataFrame(market.to_numpy()[:, None] * betas + noise + np.roll(spikes, 1, axis=0) * 0.03,
+                           index=idx, columns=[f"T{i}" for i in range(k)])
+    news = pd.DataFrame(rng.poisson(2, (n, k)) + spikes * 25, index=idx, columns=returns.columns)
+
+    win = EventWindow(pre=2, post=4, est_len=100, est_gap=5)
+    events = {t: detect_events(news[t], threshold=4.0, min_gap=10) for t in returns.columns}
+    res = event_study(returns, events, market=market, window=win, n_boot=500)
+
+    assert res.meta["n_events"] > 50
+    assert res.summary.loc[1, "aar"] > 0.02 and res.summary.loc[1, "p_boot"] < 0.01
+    assert abs(res.summary.loc[0, "aar"]) < 0.005
+
+    e = res.events.iloc[3]
+    i = idx.get_loc(e["date"])
+    est = slice(i - win.pre - win.est_gap - win.est_len, i - win.pre - win.est_gap)
+    b, a = np.polyfit(market.iloc[est], returns[e["ticker"]].iloc[est], 1)
+    expected = returns[e["ticker"]].iloc[i - 2:i + 5] - (a + b * market.iloc[i - 2:i + 5])
+    np.testing.assert_allclose(res.ar[3], expected.to_numpy())
+
+
+def test_min_gap_is_measured_from_the_last_kept_event():
+    idx = pd.bdate_range("2020-01-01", periods=40)
+    x = pd.Series(0.0, index=idx)
+    x.iloc[5:30] = 1.0                       # one long run of consecutive hits
+    ev = detect_events(x, method="quantile", threshold=0.1, min_gap=10)
+    assert ev["pos"].tolist() == [5, 16, 27]
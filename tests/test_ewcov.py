@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from stock_analyzer.ewcov import EwCovariance, ew_covariance
+
+
+def test_streaming_matches_pandas_and_resumes_from_checkpoint(tmp_path):
+    rng = np.random.default_rng(2)
+    idx = pd.bdate_range("2020-01-01", periods=300)
+    returns = pd.DataFrame(rng.normal(0, 0.01, (300, 5)) @ rng.normal(size=(5, 5)),
+                           index=idx, columns=list("ABCDE"))
+
+    est = ew_covariance(returns, halflife=20, block=32)
+    ewm = returns.ewm(halflife=20, adjust=False)
+    np.testing.assert_allclose(est.cov().to_numpy(), ewm.cov(bias=True).loc[idx[-1]].to_numpy(), atol=1e-15)
+    np.testing.assert_allclose(est.corr().to_numpy(), ewm.corr().loc[idx[-1]].to_numpy(), atol=1e-12)
+
+    gappy = returns.copy()
+    gappy.iloc[:80, 1] = np.nan          # listed late
+    gappy.iloc[150:160, 3] = np.nan      # halted
+    full = EwCovariance(gappy.columns, halflife=20)
+    for date, row in gappy.iterrows():
+        full.update(row, date=date)
+
+    path = ew_covariance(gappy.iloc[:123], halflife=20).save(tmp_path / "ewcov.npz")
+    resumed = ew_covariance(gappy, state=EwCovariance.load(path))
+    assert resumed.bars == full.bars == len(gappy) and resumed.last == idx[-1]
+    np.testing.assert_allclose(resumed.cov_array(), full.cov_array(), rtol=1e-12, atol=1e-20)
+
+
+def test_long_block_with_short_halflife_does_not_underflow():
+    rng = np.random.default_rng(4)
+    returns = pd.DataFrame(rng.normal(0, 0.01, (3000, 4)), columns=list("ABCD"),
+                           index=pd.bdate_range("2010-01-01", periods=3000))
+    est = EwCovariance(returns.columns, halflife=2)
+    est.update_many(returns)
+    want = returns.ewm(halflife=2, adjust=False).cov(bias=True).loc[returns.index[-1]]
+    np.testing.assert_allclose(est.cov_array(), want.to_numpy(), rtol=1e-9)
+
+    est = EwCovariance(returns.columns, alpha=1.0)
+    est.update_many(returns)
+    assert np.all(est.cov_array() == 0.0)
@@ -0,0 +1,84 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from stock_analyzer.export import ArtifactWriter, load_table, load_perf_rows, save_artifacts
+
+
+def _frame(ticker, n, volume_dtype):
+    idx = pd.date_range("2020-01-01", periods=n, freq="D", name="date")
+    return pd.DataFrame({"Close": np.linspace(10, 20, n),
+                         "Volume": np.arange(n).astype(volume_dtype),
+                         "Ticker": ticker}, index=idx)
+
+
+def test_streamed_tables_match_save_artifacts(tmp_path):
+    frames = [_frame("AAA", 30, "int64"), _frame("BBB", 20, "float64")]
+    rows = [{"ticker": "AAA", "sharpe": 1.0}, {"ticker": "BBB", "sharpe": float("nan")}]
+    for fmt in ("parquet", "csv"):
+        with ArtifactWriter(tmp_path / f"stream_{fmt}", fmt=fmt) as w:
+            for df, row in zip(frames, rows):
+                for name in ("prices", "indicators", "returns"):
+                    w.write(name, df)
+                w.add_perf(row)
+        full = pd.concat(frames)
+        save_artifacts(prices=full, indicators=full, returns=full, perf_rows=rows,
+                       out_dir=tmp_path / f"batch_{fmt}", fmt=fmt)
+        for name in ("prices", "indicators", "returns"):
+            pd.testing.assert_frame_equal(load_table(tmp_path / f"stream_{fmt}", name),
+                                          load_table(tmp_path / f"batch_{fmt}", name), check_dtype=False)
+        assert [r["ticker"] for r in load_perf_rows(tmp_path / f"stream_{fmt}")] == ["AAA", "BBB"]
+        lines = (tmp_path / f"stream_{fmt}" / "performance.jsonl").read_text().splitlines()
+        assert [json.loads(l)["ticker"] for l in lines] == ["AAA", "BBB"]
+
+
+def test_every_backend_round_trips_and_reads_column_subsets(tmp_path):
+    from stock_analyzer.cli_parse import EXPORT_FORMATS
+    from stock_analyzer.export import BACKENDS
+
+    assert tuple(BACKENDS) == EXPORT_FORMATS
+    frames = [_frame("AAA", 30, "int64"), _frame("BBB", 20, "float64")]
+    full = pd.concat(frames)
+    for fmt in BACKENDS:
+        with ArtifactWriter(tmp_path / fmt, fmt=fmt, row_group_size=16) as w:
+            for df in frames:
+                w.write("prices", df)
+        got = load_table(tmp_path / fmt, "prices")
+        pd.testing.assert_frame_equal(got, full, check_dtype=False, check_freq=False, obj=fmt)
+        sub = load_table(tmp_path / fmt, "prices", columns=["Close", "Ticker"])
+        assert list(sub.columns) == ["Close", "Ticker"] and isinstance(sub.index, pd.DatetimeIndex), fmt
+
+
+def test_fractional_volume_after_int_ticker_and_failed_run(tmp_path):
+    first = _frame("AAA", 10, "int64")
+    later = _frame("BBB", 10, "float64").assign(Volume=lambda d: d["Volume"] + 0.5)   # e.g. split-adjusted
+    for fmt in ("parquet", "feather"):
+        with ArtifactWriter(tmp_path / fmt, fmt=fmt) as w:
+            w.write("prices", first)
+            w.write("prices", later)
+        got = load_table(tmp_path / fmt, "prices")
+        assert got["Volume"].iloc[-1] == 9.5 and got["Volume"].iloc[0] == 0
+
+    out = tmp_path / "failed"
+    try:
+        with ArtifactWriter(out) as w:
+            w.write("prices", first)
+            w.add_perf({"ticker": "AAA", "sharpe": 1.0})
+            raise RuntimeError("quality check failed")
+    except RuntimeError:
+        pass
+    assert not (out / "performance.json").exists()
+    assert [r["ticker"] for r in load_perf_rows(out)] == ["AAA"]
+
+
+def test_rewrite_in_another_format_replaces_the_old_file(tmp_path):
+    old = pd.DataFrame({"Close": [1.0, 2.0]}, index=pd.bdate_range("2024-01-01", periods=2))
+    new = old * 10
+    save_artifacts(prices=old, out_dir=tmp_path, fmt="parquet")
+    save_artifacts(prices=new, out_dir=tmp_path, fmt="csv")
+    assert sorted(p.name for p in tmp_path.glob("prices.*")) == ["prices.csv"]
+    assert load_table(tmp_path, "prices")["Close"].tolist() == [10.0, 20.0]
+    with ArtifactWriter(tmp_path, "feather") as w:
+        w.write("prices", old)
+    assert sorted(p.name for p in tmp_path.glob("prices.*")) == ["prices.feather"]
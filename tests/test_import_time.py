@@ -0,0 +1,49 @@
+"""
+Import-time budget for the CLI entry points, measured with `python -X importtime`.
+
+Run directly (`python tests/test_import_time.py`) to print the slowest imports.
+"""
+import subprocess
+import sys
+
+BUDGET_US = 150_000   # cumulative import time of both CLI modules, in microseconds
+FORBIDDEN = ("yfinance", "GoogleNews", "matplotlib", "pandas.plotting")
+
+STMT = (
+    "import stock_analyzer.cli as c, stock_analyzer.cli_parse as p; "
+    "c.build_parser().parse_args(['AMZN']); "
+    "p.build_parser().parse_args(['--tickers', 'AAPL,MSFT'])"
+)
+
+
+def measure(stmt: str = STMT) -> dict:
+    """Module -> cumulative import time (us) as reported by `-X importtime`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", stmt],
+        capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cum_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cum_us)
+    return times
+
+
+def test_cli_startup_skips_heavy_dependencies():
+    times = measure()
+    loaded = [m for m in times if any(m == f or m.startswith(f + ".") for f in FORBIDDEN)]
+    assert not loaded, f"heavy modules imported at CLI startup: {loaded}"
+
+
+def test_cli_import_time_budget():
+    times = measure()
+    total = times["stock_analyzer.cli"] + times["stock_analyzer.cli_parse"]
+    assert total < BUDGET_US, f"CLI import took {total / 1000:.1f} ms (budget {BUDGET_US / 1000:.0f} ms)"
+
+
+if __name__ == "__main__":
+    times = measure()
+    for name, us in sorted(times.items(), key=lambda kv: -kv[1])[:20]:
+        print(f"{us / 1000:9.2f} ms  {name}")
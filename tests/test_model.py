@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from stock_analyzer.model import FEATURES, build_features, load_model, save_model, score_frames
+
+
+def test_flat_forest_matches_sklearn_and_round_trips(tmp_path):
+    rng = np.random.default_rng(3)
+    n = 1500
+    idx = pd.bdate_range("2010-01-01", periods=n)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    df = pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+                       "Volume": rng.integers(1_000, 10_000, n),
+                       "news_count": rng.poisson(1, n).astype(float),
+                       "news_sentiment": rng.normal(0, 0.3, n)}, index=idx)
+    X = build_features(df)
+    assert list(X.columns) == FEATURES and len(X) == n - 1
+    y = pd.Series(rng.integers(0, 2, len(X)), index=X.index)
+    model = RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0).fit(X, y)
+
+    path = save_model(model, X, y, tmp_path / "updown", metrics={"accuracy": 0.5})
+    assert path.name == "v1" and save_model(model, X, y, tmp_path / "updown").name == "v2"
+    art = load_model(tmp_path / "updown", version=1)
+    assert art.meta["train"]["rows"] == len(X) and art.meta["metrics"]["accuracy"] == 0.5
+
+    expected = model.predict_proba(X)
+    np.testing.assert_array_equal(art.predict_proba(X.to_numpy(), engine="flat"), expected)
+    np.testing.assert_array_equal(art.predict_proba(X.to_numpy(), engine="sklearn"), expected)
+
+    scores = score_frames(art, {"AAA": df, "BBB": df})
+    assert len(scores) == 2 * len(X)
+    np.testing.assert_allclose(scores["prob_up"].to_numpy()[:len(X)], expected[:, 1])
+
+
+def test_auto_engine_uses_flat_for_small_batches_and_sklearn_in_bulk(tmp_path, monkeypatch):
+    import stock_analyzer.model as model_mod
+    rng = np.random.default_rng(4)
+    X = pd.DataFrame(rng.normal(size=(400, len(FEATURES))), columns=FEATURES,
+                     index=pd.bdate_range("2015-01-01", periods=400))
+    y = pd.Series(rng.integers(0, 2, 400), index=X.index)
+    model = RandomForestClassifier(n_estimators=10, max_depth=5, random_state=0).fit(X, y)
+    art = load_model(save_model(model, X, y, tmp_path / "m"))
+    monkeypatch.setattr(model_mod, "FLAT_MAX_ROWS", 100)
+
+    np.testing.assert_array_equal(art.predict_proba(X.to_numpy()[:100]), model.predict_proba(X[:100]))
+    assert art.flat is not None and art.model is None
+    np.testing.assert_array_equal(art.predict_proba(X.to_numpy()), model.predict_proba(X))
+    assert art.model is not None
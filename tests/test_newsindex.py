@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from stock_analyzer.newsindex import (build_index, decode_varint, encode_varint, load_index,
+                                      local_news_counts, tokenize, update_index)
+from stock_analyzer.synthetic import synthetic_news
+
+
+def test_varint_round_trip():
+    x = np.array([0, 1, 127, 128, 16_383, 16_384, 2 ** 35 + 7])
+    assert len(encode_varint(x)) == 1 + 1 + 1 + 2 + 2 + 3 + 6
+    np.testing.assert_array_equal(decode_varint(encode_varint(x)), x)
+
+
+def test_incremental_index_matches_brute_force(tmp_path):
+    arts = synthetic_news(3_000, seed=4).drop(columns="published_at")
+    build_index(tmp_path, arts.iloc[:2_000])
+    idx, added = update_index(tmp_path, arts.iloc[1_500:])        # overlap is skipped
+    assert added == 1_000
+    idx = load_index(tmp_path)
+    assert idx.n_articles == 3_000
+
+    toks = tokenize(arts["title"] + " " + arts["description"]).map(set)
+    w1, w2 = arts["title"].iloc[0].lower().split()[:2]
+    cases = {
+        f"{w1} AND {w2}": toks.map(lambda s: w1 in s and w2 in s),
+        f"{w1.upper()} OR ({w2})": toks.map(lambda s: w1 in s or w2 in s),
+        f"{w1[:3]}*": toks.map(lambda s: any(t.startswith(w1[:3]) for t in s)),
+    }
+    for query, mask in cases.items():
+        hit = arts[mask.to_numpy()]
+        expected = hit.groupby(pd.to_datetime(hit["date"]).rename("date")).agg(
+            news_count=("title", "count"), news_sentiment=("sentiment", "mean"))
+        got = idx.daily(query)
+        np.testing.assert_array_equal(got.index, expected.index)
+        np.testing.assert_array_equal(got["news_count"], expected["news_count"])
+        np.testing.assert_allclose(got["news_sentiment"], expected["news_sentiment"], atol=1e-6)
+
+    counts = local_news_counts(query=w1, start="2012-01-01", end="2012-01-31", index_dir=tmp_path)
+    assert list(counts.columns) == ["date", "query", "count", "sentiment"] and len(counts) == 31
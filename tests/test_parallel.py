@@ -0,0 +1,50 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import pandas as pd
+
+from stock_analyzer import parallel
+from stock_analyzer.parallel import PoolStats, analyze_one, analyze_parallel
+from stock_analyzer.synthetic import synthetic_universe
+
+
+def test_pool_matches_serial_in_input_order():
+    frames = synthetic_universe(["CCC", "AAA", "BBB", "DDD"], years=2, seed=3)
+    stats = PoolStats(2)
+    results = list(analyze_parallel(frames.items(), workers=2, rf=0.02, in_flight=2, stats=stats))
+
+    assert [r[0] for r in results] == list(frames)
+    for ticker, raw, ind, rows in results:
+        want_ind, want_rows = analyze_one(ticker, frames[ticker], rf=0.02)
+        pd.testing.assert_frame_equal(ind, want_ind)
+        assert rows == want_rows
+    assert sum(stats.tasks.values()) == 4 and len(stats.lines()) == len(stats.busy)
+
+
+def test_breaking_out_early_waits_for_running_tasks_before_unlinking(monkeypatch):
+    owner, early = {}, []                       # block name -> the task using it
+
+    class Recording(ProcessPoolExecutor):
+        def submit(self, fn, job):
+            fut = super().submit(fn, job)
+            owner[job[1].name] = owner[job[2]] = fut
+            return fut
+
+    real_unlink = shared_memory.SharedMemory.unlink
+
+    def unlink(self):
+        if not owner[self.name].done():
+            early.append(self.name)
+        real_unlink(self)
+
+    monkeypatch.setattr(parallel, "ProcessPoolExecutor", Recording)
+    monkeypatch.setattr(shared_memory.SharedMemory, "unlink", unlink)
+    frames = synthetic_universe(["AAA", "BBB", "CCC", "DDD", "EEE", "FFF"], years=2, seed=3)
+    gen = analyze_parallel(frames.items(), workers=2, in_flight=6)
+    for ticker, *_ in gen:
+        break
+    gen.close()
+
+    futures = set(owner.values())
+    assert ticker == "AAA" and len(futures) == 6 and early == []
+    assert all(f.cancelled() or f.exception() is None for f in futures)
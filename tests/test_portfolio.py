@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from stock_analyzer.analysis import performance_summary
+from stock_analyzer.portfolio import (
+    close_panel, returns_panel, panel_performance, to_perf_rows,
+    covariance_matrix, correlation_matrix, portfolio_returns,
+)
+
+
+def _frames():
+    rng = np.random.default_rng(7)
+    idx = pd.bdate_range("2018-01-01", periods=600)
+    frames = {}
+    for i, t in enumerate(["AAA", "BBB", "CCC"]):
+        close = 50 * np.exp(np.cumsum(rng.normal(0.0004, 0.02, len(idx))))
+        df = pd.DataFrame({"Close": close, "Adj Close": close}, index=idx)
+        frames[t] = df.iloc[i * 120:]  # staggered listings
+    return frames
+
+
+def test_panel_matches_performance_summary():
+    frames = _frames()
+    perf = panel_performance(close_panel(frames), risk_free_rate_annual=0.02)
+    for row in to_perf_rows(perf):
+        expected = performance_summary(frames[row["ticker"]], risk_free_rate_annual=0.02).to_dict()
+        for k, v in expected.items():
+            if isinstance(v, float):
+                assert np.isclose(row[k], v, rtol=1e-9, atol=1e-12), k
+            else:
+                assert row[k] == v, k
+
+
+def test_matrix_moments_match_pandas():
+    ret = returns_panel(close_panel(_frames()))
+    pd.testing.assert_frame_equal(covariance_matrix(ret), ret.cov(), check_exact=False, rtol=1e-8)
+    pd.testing.assert_frame_equal(correlation_matrix(ret), ret.corr(), check_exact=False, rtol=1e-8)
+
+
+def test_portfolio_daily_rebalance_is_weighted_sum():
+    ret = returns_panel(close_panel(_frames())).dropna()
+    w = {"AAA": 0.5, "BBB": 0.3, "CCC": 0.2}
+    daily = portfolio_returns(ret, w, rebalance="D")
+    expected = (ret * pd.Series(w)).sum(axis=1)
+    assert np.allclose(daily.to_numpy(), expected.to_numpy())
+
+    hold = portfolio_returns(ret, w, rebalance=None)
+    value = ((1 + ret).cumprod() * pd.Series(w)).sum(axis=1)
+    assert np.isclose((1 + hold).prod(), value.iloc[-1])
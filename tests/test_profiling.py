@@ -0,0 +1,39 @@
+import json
+import tracemalloc
+
+import numpy as np
+
+from stock_analyzer.profiling import Profiler
+
+
+def test_stage_records_and_profile_json(tmp_path):
+    prof = Profiler(enabled=True, command="stock-parse")
+    for t in ("AAA", "BBB"):
+        with prof.stage("indicators", t):
+            np.ones(2 ** 20)                      # 8 MiB, freed again before the stage ends
+    with prof.stage("distribution"):
+        pass
+    assert [(r["stage"], r["ticker"]) for r in prof.records] == [
+        ("indicators", "AAA"), ("indicators", "BBB"), ("distribution", None)]
+    assert prof.records[0]["peak_mb"] >= 7.9 and prof.records[2]["peak_mb"] < 1.0
+
+    doc = json.loads(prof.write(tmp_path, argv=["--tickers", "AAA,BBB"]).read_text())
+    assert doc["command"] == "stock-parse" and doc["argv"] == ["--tickers", "AAA,BBB"]
+    assert doc["tracemalloc"] is True and doc["slowest_stage"] in ("indicators", "distribution")
+    assert doc["summary"]["indicators"]["calls"] == 2 and len(doc["stages"]) == 3
+    assert set(doc["stages"][0]) == {"stage", "ticker", "wall_s", "cpu_s", "peak_mb", "process_rss_peak_mb"}
+    tracemalloc.stop()
+
+
+def test_time_only_and_disabled(tmp_path):
+    tracemalloc.stop()
+    prof = Profiler(enabled=True, memory=False)
+    with prof.stage("fetch", "AAA"):
+        pass
+    assert not tracemalloc.is_tracing() and prof.records[0]["peak_mb"] is None
+    assert prof.summary()["fetch"]["peak_mb"] is None
+
+    off = Profiler()
+    with off.stage("fetch"):
+        pass
+    assert off.records == [] and off.write(tmp_path) is None
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from stock_analyzer.quality import check_policy, repair_prices, validate_prices
+from stock_analyzer.synthetic import synthetic_universe
+
+
+def test_flags_corruptions_and_repairs_them():
+    clean = synthetic_universe(["AAA"], years=2, seed=1)["AAA"].drop(columns="Ticker")
+    assert validate_prices(clean, "AAA").status == "ok"
+
+    df = clean.copy()
+    i = df.index
+    df.iloc[200:, :5] /= 2.0                                   # unadjusted 2:1 split
+    df.iloc[201:, 5] *= 2.0
+    df.iloc[50, [1, 2]] = df.iloc[50, [2, 1]].to_numpy()      # High < Low
+    df.iloc[60, :5] = df.iloc[59, :5].to_numpy()              # stale bar
+    df.iloc[60, 5] = 0
+    df.iloc[70, 3] = np.nan
+    df = pd.concat([df.drop(i[100:110]), df.iloc[[30]]])      # two-week hole, duplicated + unsorted row
+
+    rep = validate_prices(df, "AAA")
+    assert rep.status == "fail"
+    assert set(rep.errors) == {"duplicates", "high_low", "split_like"}
+    assert {"stale", "zero_volume", "nan_rows", "unsorted", "gaps"} <= set(rep.warnings)
+    assert rep.first["split_like"] == str(i[200])
+    with pytest.raises(ValueError, match="split_like"):
+        check_policy([rep], "fail")
+    assert check_policy([rep], "warn") == [rep.summary()]
+
+    fixed = repair_prices(df, rep)
+    assert rep.repairs == {"duplicates": 1, "high_low": 1, "split_like": 1}
+    after = validate_prices(fixed, "AAA")
+    assert after.errors == [] and fixed.index.is_monotonic_increasing
+    np.testing.assert_allclose(fixed["Close"].iloc[:50], clean["Close"].iloc[:50] / 2.0)
+    assert fixed["Close"].notna().all()
+
+
+def test_genuine_one_day_crash_is_not_a_split():
+    idx = pd.bdate_range("2024-01-01", periods=4)
+    df = pd.DataFrame({"Open": [100.0, 101.0, 70.0, 68.0], "High": [103.0, 104.0, 96.0, 70.0],
+                       "Low": [99.0, 100.0, 66.0, 66.5], "Close": [101.0, 102.0, 67.5, 69.0],
+                       "Volume": [1e6, 1.1e6, 9e6, 4e6]}, index=idx)
+    rep = validate_prices(df, "CRASH")
+    assert rep.status == "warn" and rep.warnings == ["jumps"]
+    # even a gap-down without range overlap is only a jump at -34%
+    gapped = df.assign(High=[103.0, 104.0, 72.0, 70.0])
+    assert validate_prices(gapped, "CRASH").errors == []
+    np.testing.assert_array_equal(repair_prices(df, rep)["Close"], df["Close"])
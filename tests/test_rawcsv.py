@@ -0,0 +1,54 @@
+import json
+
+import numpy as np
+
+from stock_analyzer.rawcsv import SNIFF_ROWS, SchemaCache, load_price_history, read_price_csv, sniff_schema
+
+YAHOO = """date,open,high,low,close,adj_close,volume
+2022-01-03 00:00:00-05:00,10.0,11.0,9.5,10.5,10.5,1000
+2022-01-04 00:00:00-05:00,10.5,11.5,10.0,11.0,11.0,1200
+2022-01-05 00:00:00-05:00,11.0,11.2,10.1,10.2,10.2,900
+"""
+
+NASDAQ = """Date,Close/Last,Volume,Open,High,Low
+01/24/2022,$12.00,"1,500",$11.00,$12.50,$10.90
+01/05/2022,$10.30,"950",$11.00,$11.20,$10.10
+"""
+
+
+def test_sniffed_schemas_and_merged_history(tmp_path):
+    a, b = tmp_path / "a.csv", tmp_path / "b.csv"
+    a.write_text(YAHOO)
+    b.write_text(NASDAQ)
+    s = sniff_schema(b)
+    assert s.date_kind == "us-date" and s.columns["Close/Last"] == "Close" and "Volume" in s.dirty
+
+    cache = SchemaCache(tmp_path / "schemas.json")
+    df, report = load_price_history([a, b], cache=cache, max_gap_bdays=5)
+    assert list(df.columns) == ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+    assert str(df.index[0].date()) == "2022-01-03" and df.index.is_monotonic_increasing
+    assert df.loc["2022-01-05", "Close"] == 10.3          # later file wins the duplicate date
+    assert df.loc["2022-01-24", "Volume"] == 1500 and df["Volume"].dtype == "int64"
+    assert report.duplicates == 1 and report.conflicts == 1
+    assert report.gaps == [("2022-01-05", "2022-01-24", 11)]   # MLK Day is not a session
+
+    assert len(json.loads((tmp_path / "schemas.json").read_text())) == 2
+    reloaded = SchemaCache(tmp_path / "schemas.json")
+    assert read_price_csv(a, cache=reloaded).equals(read_price_csv(a))
+
+
+def test_thousands_separators_past_the_sniffed_rows_refresh_the_cache(tmp_path):
+    days = np.datetime64("2020-01-01") + np.arange(SNIFF_ROWS + 1)
+    rows = [f"{d},{990 + i}.5,{990 + i}.5,1000" for i, d in enumerate(days[:-1])]
+    rows += [f'{days[-1]},"1,060.5","1,060.5","1,000"']    # crosses 1,000 after the sample
+    path = tmp_path / "late.csv"
+    path.write_text("Date,Close,Adj Close,Volume\n" + "\n".join(rows) + "\n")
+
+    cache = SchemaCache(tmp_path / "schemas.json")
+    assert cache.get(path).dirty == []
+    df = read_price_csv(path, cache=cache)
+    assert df["Close"].iloc[-1] == 1060.5 and df["Volume"].dtype == "int64" and len(df) == SNIFF_ROWS + 1
+
+    entry, = json.loads((tmp_path / "schemas.json").read_text()).values()
+    assert entry["dirty"] == ["Close", "Adj Close", "Volume"]
+    assert read_price_csv(path, cache=SchemaCache(tmp_path / "schemas.json")).equals(df)
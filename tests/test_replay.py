@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+
+from stock_analyzer.analysis import compute_indicators
+from stock_analyzer.replay import IncrementalIndicators, SmaCross, DrawdownLimit, replay
+from stock_analyzer.synthetic import synthetic_universe
+
+
+def test_incremental_indicators_match_batch():
+    df = synthetic_universe(1, years=2, seed=3)["T0000"]
+    ref = compute_indicators(df)
+    ind = IncrementalIndicators()
+    got = pd.DataFrame([ind.update(c) for c in df["Adj Close"]], index=df.index)
+    for col in got:
+        np.testing.assert_allclose(got[col], ref[col], rtol=1e-8, atol=1e-10, err_msg=col)
+
+
+def test_replay_fires_edge_triggered_alerts():
+    idx = pd.bdate_range("2020-01-01", periods=120)
+    close = np.r_[np.linspace(100, 60, 60), np.linspace(60, 120, 60)]
+    df = pd.DataFrame({"Close": close, "Adj Close": close}, index=idx)
+    result = replay(df, [SmaCross(20, 50), DrawdownLimit(0.2)])
+    rules = [a["rule"] for a in result["alerts"]]
+    assert rules.count("drawdown>20%") == 1
+    assert rules.count("sma20x50") == 1
+    assert result["bars"] == 120 and result["latency_us"]["p99"] > 0
@@ -0,0 +1,18 @@
+from stock_analyzer.analysis import compute_indicators
+from stock_analyzer.report import UniverseReport, write_universe_report
+from stock_analyzer.synthetic import synthetic_universe
+
+
+def test_universe_report_renders_every_ticker_in_one_pool(tmp_path):
+    frames = synthetic_universe(["AAA", "BBB", "CCC"], years=1, seed=2)
+    paths = write_universe_report(frames, tmp_path, chart_workers=2)
+    assert [p.parent.name for p in paths] == ["AAA", "BBB", "CCC"]
+    for t in frames:
+        assert {p.name for p in (tmp_path / t).glob("*.png")} == {"price.png", "returns_hist.png", "drawdown.png"}
+
+    # streamed form (stock-parse --charts): nothing changed, so nothing is redrawn
+    report = UniverseReport(tmp_path)
+    for t, df in frames.items():
+        report.add(df, t, indicators=compute_indicators(df))
+    assert report.render(workers=2) == [False] * 9
+    assert report.render(workers=2, force=True) == [True] * 9
@@ -0,0 +1,28 @@
+import pandas as pd
+
+from stock_analyzer.resample import resample_ohlcv, periods_per_year
+from stock_analyzer.synthetic import synthetic_universe
+
+AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Adj Close": "last", "Volume": "sum"}
+
+
+def test_cascade_matches_pandas_per_session():
+    df = synthetic_universe(1, years=0.05, freq="1m")["T0000"]
+    pre_market = df.iloc[:5].copy()
+    pre_market.index = pre_market.index - pd.Timedelta(hours=2)
+    out = resample_ohlcv(pd.concat([pre_market, df]))
+
+    for level, rule in [("5m", "5min"), ("15m", "15min"), ("1h", "60min")]:
+        expected = (df.groupby(df.index.normalize()).resample(rule, offset="30min")
+                    .agg(AGG).droplevel(0).dropna())
+        pd.testing.assert_frame_equal(out[level].drop(columns="Ticker"), expected,
+                                      check_freq=False, check_names=False)
+    daily = df.resample("1D").agg(AGG).dropna()
+    pd.testing.assert_frame_equal(out["1d"].drop(columns="Ticker"), daily,
+                                  check_freq=False, check_names=False)
+
+
+def test_periods_per_year():
+    assert periods_per_year("1d") == 252
+    assert periods_per_year("1m") == 252 * 390
+    assert periods_per_year("1h") == 252 * 7   # 6.5h session -> 7 bars, last one partial
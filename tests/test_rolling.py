@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from stock_analyzer.indicators import (
+    rolling_sharpe, rolling_sortino, rolling_beta, rolling_drawdown, rolling_max_drawdown,
+)
+
+
+def _naive_mdd(a):
+    return (a / np.maximum.accumulate(a) - 1).min()
+
+
+def test_rolling_max_drawdown_matches_naive():
+    rng = np.random.default_rng(1)
+    for n, w in [(1000, 20), (1001, 7), (50, 50), (49, 50), (333, 2)]:
+        p = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, n))))
+        expected = p.rolling(w).apply(_naive_mdd, raw=True)
+        assert np.allclose(rolling_max_drawdown(p, w), expected, equal_nan=True), (n, w)
+
+
+def test_drawdowns_share_the_nan_policy_on_gappy_prices():
+    rng = np.random.default_rng(3)
+    p = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, 300))))
+    p[[0, 40, 41, 200]] = np.nan
+    w = 20
+    dd, mdd = rolling_drawdown(p, w), rolling_max_drawdown(p, w)
+    missing = p.isna().astype(float).rolling(w).sum().fillna(1) > 0     # window short or holds a gap
+    assert dd.isna().equals(missing) and mdd.isna().equals(missing)
+    expected = p.rolling(w).apply(_naive_mdd, raw=True)
+    assert np.allclose(mdd, expected, equal_nan=True)
+    assert (mdd[~missing] <= dd[~missing] + 1e-12).all()
+
+
+def test_running_sum_metrics_match_pandas():
+    rng = np.random.default_rng(2)
+    w = 30
+    r = pd.Series(rng.normal(0.0005, 0.01, 2000))
+    m = pd.Series(rng.normal(0.0, 0.01, 2000))
+    sharpe = r.rolling(w).mean() / r.rolling(w).std() * np.sqrt(252)
+    beta = r.rolling(w).cov(m) / m.rolling(w).var()
+    sortino = r.rolling(w).apply(
+        lambda a: a.mean() / np.sqrt((np.minimum(a, 0) ** 2).mean()) * np.sqrt(252), raw=True)
+    assert np.allclose(rolling_sharpe(r, w), sharpe, equal_nan=True)
+    assert np.allclose(rolling_beta(r, m, w), beta, equal_nan=True)
+    assert np.allclose(rolling_sortino(r, w), sortino, equal_nan=True)
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from stock_analyzer.rollup import RollupCube
+from stock_analyzer.synthetic import synthetic_universe
+
+SPEC = {"Close": "mean", "Volume": "sum", "High": "std", "Low": "min", "Open": "count"}
+
+
+def test_incremental_cube_matches_groupby(tmp_path):
+    df = synthetic_universe(["AAA"], years=3, seed=4)["AAA"]
+    df.loc[df.index[::13], "Close"] = np.nan
+    cube = RollupCube(list(SPEC))
+    cube.update(df.iloc[:300], "AAA")
+    cube.update(df.iloc[300:305], "AAA")
+    cube.update(df.iloc[300:305].iloc[:0], "AAA")
+    cube = RollupCube.load(cube.save(tmp_path / "cube.npz"))
+    assert cube.append(df, "AAA") == len(df) - 305 and cube.append(df, "AAA") == 0
+
+    for level, freq in [("month", "M"), ("quarter", "Q"), ("year", "Y")]:
+        want = df.groupby(df.index.to_period(freq)).agg(SPEC)
+        got = cube.agg(level, SPEC, ticker="AAA")
+        pd.testing.assert_frame_equal(got, want, check_names=False, check_dtype=False, rtol=1e-10)
+
+
+def test_append_rebuilds_when_covered_rows_change(tmp_path):
+    df = synthetic_universe(["AAA"], years=2, seed=6)["AAA"]
+    cube = RollupCube(list(SPEC))
+    cube.append(df.iloc[:400], "AAA")
+    cube = RollupCube.load(cube.save(tmp_path / "cube.npz"))
+    assert cube.append(df.iloc[:400], "AAA") == 0
+
+    rebuilt = df.copy()
+    rebuilt.iloc[10, rebuilt.columns.get_loc("Close")] += 5.0     # source regenerated, history changed
+    assert cube.append(rebuilt, "AAA") == len(df)
+    want = rebuilt.groupby(rebuilt.index.to_period("Y")).agg(SPEC)
+    got = RollupCube.load(cube.save(tmp_path / "cube.npz")).agg("year", SPEC, ticker="AAA")
+    pd.testing.assert_frame_equal(got, want, check_names=False, check_dtype=False, rtol=1e-10)
@@ -0,0 +1,100 @@
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+
+from stock_analyzer.export import save_artifacts, write_run_meta
+from stock_analyzer.portfolio import close_panel, panel_performance, to_perf_rows
+from stock_analyzer.service import ArtifactStore, LRUCache, _serve_client, handle
+from stock_analyzer.synthetic import synthetic_universe
+
+
+@pytest.fixture
+def store(tmp_path):
+    frames = synthetic_universe(["AAA", "BBB"], years=2, seed=3)
+    prices = pd.concat(frames.values())
+    prices.index.name = "date"
+    rows = [{"ticker": t, "total_return": 0.1} for t in frames]
+    save_artifacts(prices=prices, perf_rows=rows, out_dir=tmp_path, fmt="parquet")
+    return ArtifactStore(tmp_path)
+
+
+def get(store, path, **query):
+    status, body = handle(store, path, query)
+    return status, json.loads(body)
+
+
+def test_lru_cache_evicts_by_bytes():
+    cache = LRUCache(100)
+    cache.put("a", 1, 40)
+    cache.put("b", 2, 40)
+    assert cache.get("a") == 1                 # "b" is now least recently used
+    cache.put("c", 3, 40)
+    cache.put("huge", 4, 101)                  # larger than the whole cache: not stored
+    assert cache.get("b") is None and cache.get("huge") is None
+    assert cache.stats() == {"entries": 2, "bytes": 80, "max_bytes": 100,
+                             "hits": 1, "misses": 2, "evictions": 1}
+
+
+def test_routes_slice_and_error_codes(store):
+    status, tickers = get(store, "/tickers")
+    assert status == 200 and [t["ticker"] for t in tickers] == ["AAA", "BBB"]
+
+    full = store.prices["AAA"]
+    start, end = full.index[10].date(), full.index[19].date()
+    status, body = get(store, "/prices", ticker="aaa", start=str(start), end=str(end), columns="Close")
+    assert status == 200 and body["columns"] == ["Close"]
+    assert body["data"] == [[v] for v in full["Close"].iloc[10:20].round(10)]
+
+    status, body = get(store, "/indicators", ticker="AAA", start=str(start), end=str(end), columns="RSI14")
+    assert status == 200 and len(body["data"]) == 10
+    store.cache.max_bytes = store.cache.bytes          # room for one ticker's indicators
+    get(store, "/indicators", ticker="BBB")
+    assert store.cache.stats()["evictions"] == 1 and store.cache.get(("indicators", "AAA")) is None
+
+    assert get(store, "/performance", ticker="BBB") == (200, {"ticker": "BBB", "total_return": 0.1})
+    assert get(store, "/prices", ticker="ZZZ")[0] == 404
+    assert get(store, "/nope")[0] == 404
+    assert get(store, "/rollup", level="week")[0] == 400
+    assert get(store, "/performance", ticker="AAA", start="2100-01-01")[0] == 400
+
+
+def test_full_range_query_matches_the_stored_row(tmp_path):
+    frames = synthetic_universe(["AAA"], years=2, seed=5)
+    prices = frames["AAA"].rename_axis("date")
+    rows = to_perf_rows(panel_performance(close_panel({"AAA": prices["Adj Close"]}),
+                                          risk_free_rate_annual=0.04, periods_per_year=52))
+    save_artifacts(prices=prices, perf_rows=rows, out_dir=tmp_path)
+    write_run_meta(tmp_path, interval="1wk", periods_per_year=52, risk_free_rate_annual=0.04)
+    store = ArtifactStore(tmp_path)
+    stored = get(store, "/performance", ticker="AAA")[1]
+    status, ranged = get(store, "/performance", ticker="AAA", start=str(prices.index[0].date()))
+    assert status == 200 and ranged.keys() == stored.keys()
+    for k, v in stored.items():
+        assert ranged[k] == (pytest.approx(v, rel=1e-9) if isinstance(v, float) else v), k
+
+
+def test_unexpected_error_is_a_500_json_body(store, monkeypatch):
+    monkeypatch.setattr(store, "tickers", lambda: 1 / 0)
+    status, body = get(store, "/tickers")
+    assert status == 500 and "ZeroDivisionError" in body["error"]
+
+
+def test_served_over_http(store):
+    async def run():
+        server = await asyncio.start_server(lambda r, w: _serve_client(store, r, w), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /rollup?level=year&ticker=AAA&columns=Volume:sum HTTP/1.1\r\n"
+                         b"Connection: close\r\n\r\n")
+            raw = await reader.read()
+            writer.close()
+        return raw
+
+    head, _, body = asyncio.run(run()).partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 200 OK")
+    rows = json.loads(body)["rows"]
+    assert [r["year"] for r in rows] == ["2010", "2011"]
+    assert rows[0]["Volume"] == pytest.approx(store.prices["AAA"].loc["2010", "Volume"].sum())
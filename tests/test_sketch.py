@@ -0,0 +1,40 @@
+import json
+
+import numpy as np
+
+from stock_analyzer.sketch import QuantileSketch, merge_sketches, write_distribution
+
+
+def test_merged_chunks_match_exact_quantiles_and_tails():
+    x = np.random.default_rng(5).standard_t(4, size=200_000) * 0.01
+    x[::1000] = np.nan
+    clean = np.sort(x[np.isfinite(x)])
+    sk = merge_sketches(QuantileSketch().update(c) for c in np.array_split(x, 13))
+
+    assert sk.count == len(clean)
+    assert np.isclose(sk.mean, clean.mean()) and np.isclose(sk.std, clean.std(ddof=1))
+    qs = np.array([0.001, 0.01, 0.05, 0.5, 0.95, 0.99, 0.999])
+    rank = np.searchsorted(clean, sk.quantile(qs)) / len(clean)
+    assert np.all(np.abs(rank - qs) < 0.002)
+    tail = clean[: int(0.01 * len(clean))]
+    assert abs(sk.cvar(0.99) / -tail.mean() - 1) < 0.02
+    counts, edges = sk.histogram(40)
+    assert np.isclose(counts.sum(), len(clean))
+    assert np.abs(counts - np.histogram(clean, edges)[0]).max() < 0.002 * len(clean)
+
+    again = QuantileSketch.from_dict(sk.to_dict())
+    assert again.var(0.95) == sk.var(0.95)
+
+
+def test_heavy_tail_cvar_and_universe_key(tmp_path):
+    x = np.random.default_rng(1).standard_t(3, size=2_000_000) * 0.01
+    s = np.sort(x)
+    sk = merge_sketches(QuantileSketch().update(c) for c in np.array_split(x, 37))
+    for level in (0.95, 0.99):
+        exact = -s[: int((1 - level) * len(s))].mean()
+        assert abs(sk.cvar(level) / exact - 1) < 1e-3
+
+    # "ALL" is a real ticker (Allstate): the merged universe must not overwrite it
+    parts = {"ALL": QuantileSketch().update(x[:1000]), "MSFT": QuantileSketch().update(x[1000:3000])}
+    doc = json.loads(write_distribution(parts, tmp_path).read_text())
+    assert doc["tickers"]["ALL"]["count"] == 1000 and doc["universe"]["count"] == 3000
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+from stock_analyzer.analysis import TRADING_DAYS
+from stock_analyzer.trading_calendar import nyse_calendar, nyse_holidays
+
+
+def test_nyse_sessions_lookups_and_counts():
+    cal = nyse_calendar()
+    assert [str(d) for d in nyse_holidays(2024, 2024)] == [
+        "2024-01-01", "2024-01-15", "2024-02-19", "2024-03-29", "2024-05-27",
+        "2024-06-19", "2024-07-04", "2024-09-02", "2024-11-28", "2024-12-25"]
+    assert round(cal.sessions_per_year) == TRADING_DAYS
+    assert list(cal.is_session(["1972-11-07", "1976-11-02", "1980-11-04", "1984-11-06"])) == [False] * 3 + [True]
+
+    # Friday before Good Friday weekend -> Monday; tz-aware stamps keep their local date
+    days = pd.DatetimeIndex(["2024-03-29 09:30", "2024-03-30 23:00", "2024-04-01 16:00"], tz="America/New_York")
+    assert list(cal.next_session(days).astype(str)) == ["2024-04-01"] * 3
+    assert list(cal.previous_session(days, inclusive=False).astype(str)) == ["2024-03-28"] * 3
+    assert list(cal.is_session(days)) == [False, False, True]
+
+    starts = np.array(["2001-01-01", "2012-01-01", "2024-01-01"], dtype="datetime64[D]")
+    assert list(cal.count_sessions(starts, starts + 366)) == [248, 250, 252]
+    assert len(cal.sessions_in("2024-12-23", "2024-12-31")) == 6